@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Content-Addressed Artifact Store
+
+Model files are written once, as blobs named after the SHA-256 of their
+content, under outputs/store/:
+
+    blobs/<2 hex chars>/<sha256><ext>   read-only, never modified
+    manifest.json                       every version of every artifact,
+                                        plus the paths linked to them
+
+The fixed paths under outputs/ that the other scripts read are hard links
+to the current blob, for example outputs/parkinson_model_v1.0.keras. Where
+a hard link is not possible the store falls back to a symlink, and as a
+last resort to a copy. The app asset
+mobile_app/assets/models/parkinson_model_v1.0.tflite is bundled into the
+app and tracked in git, so it is written as a plain, writable copy instead.
+
+Publishing a new version swaps the link atomically. Older versions stay in
+the store at no extra cost and can be linked back with `checkout`.
+Identical content is stored only once.
+
+Linked paths are read-only. Do not write into one in place (cp, open(path,
+'wb'), model.save(path)): that would fail or change the blob. Publish a new
+version through the store instead, or delete the link first.
+
+Usage:
+    python ml/artifact_store.py list
+    python ml/artifact_store.py checkout parkinson_model_v1.0.tflite 3fa2c1
+    python ml/artifact_store.py verify
+"""
+
+import os
+import sys
+import json
+import shutil
+import hashlib
+import argparse
+import tempfile
+from datetime import datetime
+
+
+def _sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _replace_with_link(source: str, destination: str, copy: bool = False) -> str:
+    """
+    Atomically point `destination` at `source`; returns the kind of link made.
+
+    With copy=True `destination` becomes a plain, writable copy of `source`.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(destination)), exist_ok=True)
+    if not copy and os.path.lexists(destination) and os.path.samefile(source, destination):
+        # rename() is a no-op between two links to the same inode and would
+        # leave the staging link behind
+        return 'symlink' if os.path.islink(destination) else 'hardlink'
+    staging = f"{destination}.tmp-{os.getpid()}"
+    if os.path.lexists(staging):
+        os.remove(staging)
+    if copy:
+        shutil.copyfile(source, staging)
+        os.replace(staging, destination)
+        return 'copy'
+    try:
+        os.link(source, staging)
+        kind = 'hardlink'
+    except OSError:
+        try:
+            os.symlink(os.path.relpath(source, os.path.dirname(os.path.abspath(destination))),
+                       staging)
+            kind = 'symlink'
+        except OSError:
+            shutil.copyfile(source, staging)
+            kind = 'copy'
+    os.replace(staging, destination)
+    if os.path.lexists(staging):
+        os.remove(staging)
+    return kind
+
+
+class ArtifactStore:
+    """Hash-named immutable blobs plus a JSON manifest of named versions."""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.blob_dir = os.path.join(root, 'blobs')
+        self.manifest_path = os.path.join(root, 'manifest.json')
+        os.makedirs(self.blob_dir, exist_ok=True)
+
+    # -- manifest -----------------------------------------------------------
+
+    def _load_manifest(self) -> dict:
+        if not os.path.exists(self.manifest_path):
+            return {'artifacts': {}, 'links': {}}
+        with open(self.manifest_path) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest: dict) -> None:
+        staging = f"{self.manifest_path}.tmp-{os.getpid()}"
+        with open(staging, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(staging, self.manifest_path)
+
+    def versions(self, name: str) -> list:
+        """Manifest entries of `name`, oldest first."""
+        return self._load_manifest()['artifacts'].get(name, [])
+
+    def resolve(self, name: str, sha_prefix: str = None) -> dict:
+        """Latest version of `name`, or the one whose hash starts with `sha_prefix`."""
+        versions = self.versions(name)
+        if sha_prefix:
+            versions = [v for v in versions if v['sha256'].startswith(sha_prefix)]
+            if len(versions) > 1:
+                raise ValueError(f"Hash prefix {sha_prefix!r} is ambiguous for {name}")
+        if not versions:
+            raise KeyError(f"No stored version of {name}"
+                           + (f" matching {sha_prefix!r}" if sha_prefix else ''))
+        return versions[-1]
+
+    def blob_path(self, entry: dict) -> str:
+        return os.path.join(self.root, entry['blob'])
+
+    # -- writing ------------------------------------------------------------
+
+    def staging_path(self, suffix: str = '') -> str:
+        """A fresh path inside the store, for writers that need a filename (model.save)."""
+        fd, path = tempfile.mkstemp(suffix=suffix, dir=self.root, prefix='.staging-')
+        os.close(fd)
+        os.remove(path)
+        return path
+
+    def put_file(self, name: str, path: str, metadata: dict = None, move: bool = False) -> dict:
+        """
+        Store the file at `path` as a version of `name` and return its entry.
+
+        With move=True the file is renamed into place (no copy). Content
+        that is already stored is not written again, and storing the
+        current version of `name` again does not add a new entry.
+        """
+        sha = _sha256_file(path)
+        blob = os.path.join('blobs', sha[:2], sha + os.path.splitext(name)[1])
+        blob_path = os.path.join(self.root, blob)
+        if os.path.exists(blob_path):
+            if move:
+                os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            if move:
+                os.replace(path, blob_path)
+            else:
+                staging = self.staging_path()
+                shutil.copyfile(path, staging)
+                os.replace(staging, blob_path)
+            os.chmod(blob_path, 0o444)
+
+        manifest = self._load_manifest()
+        versions = manifest['artifacts'].setdefault(name, [])
+        if versions and versions[-1]['sha256'] == sha:
+            return versions[-1]
+        entry = {
+            'sha256': sha,
+            'blob': blob,
+            'size': os.path.getsize(blob_path),
+            'created': datetime.now().isoformat(),
+            'metadata': metadata or {},
+        }
+        versions.append(entry)
+        self._save_manifest(manifest)
+        return entry
+
+    def put_bytes(self, name: str, data: bytes, metadata: dict = None) -> dict:
+        """Store in-memory content (e.g. converter.convert() output) as a version of `name`."""
+        staging = self.staging_path()
+        with open(staging, 'wb') as f:
+            f.write(data)
+        return self.put_file(name, staging, metadata=metadata, move=True)
+
+    def link(self, name: str, destination: str, sha_prefix: str = None,
+             copy: bool = False) -> str:
+        """
+        Point `destination` at a stored version of `name` (latest by default).
+
+        With copy=True a writable copy is written instead of a link, for
+        paths that are edited or shipped outside the store (the app asset).
+        """
+        entry = self.resolve(name, sha_prefix)
+        kind = _replace_with_link(self.blob_path(entry), destination, copy=copy)
+        manifest = self._load_manifest()
+        manifest['links'][os.path.relpath(os.path.abspath(destination), self.root)] = {
+            'name': name, 'sha256': entry['sha256'], 'kind': kind,
+        }
+        self._save_manifest(manifest)
+        return destination
+
+    # -- maintenance --------------------------------------------------------
+
+    def verify(self) -> list:
+        """Re-hash every blob; returns the entries whose content no longer matches."""
+        corrupted = []
+        for name, versions in self._load_manifest()['artifacts'].items():
+            for entry in versions:
+                path = self.blob_path(entry)
+                if not os.path.exists(path) or _sha256_file(path) != entry['sha256']:
+                    corrupted.append(dict(entry, name=name))
+        return corrupted
+
+
+def main(argv: list = None):
+    import train_parkinson_model as tpm
+
+    parser = argparse.ArgumentParser(description="Inspect and manage the artifact store")
+    parser.add_argument('--store', default=os.path.join(tpm.OUTPUT_DIR, 'store'),
+                        help='Store directory')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('list', help='Show every stored version and the linked paths')
+    checkout_parser = subparsers.add_parser('checkout',
+                                            help='Link a stored version back into place')
+    checkout_parser.add_argument('name', help='Artifact name, e.g. parkinson_model_v1.0.tflite')
+    checkout_parser.add_argument('sha', help='Hash (or unique prefix) of the version')
+    subparsers.add_parser('verify', help='Re-hash every blob')
+    args = parser.parse_args(argv)
+
+    store = ArtifactStore(args.store)
+    manifest = store._load_manifest()
+
+    if args.command == 'list':
+        for name, versions in sorted(manifest['artifacts'].items()):
+            print(f"\n{name}")
+            for entry in versions:
+                print(f"  {entry['sha256'][:12]}  {entry['size'] / 1024:>9.2f} KB  "
+                      f"{entry['created'][:19]}")
+        print("\nLinked paths:")
+        for path, link in sorted(manifest['links'].items()):
+            print(f"  {os.path.normpath(os.path.join(store.root, path))} -> "
+                  f"{link['name']}@{link['sha256'][:12]} ({link['kind']})")
+        return 0
+
+    if args.command == 'checkout':
+        # Re-link every path currently pointing at this artifact
+        paths = [(os.path.normpath(os.path.join(store.root, path)), link['kind'] == 'copy')
+                 for path, link in manifest['links'].items() if link['name'] == args.name]
+        if not paths:
+            raise SystemExit(f"No linked paths for {args.name}")
+        for path, copy in paths:
+            store.link(args.name, path, sha_prefix=args.sha, copy=copy)
+            print(f"✓ {path} -> {args.name}@{store.resolve(args.name, args.sha)['sha256'][:12]}")
+        return 0
+
+    corrupted = store.verify()
+    for entry in corrupted:
+        print(f"❌ {entry['name']}@{entry['sha256'][:12]}: {entry['blob']} does not match its hash")
+    if not corrupted:
+        print("✅ Every blob matches its hash")
+    return 1 if corrupted else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Pipeline Benchmark Suite
+
+Runs the training pipeline (load_and_preprocess_data through generate_report)
+and records per-stage wall time, Python heap peak (tracemalloc) and process
+RSS before/after each stage (the RSS high-water mark is process-lifetime,
+not per stage). It then measures Keras and TFLite inference latency percentiles
+(p50/p95/p99) over a sweep of batch sizes.
+
+Results are written as JSON. Given --baseline, each stage time and each p95
+latency is compared against a previous run, and the process exits non-zero
+if any of them regressed by more than --tolerance, so CI can fail the build.
+
+Artifacts are written to a scratch directory (outputs/benchmark/artifacts
+by default) so benchmarking never overwrites the shipped model.
+
+Usage:
+    python ml/benchmark.py --output bench.json
+    python ml/benchmark.py --output new.json --baseline bench.json --tolerance 0.25
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+import train_parkinson_model as tpm
+from plot_renderer import PlotRenderer
+
+BENCHMARK_DIR = os.path.join(tpm.OUTPUT_DIR, 'benchmark')
+DEFAULT_BATCH_SIZES = [1, 8, 32, 128, 512, 2048]
+
+
+def _current_rss_mb() -> float:
+    """Resident set size of this process in MB (Linux /proc, else peak RSS)."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return _peak_rss_mb()
+
+
+def _peak_rss_mb() -> float:
+    """Process RSS high-water mark in MB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class StageRecorder:
+    """Collects wall time and memory figures for named pipeline stages."""
+
+    def __init__(self, use_tracemalloc: bool = True):
+        self.use_tracemalloc = use_tracemalloc
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        if self.use_tracemalloc:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        rss_before = _current_rss_mb()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            rss_after = _current_rss_mb()
+            record = {
+                'wall_time_sec': elapsed,
+                'rss_before_mb': rss_before,
+                'rss_after_mb': rss_after,
+                'rss_delta_mb': rss_after - rss_before,
+                # ru_maxrss never resets: this is the highest RSS the process
+                # has reached so far, usually set by an earlier stage.
+                'rss_high_water_mb': _peak_rss_mb(),
+            }
+            if self.use_tracemalloc:
+                record['tracemalloc_peak_mb'] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+            self.stages[name] = record
+            print(f"⏱  {name}: {elapsed:.3f}s, RSS {rss_after:.0f} MB "
+                  f"({record['rss_delta_mb']:+.0f} MB, process high-water "
+                  f"{record['rss_high_water_mb']:.0f} MB)")
+
+    def stop(self) -> None:
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def _percentiles(samples_sec: list, batch_size: int) -> dict:
+    times_ms = np.asarray(samples_sec) * 1000
+    p50 = float(np.percentile(times_ms, 50))
+    return {
+        'p50_ms': p50,
+        'p95_ms': float(np.percentile(times_ms, 95)),
+        'p99_ms': float(np.percentile(times_ms, 99)),
+        'mean_ms': float(times_ms.mean()),
+        'rows_per_sec': batch_size / (p50 / 1000) if p50 > 0 else float('inf'),
+        'repeats': len(times_ms),
+    }
+
+
+def _make_batch(X: np.ndarray, batch_size: int, rng: np.random.Generator) -> np.ndarray:
+    return X[rng.integers(0, len(X), size=batch_size)].astype(np.float32)
+
+
+def benchmark_keras_latency(model, X: np.ndarray, batch_sizes: list,
+                            repeats: int = 50, warmup: int = 5) -> dict:
+    """Latency percentiles of a direct (non-`predict`) Keras forward pass per batch size."""
+    rng = np.random.default_rng(0)
+    results = {}
+    for batch_size in batch_sizes:
+        batch = _make_batch(X, batch_size, rng)
+        for _ in range(warmup):
+            model(batch, training=False)
+        samples = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            np.asarray(model(batch, training=False))
+            samples.append(time.perf_counter() - start_time)
+        results[str(batch_size)] = _percentiles(samples, batch_size)
+    return results
+
+
+def benchmark_tflite_latency(tflite_path: str, X: np.ndarray, batch_sizes: list,
+                             repeats: int = 50, warmup: int = 5,
+                             num_threads: int = None) -> dict:
+    """Latency percentiles of TFLite invoke() per batch size (input resized per size)."""
+    tf = tpm._import_tensorflow()
+    interpreter = tf.lite.Interpreter(model_path=tflite_path,
+                                      num_threads=num_threads or os.cpu_count() or 1)
+    input_index = interpreter.get_input_details()[0]['index']
+    rng = np.random.default_rng(0)
+    results = {}
+    for batch_size in batch_sizes:
+        batch = _make_batch(X, batch_size, rng)
+        interpreter.resize_tensor_input(input_index, list(batch.shape))
+        interpreter.allocate_tensors()
+        samples = []
+        for i in range(warmup + repeats):
+            start_time = time.perf_counter()
+            interpreter.set_tensor(input_index, batch)
+            interpreter.invoke()
+            interpreter.get_tensor(interpreter.get_output_details()[0]['index'])
+            if i >= warmup:
+                samples.append(time.perf_counter() - start_time)
+        results[str(batch_size)] = _percentiles(samples, batch_size)
+    return results
+
+
+def run_benchmark(args) -> dict:
+    """Run every pipeline stage under the recorder, then the latency sweeps."""
+    # Point the pipeline at a scratch directory so the shipped artifacts
+    # in outputs/ and assets/models are left untouched.
+    os.makedirs(args.artifacts_dir, exist_ok=True)
+    tpm.OUTPUT_DIR = args.artifacts_dir
+    tpm.MODEL_DIR = args.artifacts_dir
+
+    recorder = StageRecorder(use_tracemalloc=not args.no_tracemalloc)
+    renderer = PlotRenderer(enabled=not args.no_plots, asynchronous=False)
+
+    # Import the heavy libraries up front so their one-off cost isn't
+    # attributed to whichever stage happens to touch them first.
+    with recorder.stage('import_libraries'):
+        tpm._import_tensorflow()
+        import pandas, sklearn.metrics, sklearn.model_selection  # noqa: F401
+        if not args.no_plots:
+            import matplotlib.pyplot, seaborn  # noqa: F401
+    with recorder.stage('load_and_preprocess_data'):
+        X, y, feature_names = tpm.load_and_preprocess_data(args.data_path, use_cache=not args.no_cache)
+    with recorder.stage('explore_data'):
+        tpm.explore_data(X, y, feature_names, renderer=renderer)
+    with recorder.stage('prepare_data_splits'):
+        (X_train, X_val, X_test,
+         y_train, y_val, y_test, _) = tpm.prepare_data_splits(X, y)
+    with recorder.stage('build_model'):
+        model = tpm.build_model(input_dim=X_train.shape[1])
+    with recorder.stage('train_model'):
+        history = tpm.train_model(
+            model, X_train, y_train, X_val, y_val,
+            checkpoint_path=os.path.join(args.artifacts_dir, 'best_model.keras'),
+            epochs=args.epochs, batch_size=args.batch_size, verbose=0)
+    with recorder.stage('plot_training_history'):
+        tpm.plot_training_history(history, renderer=renderer)
+    with recorder.stage('evaluate_model'):
+        metrics = tpm.evaluate_model(model, X_test, y_test, renderer=renderer)
+    with recorder.stage('save_model'):
+        model_path = tpm.save_model(model, feature_names, metrics)
+    with recorder.stage('convert_to_tflite'):
+        tflite_path = tpm.convert_to_tflite(model_path, model=model)
+    with recorder.stage('validate_tflite_model'):
+        tpm.validate_tflite_model(tflite_path, X_test, y_test)
+    with recorder.stage('generate_report'):
+        tpm.generate_report(metrics, feature_names)
+    recorder.stop()
+
+    print("\n" + "=" * 60)
+    print("Inference Latency Sweep")
+    print("=" * 60)
+    keras_latency = benchmark_keras_latency(model, X_test, args.batch_sizes, repeats=args.repeats)
+    tflite_latency = benchmark_tflite_latency(tflite_path, X_test, args.batch_sizes,
+                                              repeats=args.repeats)
+    print(f"\n  {'Batch':>6} {'Keras p50':>10} {'p95':>8} {'p99':>8}"
+          f" {'TFLite p50':>11} {'p95':>8} {'p99':>8}   (ms)")
+    for batch_size in args.batch_sizes:
+        k, t = keras_latency[str(batch_size)], tflite_latency[str(batch_size)]
+        print(f"  {batch_size:>6} {k['p50_ms']:>10.3f} {k['p95_ms']:>8.3f} {k['p99_ms']:>8.3f}"
+              f" {t['p50_ms']:>11.3f} {t['p95_ms']:>8.3f} {t['p99_ms']:>8.3f}")
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'tensorflow': tpm._tensorflow_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'n_samples': int(len(X)),
+            'n_features': int(X.shape[1]),
+            'epochs': args.epochs,
+            'batch_size': args.batch_size,
+            'tracemalloc': not args.no_tracemalloc,
+        },
+        'stages': recorder.stages,
+        'total_wall_time_sec': sum(s['wall_time_sec'] for s in recorder.stages.values()),
+        'inference': {'keras': keras_latency, 'tflite': tflite_latency},
+        'metrics': {name: float(value) for name, value in metrics.items()},
+    }
+
+
+def find_regressions(current: dict, baseline: dict, tolerance: float,
+                     min_stage_delta_sec: float = 0.05,
+                     min_latency_delta_ms: float = 0.01) -> list:
+    """
+    Compare stage wall times and p95 latencies against a baseline run.
+
+    Returns a list of (name, baseline, current, ratio) for every measurement
+    that is more than `tolerance` (fractional) slower than the baseline and
+    also slower by at least the absolute minimum, so timer noise on
+    near-zero stages doesn't fail the build.
+    """
+    regressions = []
+    for name, stage in current['stages'].items():
+        base = baseline.get('stages', {}).get(name)
+        if base and base['wall_time_sec'] > 0:
+            ratio = stage['wall_time_sec'] / base['wall_time_sec']
+            delta = stage['wall_time_sec'] - base['wall_time_sec']
+            if ratio > 1 + tolerance and delta >= min_stage_delta_sec:
+                regressions.append((f"stage:{name}", base['wall_time_sec'],
+                                    stage['wall_time_sec'], ratio))
+    for runtime, sweep in current['inference'].items():
+        for batch_size, stats in sweep.items():
+            base = baseline.get('inference', {}).get(runtime, {}).get(batch_size)
+            if base and base['p95_ms'] > 0:
+                ratio = stats['p95_ms'] / base['p95_ms']
+                delta = stats['p95_ms'] - base['p95_ms']
+                if ratio > 1 + tolerance and delta >= min_latency_delta_ms:
+                    regressions.append((f"{runtime}:batch={batch_size}:p95",
+                                        base['p95_ms'], stats['p95_ms'], ratio))
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="NeuroAccess pipeline benchmark")
+    parser.add_argument('--data-path', default=tpm.DATA_PATH, help='Dataset CSV to benchmark on')
+    parser.add_argument('--output', default=os.path.join(BENCHMARK_DIR, 'benchmark.json'),
+                        help='Where to write the JSON results')
+    parser.add_argument('--artifacts-dir', default=os.path.join(BENCHMARK_DIR, 'artifacts'),
+                        help='Scratch directory for models and figures produced by the run')
+    parser.add_argument('--baseline', default=None, help='Previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed fractional slowdown before a measurement counts as a regression')
+    parser.add_argument('--min-stage-delta', type=float, default=0.05,
+                        help='Ignore stage slowdowns smaller than this many seconds')
+    parser.add_argument('--min-latency-delta', type=float, default=0.01,
+                        help='Ignore p95 latency slowdowns smaller than this many ms')
+    parser.add_argument('--epochs', type=int, default=100, help='Training epochs')
+    parser.add_argument('--batch-size', type=int, default=16, help='Training batch size')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES,
+                        help='Inference batch sizes to sweep')
+    parser.add_argument('--repeats', type=int, default=50, help='Timed repeats per batch size')
+    parser.add_argument('--no-plots', action='store_true', help='Skip figure rendering')
+    parser.add_argument('--no-cache', action='store_true', help='Bypass the dataset cache')
+    parser.add_argument('--no-tracemalloc', action='store_true',
+                        help='Skip Python heap tracing (it slows allocation-heavy stages)')
+    args = parser.parse_args(argv)
+
+    results = run_benchmark(args)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Benchmark results saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance,
+                                       min_stage_delta_sec=args.min_stage_delta,
+                                       min_latency_delta_ms=args.min_latency_delta)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) beyond {args.tolerance:.0%}:")
+            for name, base, new, ratio in regressions:
+                print(f"  {name:<40} {base:>10.3f} → {new:>10.3f}  (×{ratio:.2f})")
+            return 1
+        print(f"\n✅ No regressions beyond {args.tolerance:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
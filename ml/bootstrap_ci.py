@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Bootstrap Confidence Intervals
+
+Percentile bootstrap CIs for the evaluate_model metrics, computed without
+a Python loop over resamples.
+
+A resample is stored as a row of multinomial counts (how often each test
+row was drawn) rather than a list of indices. That holds the same
+information, and every metric becomes a matrix product over the resample
+axis:
+
+    confusion counts  counts @ indicator vectors (tp, fp, tn, fn)
+    AUC               weighted Mann-Whitney statistic: the rows are sorted
+                      by score once, and per resample the positive weight
+                      in each tie group is multiplied by the negative weight
+                      below it (plus half of the tied negative weight) --
+                      the same value as sklearn's roc_auc_score
+
+Resamples are drawn in chunks, each with its own child seed, so the
+intervals depend on `seed` and the chunk size but not on the number of
+workers. Large jobs spread the chunks over a process pool.
+
+Usage:
+    from bootstrap_ci import bootstrap_metrics
+    intervals = bootstrap_metrics(y_test, y_pred_proba)   # {'accuracy': (low, high), ...}
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+METRIC_NAMES = ['accuracy', 'precision', 'sensitivity', 'specificity', 'f1_score', 'auc_roc']
+
+# Below this many (resample x row) cells a pool costs more than it saves
+PARALLEL_MIN_CELLS = 20_000_000
+
+
+def _metrics_from_counts(counts: np.ndarray, y_true: np.ndarray, y_pred: np.ndarray,
+                         order: np.ndarray, group_starts: np.ndarray) -> np.ndarray:
+    """(n_resamples, len(METRIC_NAMES)) metrics for a block of resample counts."""
+    positive = y_true == 1
+    tp = counts @ (positive & (y_pred == 1))
+    fn = counts @ (positive & (y_pred == 0))
+    tn = counts @ (~positive & (y_pred == 0))
+    fp = counts @ (~positive & (y_pred == 1))
+    n = counts.sum(axis=1)
+
+    # Weighted Mann-Whitney AUC over tie groups of the sorted scores
+    sorted_counts = counts[:, order]
+    pos_group = np.add.reduceat(sorted_counts * positive[order], group_starts, axis=1)
+    neg_group = np.add.reduceat(sorted_counts * ~positive[order], group_starts, axis=1)
+    neg_below = np.cumsum(neg_group, axis=1) - neg_group
+    auc_numerator = (pos_group * (neg_below + 0.5 * neg_group)).sum(axis=1)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.column_stack([
+            (tp + tn) / n,
+            tp / (tp + fp),
+            tp / (tp + fn),
+            tn / (tn + fp),
+            2 * tp / (2 * tp + fp + fn),
+            auc_numerator / ((tp + fn) * (tn + fp)),
+        ])
+
+
+def _bootstrap_chunk(y_true: np.ndarray, y_proba: np.ndarray, threshold: float,
+                     seed: np.random.SeedSequence, n_resamples: int) -> np.ndarray:
+    n = len(y_true)
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(n, np.full(n, 1.0 / n), size=n_resamples).astype(np.float64)
+
+    order = np.argsort(y_proba, kind='stable')
+    sorted_scores = y_proba[order]
+    group_starts = np.flatnonzero(np.r_[True, sorted_scores[1:] != sorted_scores[:-1]])
+    y_pred = (y_proba >= threshold).astype(int)
+    return _metrics_from_counts(counts, y_true, y_pred, order, group_starts)
+
+
+def bootstrap_metrics(y_true: np.ndarray, y_proba: np.ndarray, n_resamples: int = 2000,
+                      confidence: float = 0.95, threshold: float = 0.5, seed: int = 42,
+                      chunk_size: int = None, n_workers: int = None) -> dict:
+    """
+    Percentile bootstrap intervals for every name in METRIC_NAMES.
+
+    Returns {metric: (low, high)}. Resamples where a metric is undefined
+    (e.g. no positives drawn) are left out of that metric's interval.
+    `chunk_size` bounds the (chunk_size, n) count matrix held per worker;
+    by default it keeps a chunk at roughly 8M cells.
+    """
+    y_true = np.asarray(y_true).astype(int).ravel()
+    y_proba = np.asarray(y_proba, dtype=np.float64).ravel()
+    n = len(y_true)
+    if n == 0:
+        raise ValueError("Cannot bootstrap an empty test set")
+
+    chunk_size = chunk_size or max(1, min(n_resamples, 8_000_000 // n))
+    sizes = [min(chunk_size, n_resamples - start) for start in range(0, n_resamples, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    if n_workers is None:
+        n_workers = (os.cpu_count() or 1) if n * n_resamples >= PARALLEL_MIN_CELLS else 1
+    n_workers = max(1, min(n_workers, len(sizes)))
+    args = [(y_true, y_proba, threshold, s, size) for s, size in zip(seeds, sizes)]
+    if n_workers == 1:
+        blocks = [_bootstrap_chunk(*a) for a in args]
+    else:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+            blocks = list(pool.map(_bootstrap_chunk, *zip(*args)))
+    values = np.vstack(blocks)
+
+    tail = (1 - confidence) / 2 * 100
+    intervals = {}
+    for i, name in enumerate(METRIC_NAMES):
+        column = values[:, i][np.isfinite(values[:, i])]
+        if len(column) == 0:
+            intervals[name] = (float('nan'), float('nan'))
+        else:
+            low, high = np.percentile(column, [tail, 100 - tail])
+            intervals[name] = (float(low), float(high))
+    return intervals
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Bulk Scoring
+
+Scores a feature file far larger than memory with the saved scaler and
+model. The input is split into fixed-size row chunks. Worker processes
+each load the scaler and model once, then read, scale and score one chunk
+at a time and write its probabilities straight into a memory-mapped
+float32 .npy output. Memory per worker is therefore bounded by the chunk
+size, whatever the file size.
+
+Inputs:
+    .npy  2-D float array (n_rows, 22), read through a memory map
+    .csv  22 feature columns, with or without a header. With a header, the
+          `name` and `status` columns are dropped as in training. A fast
+          newline scan assigns each chunk a byte range up front, so the
+          workers parse the CSV in parallel.
+
+Models: .tflite (default; scored with the TFLite interpreter), .keras/.h5,
+or an .npz from numpy_model.py export. With .npz the workers never import
+TensorFlow, so they start almost instantly.
+
+Usage:
+    python ml/bulk_score.py archive.csv --output archive_scores.npy --workers 16
+"""
+
+import io
+import os
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+import train_parkinson_model as tpm
+from inference_server import (DEFAULT_MODEL_PATH, DEFAULT_SCALER_PATH, ParkinsonScorer,
+                              load_interpreter)
+from numpy_model import NumpyModel
+
+INDEX_BLOCK_BYTES = 64 * 1024 * 1024
+_WHITESPACE_BYTES = np.frombuffer(b' \t\r\n', dtype=np.uint8)
+
+# Per-process scorer, created once by the pool initializer
+_scorer = None
+
+
+class KerasScorer:
+    """Scaler + Keras model pair with the same interface as ParkinsonScorer."""
+
+    def __init__(self, model_path: str, scaler_path: str, num_threads: int = 1):
+        import joblib
+        scaler = joblib.load(scaler_path)
+        self.mean = scaler.mean_.astype(np.float32)
+        self.scale = scaler.scale_.astype(np.float32)
+        tpm.pin_tf_threads(num_threads)
+        self.model = tpm._import_tensorflow().keras.models.load_model(model_path)
+        self.n_features = len(self.mean)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X_scaled = (X.astype(np.float32) - self.mean) / self.scale
+        return self.model.predict(X_scaled, batch_size=4096, verbose=0).ravel()
+
+
+class NumpyScorer:
+    """Scaler + NumpyModel pair; raw-input exports skip the scaler."""
+
+    def __init__(self, model_path: str, scaler_path: str):
+        import joblib
+        self.model = NumpyModel(model_path)
+        self.n_features = self.model.n_features
+        self.mean = self.scale = None
+        if not self.model.raw_input:
+            scaler = joblib.load(scaler_path)
+            self.mean = scaler.mean_.astype(np.float32)
+            self.scale = scaler.scale_.astype(np.float32)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        X = X.astype(np.float32)
+        if self.mean is not None:
+            X = (X - self.mean) / self.scale
+        return self.model.predict(X)
+
+
+def _init_worker(model_path: str, scaler_path: str, num_threads: int) -> None:
+    global _scorer
+    if model_path.endswith('.tflite'):
+        _scorer = ParkinsonScorer(model_path, scaler_path, num_threads=num_threads)
+    elif model_path.endswith('.npz'):
+        _scorer = NumpyScorer(model_path, scaler_path)
+    else:
+        _scorer = KerasScorer(model_path, scaler_path, num_threads=num_threads)
+
+
+def _n_features(model_path: str, scaler_path: str) -> int:
+    """
+    Input width of the model. Only Keras models are sized by their scaler,
+    which they need anyway; raw-input .npz exports never touch scaler_path.
+    """
+    if model_path.endswith('.npz'):
+        return NumpyModel(model_path).n_features
+    if model_path.endswith('.tflite'):
+        return int(load_interpreter(model_path, num_threads=1).get_input_details()[0]['shape'][-1])
+    import joblib
+    return int(joblib.load(scaler_path).n_features_in_)
+
+
+# ----------------------------------------------------------------------------
+# Input indexing
+# ----------------------------------------------------------------------------
+
+def _parse_header(line: bytes) -> list:
+    """Column names if `line` is a header row, otherwise None."""
+    fields = [f.strip().strip('"') for f in line.decode('utf-8').strip().split(',')]
+    try:
+        [float(f) for f in fields]
+        return None
+    except ValueError:
+        return fields
+
+
+def index_csv(path: str, chunk_rows: int) -> tuple:
+    """
+    Scan `path` once for newlines and split it into row chunks.
+
+    Returns (header, chunks, n_rows). Each chunk is a (row_start,
+    byte_start, byte_end) tuple. Blank and whitespace-only lines are not
+    rows, matching pandas' skip_blank_lines. Only one block of the file is
+    in memory at a time.
+    """
+    with open(path, 'rb') as f:
+        first_line = f.readline()
+        header = _parse_header(first_line)
+        data_start = len(first_line) if header else 0
+
+        # Byte offset just past every chunk_rows-th non-blank line
+        boundaries = [data_start]
+        n_rows = 0
+        position = data_start
+        f.seek(data_start)
+        pending = False  # the line still open at the end of the last block has content
+        while True:
+            block = f.read(INDEX_BLOCK_BYTES)
+            if not block:
+                break
+            data = np.frombuffer(block, dtype=np.uint8)
+            newlines = np.flatnonzero(data == ord('\n'))
+            # Non-whitespace bytes up to and including each position
+            content = np.cumsum(~np.isin(data, _WHITESPACE_BYTES), dtype=np.int64)
+            line_end = content[newlines]
+            line_start = np.concatenate(([0], line_end[:-1]))
+            has_content = line_end > line_start
+            if len(newlines):
+                has_content[0] |= pending
+                pending = bool(content[-1] > line_end[-1])
+            else:
+                pending = pending or bool(content[-1])
+            # Row numbers (1-based) ending in this block that close a chunk
+            row_numbers = n_rows + np.cumsum(has_content)
+            closing = newlines[has_content & (row_numbers % chunk_rows == 0)]
+            boundaries.extend((position + closing + 1).tolist())
+            n_rows += int(has_content.sum())
+            position += len(block)
+
+    file_size = position
+    if pending:
+        n_rows += 1  # final row without a trailing newline
+    if boundaries[-1] < file_size:
+        boundaries.append(file_size)
+
+    chunks = []
+    for i, (start, end) in enumerate(zip(boundaries[:-1], boundaries[1:])):
+        chunks.append((i * chunk_rows, start, end))
+    return header, chunks, n_rows
+
+
+def _feature_columns(header: list, n_features: int) -> list:
+    """Indices of the feature columns, dropping `name`/`status` like training does."""
+    if header is None:
+        return None
+    columns = [i for i, name in enumerate(header) if name not in ('name', 'status')]
+    if len(columns) != n_features:
+        raise ValueError(f"CSV has {len(columns)} feature columns, the model expects {n_features}")
+    return columns
+
+
+# ----------------------------------------------------------------------------
+# Workers
+# ----------------------------------------------------------------------------
+
+def _score_npy_chunk(input_path: str, output_path: str, start: int, end: int) -> int:
+    X = np.load(input_path, mmap_mode='r')[start:end]
+    out = np.load(output_path, mmap_mode='r+')
+    out[start:end] = _scorer.predict(np.asarray(X, dtype=np.float32))
+    out.flush()
+    return end - start
+
+
+def _score_csv_chunk(input_path: str, output_path: str, row_start: int,
+                     byte_start: int, byte_end: int, columns: list) -> int:
+    import pandas as pd
+    with open(input_path, 'rb') as f:
+        f.seek(byte_start)
+        raw = f.read(byte_end - byte_start)
+    if not raw.strip():
+        return 0  # only blank lines after the last full chunk
+    X = pd.read_csv(io.BytesIO(raw), header=None, usecols=columns,
+                    dtype=np.float32, skip_blank_lines=True).to_numpy(dtype=np.float32)
+    if X.shape[1] != _scorer.n_features:
+        raise ValueError(f"Chunk at row {row_start} has {X.shape[1]} columns, "
+                         f"expected {_scorer.n_features}")
+    out = np.load(output_path, mmap_mode='r+')
+    out[row_start:row_start + len(X)] = _scorer.predict(X)
+    out.flush()
+    return len(X)
+
+
+# ----------------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------------
+
+def bulk_score(input_path: str, output_path: str, model_path: str = DEFAULT_MODEL_PATH,
+               scaler_path: str = DEFAULT_SCALER_PATH, chunk_rows: int = 65536,
+               n_workers: int = None) -> dict:
+    """
+    Score every row of `input_path` into a float32 .npy at `output_path`.
+
+    Returns a summary with the row count, wall time, throughput and the
+    fraction of rows predicted Parkinson's (probability >= 0.5).
+    """
+    print("\n" + "=" * 60)
+    print("Bulk Scoring")
+    print("=" * 60)
+
+    start_time = time.perf_counter()
+    n_features = _n_features(model_path, scaler_path)
+
+    if input_path.endswith('.npy'):
+        X = np.load(input_path, mmap_mode='r')
+        if X.ndim != 2 or X.shape[1] != n_features:
+            raise ValueError(f"Expected an (n, {n_features}) array, got shape {X.shape}")
+        n_rows = X.shape[0]
+        del X
+        tasks = [(_score_npy_chunk, (start, min(start + chunk_rows, n_rows)))
+                 for start in range(0, n_rows, chunk_rows)]
+    else:
+        header, chunks, n_rows = index_csv(input_path, chunk_rows)
+        columns = _feature_columns(header, n_features)
+        tasks = [(_score_csv_chunk, chunk + (columns,)) for chunk in chunks]
+    index_time = time.perf_counter() - start_time
+
+    n_cores = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or n_cores, len(tasks) or 1))
+    n_threads = max(1, n_cores // n_workers)
+
+    print(f"\n  Input:   {input_path} ({n_rows:,} rows, {len(tasks)} chunks of ≤{chunk_rows:,})")
+    print(f"  Model:   {model_path}")
+    print(f"  Output:  {output_path}")
+    print(f"  Workers: {n_workers} (threads per worker: {n_threads})")
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    out = np.lib.format.open_memmap(output_path, mode='w+', dtype=np.float32, shape=(n_rows,))
+    out[:] = np.nan  # rows that were never written stay detectable
+    out.flush()
+    del out
+
+    scored = 0
+    next_report = 0.1
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx,
+                             initializer=_init_worker,
+                             initargs=(model_path, scaler_path, n_threads)) as pool:
+        futures = [pool.submit(fn, input_path, output_path, *task_args)
+                   for fn, task_args in tasks]
+        for future in as_completed(futures):
+            scored += future.result()
+            if n_rows and scored / n_rows >= next_report:
+                rate = scored / (time.perf_counter() - start_time)
+                print(f"  {scored / n_rows:>4.0%}  {scored:>12,} rows  ({rate:,.0f} rows/s)")
+                next_report += 0.1
+    elapsed = time.perf_counter() - start_time
+
+    if scored != n_rows:
+        raise RuntimeError(f"Scored {scored:,} rows but the input has {n_rows:,}")
+
+    # Summarise the output in chunks so it never has to fit in memory
+    out = np.load(output_path, mmap_mode='r')
+    n_positive = sum(int((out[i:i + chunk_rows] >= 0.5).sum())
+                     for i in range(0, n_rows, chunk_rows))
+
+    summary = {
+        'rows': n_rows,
+        'elapsed_sec': elapsed,
+        'index_sec': index_time,
+        'rows_per_sec': n_rows / elapsed if elapsed > 0 else 0.0,
+        'positive_rate': n_positive / n_rows if n_rows else 0.0,
+    }
+
+    print(f"\n📊 Scored {n_rows:,} rows in {elapsed:.2f}s "
+          f"({summary['rows_per_sec']:,.0f} rows/s, indexing {index_time:.2f}s)")
+    print(f"  Predicted Parkinson's: {summary['positive_rate']:.2%}")
+    print(f"\n✓ Probabilities saved to: {output_path}")
+
+    return summary
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Score a large feature file out of core")
+    parser.add_argument('input', help='Feature file (.csv or .npy)')
+    parser.add_argument('--output', default=None,
+                        help='Output .npy of probabilities (default: <input>_scores.npy)')
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH,
+                        help='.tflite, .keras, .h5 or numpy_model.py .npz model')
+    parser.add_argument('--scaler', default=DEFAULT_SCALER_PATH,
+                        help='scaler.joblib path (not needed for raw-input .npz models)')
+    parser.add_argument('--chunk-rows', type=int, default=65536, help='Rows per chunk')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.input)[0] + '_scores.npy'
+    bulk_score(args.input, output, model_path=args.model, scaler_path=args.scaler,
+               chunk_rows=args.chunk_rows, n_workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Model Compression
+
+Shrinks the trained parkinson_detector (teacher) into smaller students of
+the same build_model architecture and keeps the fastest one that still
+meets the evaluate_model targets.
+
+Each student is made in two steps:
+
+    pruning       Whole hidden units are removed (structured pruning), so the
+                  dense kernels really get smaller. A unit's score is the
+                  spread of its post-BatchNorm activation on the training
+                  split times the L2 norm of its outgoing weights. The mean
+                  contribution of dropped units goes into the next layer's
+                  bias.
+    distillation  The pruned network is fine-tuned with train_model against
+                  alpha * y + (1 - alpha) * p_teacher. Binary cross-entropy
+                  is linear in the target, so this is the usual distillation
+                  loss (temperature 1).
+
+Unstructured magnitude pruning is not used: the TFLite dense kernels do
+not skip zero weights, so it saves neither time nor memory on the phone.
+
+Every student is converted with convert_to_tflite and compared with the
+teacher on size, multiply-accumulates, single-row latency and test
+metrics. Results go to outputs/compression/results.json and the selected
+student to outputs/parkinson_model_v1.0_student.tflite. --promote also
+publishes it as parkinson_model_v1.0.tflite (the app's assets/models) and
+rewrites model_metadata.json to describe the student, keeping the
+teacher's entry under 'distilled_from'.
+
+Usage:
+    python ml/compress_model.py
+    python ml/compress_model.py --widths 32,16,8 16,8,4 --alpha 0.5 --promote
+"""
+
+import os
+import json
+import argparse
+
+import numpy as np
+
+import train_parkinson_model as tpm
+
+COMPRESSION_DIR = os.path.join(tpm.OUTPUT_DIR, 'compression')
+RESULTS_PATH = os.path.join(COMPRESSION_DIR, 'results.json')
+STUDENT_TFLITE_PATH = os.path.join(tpm.OUTPUT_DIR, 'parkinson_model_v1.0_student.tflite')
+DEFAULT_TEACHER_PATH = os.path.join(tpm.OUTPUT_DIR, 'parkinson_model_v1.0.keras')
+DEFAULT_WIDTHS = [(48, 24, 12), (32, 16, 8), (16, 8, 4), (8, 4, 2)]
+
+# Hidden layers of build_model and the BatchNorm that follows each one
+HIDDEN_LAYERS = [('dense_1', 'bn_1'), ('dense_2', 'bn_2'), ('dense_3', None)]
+
+
+def _dense_weights(model, name: str) -> list:
+    return [w.astype(np.float64) for w in model.get_layer(name).get_weights()]
+
+
+def _hidden_activation(a: np.ndarray, dense: list, bn: list, epsilon: float) -> np.ndarray:
+    """Inference-mode Dense -> ReLU -> BatchNorm (dropout is a no-op)."""
+    h = np.maximum(a @ dense[0] + dense[1], 0.0)
+    if bn is not None:
+        gamma, beta, moving_mean, moving_var = bn
+        h = gamma * (h - moving_mean) / np.sqrt(moving_var + epsilon) + beta
+    return h
+
+
+def prune_units(teacher, X: np.ndarray, widths: tuple) -> dict:
+    """
+    Structured pruning of the teacher's hidden layers down to `widths`.
+
+    Returns {layer name: weights} for a build_model(units=widths) network.
+    Layers are pruned front to back, so each score is computed on the
+    inputs the pruned network will really see.
+    """
+    names = [dense for dense, _ in HIDDEN_LAYERS] + ['output']
+    dense = {name: _dense_weights(teacher, name) for name in names}
+    bn, epsilon = {}, {}
+    for _, bn_name in HIDDEN_LAYERS:
+        if bn_name:
+            bn[bn_name] = _dense_weights(teacher, bn_name)
+            epsilon[bn_name] = teacher.get_layer(bn_name).epsilon
+
+    a = X.astype(np.float64)
+    for i, ((dense_name, bn_name), width) in enumerate(zip(HIDDEN_LAYERS, widths)):
+        next_name = names[i + 1]
+        h = _hidden_activation(a, dense[dense_name], bn.get(bn_name), epsilon.get(bn_name))
+        if width > h.shape[1]:
+            raise ValueError(f"{dense_name} has {h.shape[1]} units, cannot keep {width}")
+
+        next_kernel, next_bias = dense[next_name]
+        scores = h.std(axis=0) * np.linalg.norm(next_kernel, axis=1)
+        keep = np.sort(np.argsort(scores)[::-1][:width])
+        drop = np.setdiff1d(np.arange(h.shape[1]), keep)
+
+        # Dropped units still add their mean output to the next layer
+        next_bias = next_bias + h[:, drop].mean(axis=0) @ next_kernel[drop]
+        dense[next_name] = [next_kernel[keep], next_bias]
+        kernel, bias = dense[dense_name]
+        dense[dense_name] = [kernel[:, keep], bias[keep]]
+        if bn_name:
+            bn[bn_name] = [w[keep] for w in bn[bn_name]]
+        a = h[:, keep]
+
+    weights = {**dense, **bn}
+    return {name: [w.astype(np.float32) for w in ws] for name, ws in weights.items()}
+
+
+def multiply_accumulates(model) -> int:
+    """Multiply-accumulates per inference in the model's Dense layers."""
+    return int(sum(layer.get_weights()[0].size for layer in model.layers
+                   if layer.name.startswith('dense_') or layer.name == 'output'))
+
+
+def distill_student(teacher, widths: tuple, X_train: np.ndarray, y_train: np.ndarray,
+                    X_val: np.ndarray, y_val: np.ndarray, alpha: float = 0.5,
+                    learning_rate: float = 5e-4, epochs: int = 100):
+    """Prune the teacher to `widths`, then fine-tune it on blended teacher targets."""
+    student = tpm.build_model(input_dim=X_train.shape[1], units=widths,
+                              learning_rate=learning_rate)
+    for name, weights in prune_units(teacher, X_train, widths).items():
+        student.get_layer(name).set_weights(weights)
+
+    teacher_proba = teacher.predict(X_train, verbose=0).ravel()
+    target = alpha * y_train + (1 - alpha) * teacher_proba
+    tpm.train_model(student, X_train, y_train, X_val, y_val, checkpoint_path=None,
+                    verbose=0, epochs=epochs, target=target.astype(np.float32))
+    return student
+
+
+def _profile(model, keras_path: str, tflite_path: str, X_test: np.ndarray,
+             y_test: np.ndarray) -> dict:
+    """Test metrics, size, multiply-accumulates and single-row latency of one model."""
+    tf = tpm._import_tensorflow()
+    model.save(keras_path)
+    tpm.convert_to_tflite(keras_path, output_path=tflite_path)
+    metrics = tpm.evaluate_model(model, X_test, y_test, save_plots=False)
+
+    # On-device style: one thread, one row per invoke
+    interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=1)
+    tflite_proba = tpm._run_tflite_batched(interpreter, X_test, 256)
+    return {
+        **{key: float(value) for key, value in metrics.items()},
+        'tflite_accuracy': float(np.mean((tflite_proba >= 0.5).astype(int) == y_test)),
+        'meets_targets': tpm.meets_targets(metrics),
+        'macs': multiply_accumulates(model),
+        'params': int(model.count_params()),
+        'size_kb': os.path.getsize(tflite_path) / 1024,
+        'latency_us_per_row': tpm._per_row_latency_us(interpreter, X_test),
+    }
+
+
+def _record_promotion(name: str, profile: dict, student_keras: str, teacher_path: str) -> None:
+    """
+    Make outputs/model_metadata.json describe the promoted student.
+
+    Its metrics, widths and hashes replace the teacher's; the teacher's
+    are kept under 'distilled_from'.
+    """
+    from artifact_store import _sha256_file
+    metadata_path = os.path.join(tpm.OUTPUT_DIR, 'model_metadata.json')
+    metadata = {}
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    # evaluate_model metrics (and CIs), without the size/speed profile fields
+    metrics = {key: value for key, value in profile.items() if key not in (
+        'tflite_accuracy', 'meets_targets', 'macs', 'params', 'size_kb',
+        'latency_us_per_row', 'widths')}
+    metadata['distilled_from'] = {
+        'path': teacher_path,
+        'model_sha256': metadata.get('model_sha256'),
+        'metrics': metadata.get('metrics'),
+    }
+    metadata.update({
+        'model_name': 'NeuroAccess Parkinson Detector (distilled student)',
+        'hidden_units': profile['widths'],
+        'metrics': metrics,
+        'model_sha256': _sha256_file(student_keras),
+    })
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+    tflite_entry = tpm._artifact_store().resolve('parkinson_model_v1.0.tflite')
+    tpm._record_tflite_metadata('float16', {
+        'path': 'parkinson_model_v1.0.tflite',
+        'quantization': 'float16',
+        'sha256': tflite_entry['sha256'],
+        'source': name,
+        'hidden_units': profile['widths'],
+        'tflite_accuracy': profile['tflite_accuracy'],
+        'size_kb': profile['size_kb'],
+    })
+    print(f"✓ Metadata now describes {name}: {metadata_path}")
+
+
+def compress(teacher_path: str, X_train: np.ndarray, y_train: np.ndarray,
+             X_val: np.ndarray, y_val: np.ndarray, X_test: np.ndarray, y_test: np.ndarray,
+             widths_list: list = None, alpha: float = 0.5, promote: bool = False) -> dict:
+    """
+    Build one student per entry of `widths_list` and select the smallest
+    (fewest multiply-accumulates) that meets METRIC_TARGETS.
+
+    Inputs are the scaled splits from load_scaled_splits. Returns the
+    teacher and student profiles plus the name of the selected student
+    (None if no student meets the targets).
+    """
+    tpm._import_tensorflow()
+    from tensorflow import keras
+
+    print("\n" + "=" * 60)
+    print("Model Compression: Structured Pruning + Distillation")
+    print("=" * 60)
+
+    os.makedirs(COMPRESSION_DIR, exist_ok=True)
+    widths_list = [tuple(w) for w in (widths_list or DEFAULT_WIDTHS)]
+    teacher = keras.models.load_model(teacher_path)
+
+    results = {'teacher': _profile(teacher, os.path.join(COMPRESSION_DIR, 'teacher.keras'),
+                                   os.path.join(COMPRESSION_DIR, 'teacher.tflite'),
+                                   X_test, y_test)}
+    for widths in widths_list:
+        name = 'student_' + '-'.join(str(w) for w in widths)
+        print(f"\n--- {name}: pruning {teacher_path} and distilling (alpha={alpha}) ---")
+        student = distill_student(teacher, widths, X_train, y_train, X_val, y_val, alpha=alpha)
+        results[name] = _profile(student, os.path.join(COMPRESSION_DIR, f'{name}.keras'),
+                                 os.path.join(COMPRESSION_DIR, f'{name}.tflite'),
+                                 X_test, y_test)
+        results[name]['widths'] = list(widths)
+
+    base = results['teacher']
+    print("\n📊 Compression results (deltas against the teacher):")
+    print(f"  {'Model':<20}{'MACs':>7}{'KB':>8}{'µs/row':>9}{'Acc':>8}{'Sens':>8}"
+          f"{'Spec':>8}{'AUC':>8}  Targets")
+    for name, r in results.items():
+        row = f"  {name:<20}{r['macs']:>7}{r['size_kb']:>8.2f}{r['latency_us_per_row']:>9.2f}"
+        for key in ('accuracy', 'sensitivity', 'specificity', 'auc_roc'):
+            value = r[key] if name == 'teacher' else r[key] - base[key]
+            row += f"{value:>+8.3f}" if name != 'teacher' else f"{value:>8.3f}"
+        print(row + f"  {'✅' if r['meets_targets'] else '❌'}")
+
+    candidates = [name for name, r in results.items()
+                  if name != 'teacher' and r['meets_targets']]
+    selected = min(candidates, key=lambda name: results[name]['macs'], default=None)
+    if selected:
+        r = results[selected]
+        student_keras = os.path.join(COMPRESSION_DIR, f'{selected}.keras')
+        tpm.convert_to_tflite(student_keras, output_path=STUDENT_TFLITE_PATH)
+        if promote:
+            tpm.convert_to_tflite(student_keras)
+            _record_promotion(selected, r, student_keras, teacher_path)
+        print(f"\n✅ Selected {selected}: {r['macs'] / base['macs']:.1%} of the teacher's MACs, "
+              f"{r['size_kb']:.2f} KB ({r['size_kb'] - base['size_kb']:+.2f}), "
+              f"{r['latency_us_per_row']:.2f} µs/row "
+              f"({r['latency_us_per_row'] - base['latency_us_per_row']:+.2f})")
+    else:
+        print("\n❌ No student meets the evaluate_model targets; keep the teacher")
+
+    summary = {'teacher_path': teacher_path, 'alpha': alpha, 'selected': selected,
+               'models': results}
+    with open(RESULTS_PATH, 'w') as f:
+        json.dump(summary, f, indent=2)
+    print(f"✓ Results saved to: {RESULTS_PATH}")
+    return summary
+
+
+def _parse_widths(value: str) -> tuple:
+    widths = tuple(int(w) for w in value.split(','))
+    if len(widths) != len(HIDDEN_LAYERS) or min(widths) < 1:
+        raise argparse.ArgumentTypeError(f"expected {len(HIDDEN_LAYERS)} positive widths, got {value!r}")
+    return widths
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Prune and distill the Parkinson's detector")
+    parser.add_argument('--teacher', default=DEFAULT_TEACHER_PATH, help='Trained .keras model')
+    parser.add_argument('--widths', type=_parse_widths, nargs='+', default=None,
+                        help='Student hidden widths, e.g. 32,16,8 16,8,4')
+    parser.add_argument('--alpha', type=float, default=0.5,
+                        help='Weight of the true labels in the distillation target')
+    parser.add_argument('--promote', action='store_true',
+                        help='Also write the selected student to assets/models')
+    args = parser.parse_args(argv)
+
+    X, y, _ = tpm.load_and_preprocess_data(tpm.DATA_PATH)
+    (X_train, X_val, X_test,
+     y_train, y_val, y_test, _) = tpm.load_scaled_splits(X, y)
+    compress(args.teacher, X_train, y_train, X_val, y_val, X_test, y_test,
+             widths_list=args.widths, alpha=args.alpha, promote=args.promote)
+
+
+if __name__ == '__main__':
+    main()
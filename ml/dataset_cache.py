@@ -0,0 +1,149 @@
+"""
+NeuroAccess - Binary Dataset Cache
+
+Caches the parsed feature matrix, labels and feature names of a raw CSV
+dataset as .npy files keyed by the SHA-256 of the raw file's contents and
+the parser version (PARSER_VERSION). Later loads open the cached arrays
+memory-mapped instead of re-parsing text.
+
+Layout:
+    data/processed/cache/
+        index.json            # path -> (size, mtime_ns, sha256) memo
+        <sha256>-v<version>/
+            X.npy             # float64 (n_samples, n_features)
+            y.npy             # int64 (n_samples,)
+            meta.json         # feature names, source path, shapes
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BASE_DIR)
+CACHE_DIR = os.path.join(PROJECT_DIR, 'data', 'processed', 'cache')
+
+_HASH_CHUNK_BYTES = 8 * 1024 * 1024
+
+# Bump whenever load_and_preprocess_data changes how the CSV is turned into
+# X / y / feature_names (columns dropped, dtypes, ordering) so entries parsed
+# by the old code are not served for an unchanged raw file.
+PARSER_VERSION = '1'
+
+
+def file_sha256(path: str) -> str:
+    """Hash a file's contents in fixed-size chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_BYTES), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _load_index(cache_dir: str) -> dict:
+    index_path = os.path.join(cache_dir, 'index.json')
+    if not os.path.exists(index_path):
+        return {}
+    try:
+        with open(index_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(cache_dir: str, index: dict) -> None:
+    index_path = os.path.join(cache_dir, 'index.json')
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=2)
+    os.replace(tmp_path, index_path)
+
+
+def content_key(data_path: str, cache_dir: str = CACHE_DIR) -> str:
+    """
+    Return the SHA-256 of `data_path`.
+
+    The hash is memoised against the file's size and mtime so an untouched
+    multi-GB file is not re-read on every run; any change to either forces
+    a fresh hash.
+    """
+    data_path = os.path.abspath(data_path)
+    stat = os.stat(data_path)
+    index = _load_index(cache_dir)
+    entry = index.get(data_path)
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        return entry['sha256']
+
+    sha256 = file_sha256(data_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    index[data_path] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': sha256}
+    _save_index(cache_dir, index)
+    return sha256
+
+
+def _entry_key(data_path: str, cache_dir: str, version: str) -> str:
+    return f'{content_key(data_path, cache_dir)}-v{version}'
+
+
+def load_dataset_cache(data_path: str, cache_dir: str = CACHE_DIR,
+                       version: str = PARSER_VERSION):
+    """
+    Open the cached arrays for `data_path` if present.
+
+    Returns:
+        (X, y, feature_names) with X and y memory-mapped read-only,
+        or None on a cache miss.
+    """
+    entry_dir = os.path.join(cache_dir, _entry_key(data_path, cache_dir, version))
+    meta_path = os.path.join(entry_dir, 'meta.json')
+    if not os.path.exists(meta_path):
+        return None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    X = np.load(os.path.join(entry_dir, 'X.npy'), mmap_mode='r')
+    y = np.load(os.path.join(entry_dir, 'y.npy'), mmap_mode='r')
+    return X, y, meta['feature_names']
+
+
+def save_dataset_cache(data_path: str, X: np.ndarray, y: np.ndarray,
+                       feature_names: list, cache_dir: str = CACHE_DIR,
+                       version: str = PARSER_VERSION) -> str:
+    """
+    Write X, y and feature names for `data_path` into the cache.
+
+    The entry is staged in a temporary directory and renamed into place so
+    readers never observe a partially written cache.
+    """
+    key = _entry_key(data_path, cache_dir, version)
+    entry_dir = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(entry_dir, 'meta.json')):
+        return entry_dir
+
+    os.makedirs(cache_dir, exist_ok=True)
+    staging_dir = tempfile.mkdtemp(prefix=f'.{key}.', dir=cache_dir)
+    try:
+        np.save(os.path.join(staging_dir, 'X.npy'), np.ascontiguousarray(X))
+        np.save(os.path.join(staging_dir, 'y.npy'), np.ascontiguousarray(y))
+        meta = {
+            'source': os.path.abspath(data_path),
+            'sha256': content_key(data_path, cache_dir),
+            'parser_version': version,
+            'feature_names': list(feature_names),
+            'X_shape': list(X.shape),
+            'X_dtype': str(X.dtype),
+            'y_dtype': str(y.dtype),
+        }
+        with open(os.path.join(staging_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(staging_dir, entry_dir)
+    except OSError:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        if not os.path.exists(os.path.join(entry_dir, 'meta.json')):
+            raise
+
+    return entry_dir
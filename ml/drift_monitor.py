@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Streaming Feature Drift Monitor
+
+Checks whether incoming 22-feature voice recordings still look like the
+training data. The reference is the training distribution as seen through
+scaler.joblib, the same mean/scale the app's FeatureScaler
+(mobile_app/lib/services/feature_scaler.dart) applies.
+
+Rows are consumed in chunks, and per feature only these are kept:
+
+    moments    count, mean and M2 (sum of squared deviations), merged
+               chunk by chunk with the parallel form of Welford's update
+               (Chan et al.), so the result equals a single Welford pass
+    histogram  counts over fixed bins in scaled units: Z_EDGES
+               (-3 .. +3 std in 0.5 steps) plus the two open tails
+
+Memory is O(features x bins) regardless of stream length. Drift scores per
+feature, against the reference histogram:
+
+    PSI         sum (p - q) ln(p / q); < 0.1 stable, 0.1-0.25 moderate,
+                >= 0.25 drift
+    KS          max |CDF_stream - CDF_reference| over the bin edges, compared
+                with the 5% critical value for the two sample sizes
+    mean shift  (mean_stream - mean_train) / scale_train
+    std ratio   std_stream / scale_train
+
+The UCI training split has only ~136 rows, so PSI carries a noise floor of
+roughly (bins - 1) / n_reference, about 0.1. The KS critical value takes
+the reference size into account.
+
+The reference histogram is built once from the training split by the
+`reference` command (outputs/drift_reference.npz). Without it the monitor
+falls back to a normal distribution with the scaler's mean and scale. That
+fallback overstates drift for skewed features (jitter, shimmer, NHR).
+
+Input is CSV (a header with the feature names; other columns such as name
+and status are ignored), .npy arrays or synthetic_data.py shard
+directories. Use '-' to read CSV from stdin.
+
+Usage:
+    python ml/drift_monitor.py reference
+    python ml/drift_monitor.py monitor field_recordings.csv --output drift.json
+    tail -f recordings.csv | python ml/drift_monitor.py monitor - --report-every 100000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+import numpy as np
+
+import train_parkinson_model as tpm
+
+REFERENCE_PATH = os.path.join(tpm.OUTPUT_DIR, 'drift_reference.npz')
+SCALER_PATH = os.path.join(tpm.OUTPUT_DIR, 'scaler.joblib')
+METADATA_PATH = os.path.join(tpm.OUTPUT_DIR, 'model_metadata.json')
+
+Z_EDGES = np.arange(-3.0, 3.0 + 1e-9, 0.5)
+PSI_MODERATE = 0.1
+PSI_DRIFT = 0.25
+KS_ALPHA_COEFFICIENT = 1.36   # two-sample KS critical value at alpha = 0.05
+EPSILON = 1e-4                # floor for empty bins in PSI
+
+
+def _bin_counts(X: np.ndarray, mean: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    """(n_features, n_bins) histogram of the rows of X in scaled units."""
+    n_features = X.shape[1]
+    n_bins = len(Z_EDGES) + 1
+    bins = np.searchsorted(Z_EDGES, (X - mean) / scale, side='right')
+    bins += np.arange(n_features) * n_bins
+    return np.bincount(bins.ravel(), minlength=n_features * n_bins).reshape(n_features, n_bins)
+
+
+def build_reference(scaler, feature_names: list, X_train: np.ndarray = None) -> dict:
+    """
+    Reference histogram per feature: empirical from the (unscaled) training
+    rows when given, else the normal approximation N(mean_, scale_).
+    """
+    if X_train is not None:
+        counts = _bin_counts(np.asarray(X_train, dtype=np.float64), scaler.mean_, scaler.scale_)
+        proportions = counts / len(X_train)
+        n_reference = len(X_train)
+    else:
+        from scipy.special import ndtr
+        cdf = np.concatenate([[0.0], ndtr(Z_EDGES), [1.0]])
+        proportions = np.tile(np.diff(cdf), (len(feature_names), 1))
+        n_reference = 0   # exact distribution: no sampling error on the reference side
+    return {
+        'feature_names': np.array(feature_names),
+        'mean': scaler.mean_.astype(np.float64),
+        'scale': scaler.scale_.astype(np.float64),
+        'proportions': proportions,
+        'n_reference': np.array(n_reference),
+    }
+
+
+def load_reference(path: str = REFERENCE_PATH, scaler_path: str = SCALER_PATH) -> dict:
+    """The saved reference, or the scaler's normal approximation if there is none."""
+    if os.path.exists(path):
+        with np.load(path) as archive:
+            reference = {name: archive[name] for name in archive.files}
+        reference['feature_names'] = [str(f) for f in reference['feature_names']]
+        return reference
+
+    import joblib
+    print(f"⚠️  {path} not found; using a normal approximation of {scaler_path} "
+          f"(run `drift_monitor.py reference` for the empirical training histogram)",
+          file=sys.stderr)
+    with open(METADATA_PATH) as f:
+        feature_names = json.load(f)['input_features']
+    reference = build_reference(joblib.load(scaler_path), feature_names)
+    reference['feature_names'] = feature_names
+    return reference
+
+
+class DriftMonitor:
+    """Online per-feature moments and histograms, scored against a reference."""
+
+    def __init__(self, reference: dict):
+        self.feature_names = list(reference['feature_names'])
+        self.reference_mean = reference['mean']
+        self.reference_scale = reference['scale']
+        self.reference_proportions = reference['proportions']
+        self.n_reference = int(reference['n_reference'])
+
+        n_features, n_bins = self.reference_proportions.shape
+        self.n = 0
+        self.n_invalid = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)
+        self.counts = np.zeros((n_features, n_bins), dtype=np.int64)
+
+    def update(self, X: np.ndarray) -> None:
+        """Add a chunk of rows; rows with missing or non-finite values are counted and skipped."""
+        X = np.asarray(X, dtype=np.float64)
+        valid = np.isfinite(X).all(axis=1)
+        if not valid.all():
+            self.n_invalid += int((~valid).sum())
+            X = X[valid]
+        n_chunk = len(X)
+        if n_chunk == 0:
+            return
+
+        # Merge the chunk's moments into the running ones
+        chunk_mean = X.mean(axis=0)
+        chunk_m2 = ((X - chunk_mean) ** 2).sum(axis=0)
+        n_total = self.n + n_chunk
+        delta = chunk_mean - self.mean
+        self.mean += delta * (n_chunk / n_total)
+        self.m2 += chunk_m2 + delta ** 2 * (self.n * n_chunk / n_total)
+        self.n = n_total
+
+        self.counts += _bin_counts(X, self.reference_mean, self.reference_scale)
+
+    def scores(self) -> dict:
+        """Per-feature drift scores and status for everything seen so far."""
+        if self.n == 0:
+            raise ValueError("No valid rows have been seen yet")
+        p = self.counts / self.n
+        q = self.reference_proportions
+        p_floor, q_floor = np.maximum(p, EPSILON), np.maximum(q, EPSILON)
+        psi = ((p_floor - q_floor) * np.log(p_floor / q_floor)).sum(axis=1)
+        ks = np.abs(np.cumsum(p, axis=1) - np.cumsum(q, axis=1)).max(axis=1)
+        if self.n_reference:
+            ks_critical = KS_ALPHA_COEFFICIENT * np.sqrt(
+                (self.n + self.n_reference) / (self.n * self.n_reference))
+        else:
+            ks_critical = KS_ALPHA_COEFFICIENT / np.sqrt(self.n)
+        std = np.sqrt(self.m2 / max(self.n - 1, 1))
+
+        features = {}
+        for j, name in enumerate(self.feature_names):
+            status = ('drift' if psi[j] >= PSI_DRIFT or ks[j] > ks_critical
+                      else 'moderate' if psi[j] >= PSI_MODERATE else 'stable')
+            features[name] = {
+                'psi': float(psi[j]),
+                'ks': float(ks[j]),
+                'mean_shift': float((self.mean[j] - self.reference_mean[j])
+                                    / self.reference_scale[j]),
+                'std_ratio': float(std[j] / self.reference_scale[j]),
+                'mean': float(self.mean[j]),
+                'std': float(std[j]),
+                'status': status,
+            }
+        return {
+            'rows': self.n,
+            'invalid_rows': self.n_invalid,
+            'ks_critical': float(ks_critical),
+            'drifted': [name for name, f in features.items() if f['status'] == 'drift'],
+            'features': features,
+        }
+
+
+def iter_chunks(source: str, feature_names: list, chunk_rows: int = 262144):
+    """
+    Yield (n, n_features) float arrays from a CSV file, '-' (stdin CSV),
+    a .npy array or a synthetic_data.py shard directory.
+    """
+    if os.path.isdir(source):
+        from synthetic_data import open_shards
+        _, shards = open_shards(source)
+        arrays = [X for X, _ in shards]
+    elif source.endswith('.npy'):
+        arrays = [np.load(source, mmap_mode='r')]
+    else:
+        import pandas as pd
+        reader = pd.read_csv(sys.stdin.buffer if source == '-' else source,
+                             usecols=feature_names, chunksize=chunk_rows, engine='c')
+        for chunk in reader:
+            yield chunk[feature_names].to_numpy(dtype=np.float64)
+        return
+
+    for X in arrays:
+        if X.shape[1] != len(feature_names):
+            raise ValueError(f"{source}: expected {len(feature_names)} feature columns, "
+                             f"got {X.shape[1]}")
+        for start in range(0, len(X), chunk_rows):
+            yield X[start:start + chunk_rows]
+
+
+def print_scores(result: dict, top: int = None) -> None:
+    """Table of features by PSI, most drifted first."""
+    features = sorted(result['features'].items(), key=lambda item: -item[1]['psi'])
+    skipped = f", {result['invalid_rows']:,} invalid skipped" if result['invalid_rows'] else ''
+    print(f"\n📊 Drift vs training reference ({result['rows']:,} rows{skipped}; "
+          f"KS critical {result['ks_critical']:.4f}):")
+    print(f"  {'Feature':<18}{'PSI':>8}{'KS':>8}{'Δmean/σ':>10}{'σ ratio':>9}  Status")
+    icons = {'stable': '✅', 'moderate': '⚠️ ', 'drift': '❌'}
+    for name, f in features[:top]:
+        print(f"  {name:<18}{f['psi']:>8.4f}{f['ks']:>8.4f}{f['mean_shift']:>+10.3f}"
+              f"{f['std_ratio']:>9.3f}  {icons[f['status']]} {f['status']}")
+
+
+def monitor(sources: list, reference: dict, chunk_rows: int = 262144,
+            report_every: int = None) -> dict:
+    """Stream every source through one DriftMonitor; returns the final scores."""
+    drift = DriftMonitor(reference)
+    start_time = time.perf_counter()
+    next_report = report_every
+    for source in sources:
+        for X in iter_chunks(source, drift.feature_names, chunk_rows):
+            drift.update(X)
+            if report_every and drift.n >= next_report:
+                interim = drift.scores()
+                print(f"  {drift.n:>13,} rows  {time.perf_counter() - start_time:>7.1f}s  "
+                      f"drifted: {', '.join(interim['drifted']) or 'none'}", flush=True)
+                next_report += report_every
+    elapsed = time.perf_counter() - start_time
+
+    result = drift.scores()
+    result['elapsed_sec'] = elapsed
+    result['rows_per_sec'] = (drift.n + drift.n_invalid) / elapsed if elapsed > 0 else 0.0
+    return result
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Streaming feature drift monitor")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    reference_parser = subparsers.add_parser(
+        'reference', help='Build the reference histogram from the training split')
+    reference_parser.add_argument('--scaler', default=SCALER_PATH, help='Training scaler.joblib')
+    reference_parser.add_argument('--data', default=tpm.DATA_PATH, help='Raw training dataset')
+    reference_parser.add_argument('--output', default=REFERENCE_PATH, help='Output .npz')
+
+    monitor_parser = subparsers.add_parser('monitor', help='Score a stream of feature rows')
+    monitor_parser.add_argument('sources', nargs='*', default=['-'],
+                                help="CSV files, .npy arrays or shard directories ('-' = stdin)")
+    monitor_parser.add_argument('--reference', default=REFERENCE_PATH, help='Reference .npz')
+    monitor_parser.add_argument('--scaler', default=SCALER_PATH,
+                                help='Scaler for the normal fallback when there is no reference')
+    monitor_parser.add_argument('--chunk-rows', type=int, default=262144,
+                                help='Rows parsed and scored at a time')
+    monitor_parser.add_argument('--report-every', type=int, default=None,
+                                help='Print the drifted features every N rows '
+                                     '(checked after each chunk)')
+    monitor_parser.add_argument('--output', default=None, help='Write the scores as JSON')
+    args = parser.parse_args(argv)
+
+    if args.command == 'reference':
+        import joblib
+        X, y, feature_names = tpm.load_and_preprocess_data(args.data)
+        X_train = tpm.split_data(X, y)[0]
+        reference = build_reference(joblib.load(args.scaler), feature_names, X_train)
+        np.savez(args.output, **reference)
+        print(f"✓ Reference histogram ({len(X_train)} training rows, {len(feature_names)} "
+              f"features x {len(Z_EDGES) + 1} bins) saved to: {args.output}")
+        return 0
+
+    print("\n" + "=" * 60)
+    print("Feature Drift Monitor")
+    print("=" * 60)
+    result = monitor(args.sources, load_reference(args.reference, args.scaler),
+                     chunk_rows=args.chunk_rows, report_every=args.report_every)
+    print_scores(result)
+    print(f"\n  Throughput: {result['rows_per_sec'] * 60:,.0f} rows/min "
+          f"({result['elapsed_sec']:.2f}s)")
+    if result['drifted']:
+        print(f"\n❌ Drift detected in {len(result['drifted'])} feature(s): "
+              f"{', '.join(result['drifted'])}")
+    else:
+        print("\n✅ No feature has drifted from the training distribution")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"✓ Scores saved to: {args.output}")
+    return 1 if result['drifted'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Fused Ensemble Model
+
+Merges N trained parkinson_detector models (CV folds, different seeds)
+into one Keras/TFLite graph. One forward pass computes every member and
+their mean probability, so there is no need to call predict on each
+.keras file in turn.
+
+Each member is first reduced to four Dense layers: its BatchNorms are
+folded into the following Dense layer (numpy_model.fold_layers), and its
+own StandardScaler into the first one. The fused graph therefore takes raw
+features, even when every fold was fitted with a different scaler. The
+members' layers are then stacked:
+
+    layer 1   one Dense whose kernel is every member's first kernel side by side
+    layer 2+  1x1 Conv1D with groups=N, i.e. a block-diagonal Dense that
+              only computes the N diagonal blocks
+    mean      Dense(1) with fixed weights 1/N over the N member probabilities
+
+Only builtin TFLite ops are used. EinsumDense with per-member biases does
+not convert.
+
+Usage:
+    python ml/train_parkinson_model.py --cv-folds 5 --cv-save-models
+    python ml/ensemble_model.py ml/outputs/cv_models/fold_*.keras
+    python ml/ensemble_model.py seed_*.keras --scaler ml/outputs/scaler.joblib
+"""
+
+import os
+import time
+import argparse
+
+import numpy as np
+
+import train_parkinson_model as tpm
+from numpy_model import fold_layers, fold_scaler
+
+ENSEMBLE_DIR = os.path.join(tpm.OUTPUT_DIR, 'ensemble')
+DEFAULT_SCALER_PATH = os.path.join(tpm.OUTPUT_DIR, 'scaler.joblib')
+
+
+def _member_scaler_path(model_path: str, default: str) -> str:
+    """fold_<k>_scaler.joblib next to fold_<k>.keras, else the shared scaler."""
+    candidate = os.path.splitext(model_path)[0] + '_scaler.joblib'
+    return candidate if os.path.exists(candidate) else default
+
+
+def build_fused_ensemble(members: list, name: str = 'parkinson_ensemble'):
+    """
+    Build the stacked graph from `members`, a list of folded layer lists
+    ([(kernel, bias, activation), ...] with the scaler already folded in).
+    All members must have the same layer widths and activations.
+    """
+    tpm._import_tensorflow()
+    from tensorflow import keras
+    from tensorflow.keras import layers
+
+    shapes = [[(kernel.shape, activation) for kernel, _, activation in m] for m in members]
+    if any(s != shapes[0] for s in shapes):
+        raise ValueError("Ensemble members must share the same architecture")
+    n_members = len(members)
+    n_features = members[0][0][0].shape[0]
+
+    first = [m[0] for m in members]
+    stacked = [layers.Input(shape=(n_features,), name='input'),
+               layers.Reshape((1, n_features), name='to_sequence'),
+               layers.Dense(sum(k.shape[1] for k, _, _ in first),
+                            activation=first[0][2], name='dense_1')]
+    for i in range(1, len(members[0])):
+        units = members[0][i][0].shape[1]
+        stacked.append(layers.Conv1D(n_members * units, 1, groups=n_members,
+                                     activation=members[0][i][2], name=f'grouped_{i + 1}'))
+    stacked += [layers.Flatten(name='members'),
+                layers.Dense(1, use_bias=False, name='ensemble_mean')]
+    model = keras.Sequential(stacked, name=name)
+
+    model.get_layer('dense_1').set_weights([
+        np.concatenate([k for k, _, _ in first], axis=1).astype(np.float32),
+        np.concatenate([b for _, b, _ in first]).astype(np.float32),
+    ])
+    for i in range(1, len(members[0])):
+        # Conv1D(groups=N) kernel: (1, inputs per group, N * units), group g
+        # reads input block g and writes output block g
+        kernel = np.concatenate([m[i][0] for m in members], axis=1)[None]
+        bias = np.concatenate([m[i][1] for m in members])
+        model.get_layer(f'grouped_{i + 1}').set_weights([kernel.astype(np.float32),
+                                                         bias.astype(np.float32)])
+    model.get_layer('ensemble_mean').set_weights(
+        [np.full((n_members, 1), 1.0 / n_members, dtype=np.float32)])
+    return model
+
+
+def export_ensemble(model_paths: list, scaler_path: str = DEFAULT_SCALER_PATH,
+                    output_dir: str = ENSEMBLE_DIR) -> tuple:
+    """
+    Fuse the saved models into parkinson_ensemble.keras/.tflite in `output_dir`.
+
+    Returns (keras_path, tflite_path, members) where members are the loaded
+    (model, scaler) pairs, e.g. for benchmark_ensemble.
+    """
+    import joblib
+    tpm._import_tensorflow()
+    from tensorflow import keras
+
+    print("\n" + "=" * 60)
+    print(f"Fusing {len(model_paths)} Models into One Ensemble Graph")
+    print("=" * 60)
+
+    members = []
+    folded = []
+    for path in model_paths:
+        member_scaler = _member_scaler_path(path, scaler_path)
+        model, scaler = keras.models.load_model(path), joblib.load(member_scaler)
+        members.append((model, scaler))
+        folded.append(fold_scaler(fold_layers(model), scaler))
+        print(f"  {os.path.basename(path)}  (scaler: {os.path.basename(member_scaler)})")
+
+    fused = build_fused_ensemble(folded)
+    os.makedirs(output_dir, exist_ok=True)
+    keras_path = os.path.join(output_dir, 'parkinson_ensemble.keras')
+    fused.save(keras_path)
+    print(f"\n✓ Fused Keras ensemble saved to: {keras_path}")
+    tflite_path = tpm.convert_to_tflite(
+        keras_path, output_path=os.path.join(output_dir, 'parkinson_ensemble.tflite'))
+    return keras_path, tflite_path, members
+
+
+def _best_time(fn, repeats: int) -> float:
+    """Fastest of `repeats` calls, in seconds."""
+    fn()  # warm-up (graph tracing, tensor allocation)
+    best = float('inf')
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start_time)
+    return best
+
+
+def benchmark_ensemble(members: list, keras_path: str, tflite_path: str, X_raw: np.ndarray,
+                       batch_sizes: tuple = (1, 32, 256, 4096), repeats: int = 10,
+                       output_dir: str = ENSEMBLE_DIR) -> dict:
+    """
+    Check the fused graph against the members and time both ways of scoring.
+
+    Sequential: for each member, scaler.transform + predict, then average.
+    Fused: one predict on the raw rows. Keras and TFLite are timed
+    separately; each TFLite model runs on its own single-threaded interpreter.
+    """
+    tf = tpm._import_tensorflow()
+    from tensorflow import keras
+
+    fused = keras.models.load_model(keras_path)
+    reference = np.mean([model.predict(scaler.transform(X_raw), verbose=0).ravel()
+                         for model, scaler in members], axis=0)
+    keras_diff = float(np.abs(fused.predict(X_raw, verbose=0).ravel() - reference).max())
+
+    member_paths = []
+    for i, (model, _) in enumerate(members):
+        path = os.path.join(output_dir, f'member_{i}.keras')
+        model.save(path)
+        member_paths.append(tpm.convert_to_tflite(
+            path, output_path=os.path.join(output_dir, f'member_{i}.tflite')))
+    member_interpreters = [tf.lite.Interpreter(model_path=p, num_threads=1) for p in member_paths]
+    fused_interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=1)
+    for interpreter in member_interpreters + [fused_interpreter]:
+        interpreter.allocate_tensors()
+    tflite_diff = float(np.abs(tpm._run_tflite_batched(fused_interpreter, X_raw, 256)
+                               - reference).max())
+
+    # Smoke-check the single-row path the latency table starts with, both ways
+    X_one = X_raw[:1]
+    sequential_one = np.mean([tpm._run_tflite_batched(interpreter, scaler.transform(X_one), 1)
+                              for interpreter, (_, scaler) in zip(member_interpreters, members)],
+                             axis=0)
+    fused_one = tpm._run_tflite_batched(fused_interpreter, X_one, 1)
+    single_row_diff = float(max(np.abs(sequential_one - reference[:1]).max(),
+                                np.abs(fused_one - reference[:1]).max()))
+
+    print(f"\n📊 Fused vs mean of {len(members)} members ({len(X_raw)} rows):")
+    print(f"  Keras max |Δp|:  {keras_diff:.2e} {'✅' if keras_diff <= 1e-5 else '❌'}")
+    print(f"  TFLite max |Δp|: {tflite_diff:.2e} {'✅' if tflite_diff <= 1e-3 else '❌'}")
+    print(f"  TFLite 1-row max |Δp| (sequential and fused): {single_row_diff:.2e} "
+          f"{'✅' if single_row_diff <= 1e-3 else '❌'}")
+
+    results = {'n_members': len(members), 'keras_max_abs_diff': keras_diff,
+               'tflite_max_abs_diff': tflite_diff, 'tflite_single_row_max_abs_diff': single_row_diff,
+               'latency_ms': {}}
+    print(f"\n📊 Latency per batch (best of {repeats}, ms):")
+    print(f"  {'Batch':>6}{'Keras seq':>12}{'Keras fused':>13}{'Speedup':>9}"
+          f"{'TFLite seq':>12}{'TFLite fused':>14}{'Speedup':>9}")
+    for batch_size in batch_sizes:
+        X = np.resize(X_raw, (batch_size, X_raw.shape[1]))
+
+        def keras_sequential():
+            np.mean([model.predict(scaler.transform(X), verbose=0) for model, scaler in members],
+                    axis=0)
+
+        def tflite_sequential():
+            np.mean([tpm._run_tflite_batched(interpreter, scaler.transform(X), batch_size)
+                     for interpreter, (_, scaler) in zip(member_interpreters, members)], axis=0)
+
+        timings = {
+            'keras_sequential': _best_time(keras_sequential, repeats),
+            'keras_fused': _best_time(lambda: fused.predict(X, verbose=0), repeats),
+            'tflite_sequential': _best_time(tflite_sequential, repeats),
+            'tflite_fused': _best_time(
+                lambda: tpm._run_tflite_batched(fused_interpreter, X, batch_size), repeats),
+        }
+        results['latency_ms'][batch_size] = {k: v * 1000 for k, v in timings.items()}
+        print(f"  {batch_size:>6}"
+              f"{timings['keras_sequential'] * 1000:>12.2f}{timings['keras_fused'] * 1000:>13.2f}"
+              f"{timings['keras_sequential'] / timings['keras_fused']:>8.1f}x"
+              f"{timings['tflite_sequential'] * 1000:>12.3f}{timings['tflite_fused'] * 1000:>14.3f}"
+              f"{timings['tflite_sequential'] / timings['tflite_fused']:>8.1f}x")
+    return results
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Fuse trained detectors into one ensemble graph")
+    parser.add_argument('models', nargs='+', help='Member .keras models')
+    parser.add_argument('--scaler', default=DEFAULT_SCALER_PATH,
+                        help='Scaler for members without a <model>_scaler.joblib next to them')
+    parser.add_argument('--output-dir', default=ENSEMBLE_DIR, help='Where to write the ensemble')
+    parser.add_argument('--no-benchmark', action='store_true',
+                        help='Only export; skip the equivalence check and latency benchmark')
+    args = parser.parse_args(argv)
+
+    keras_path, tflite_path, members = export_ensemble(args.models, args.scaler, args.output_dir)
+    if not args.no_benchmark:
+        X, _, _ = tpm.load_and_preprocess_data(tpm.DATA_PATH)
+        results = benchmark_ensemble(members, keras_path, tflite_path, X,
+                                     output_dir=args.output_dir)
+
+        import json
+        results_path = os.path.join(args.output_dir, 'benchmark.json')
+        with open(results_path, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n✓ Benchmark saved to: {results_path}")
+
+
+if __name__ == '__main__':
+    main()
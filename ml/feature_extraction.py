@@ -0,0 +1,621 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Voice Feature Extraction (NumPy reference implementation)
+
+Python counterpart of FeatureExtractionService in
+mobile_app/lib/services/feature_extraction_service.dart. It computes the
+same 22 UCI-format features (F0, jitter, shimmer, HNR/NHR, RPDE, DFA,
+spread, D2, PPE) with the same thresholds, clamps and fallback values, so
+recordings in our WAV archive can be turned into training rows that match
+what the app feeds the model.
+
+The Dart service loops sample by sample and recomputes the O(n * lag)
+autocorrelation for every feature group. Here the autocorrelation is one
+FFT, the pitch periods are detected once and shared, and the framed
+statistics use strided window views.
+
+extract_features() returns raw (unscaled) features, the format of
+data/raw/parkinsons.data; the app applies FeatureScaler afterwards.
+
+Usage:
+    python ml/feature_extraction.py extract recordings/ --output features.csv --workers 8
+    python ml/feature_extraction.py parity feature_parity.json
+    python ml/feature_extraction.py reference
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import wave
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_DIR = os.path.dirname(BASE_DIR)
+DART_SCALER_PATH = os.path.join(PROJECT_DIR, 'mobile_app', 'lib', 'services', 'feature_scaler.dart')
+
+# Feature order of the model input (UCI Parkinson's dataset, status removed)
+FEATURE_NAMES = [
+    'MDVP:Fo(Hz)', 'MDVP:Fhi(Hz)', 'MDVP:Flo(Hz)',
+    'MDVP:Jitter(%)', 'MDVP:Jitter(Abs)', 'MDVP:RAP', 'MDVP:PPQ', 'Jitter:DDP',
+    'MDVP:Shimmer', 'MDVP:Shimmer(dB)', 'Shimmer:APQ3', 'Shimmer:APQ5', 'MDVP:APQ', 'Shimmer:DDA',
+    'NHR', 'HNR',
+    'RPDE', 'DFA', 'spread1', 'spread2', 'D2', 'PPE',
+]
+
+# Bump whenever a change alters extracted values; feature_store.py keys on it
+EXTRACTOR_VERSION = '1.1'
+
+LN10 = np.log(10.0)
+LN2 = np.log(2.0)
+
+MAX_AUTOCORR_LAG = 2000
+RPDE_FRAME_SIZE = 160
+DFA_WINDOW_SIZES = (16, 32, 64, 128, 256)
+
+
+def _log10(x):
+    # Same formulation as the Dart helper, so results agree to the last bit
+    return np.log(x) / LN10
+
+
+def _log2(x):
+    return np.log(x) / LN2
+
+
+def _round_half_up(x: np.ndarray) -> np.ndarray:
+    """Dart's double.round() (ties away from zero) for non-negative values."""
+    floor = np.floor(x)
+    return (floor + (x - floor >= 0.5)).astype(np.int64)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return float(min(max(value, low), high))
+
+
+# ----------------------------------------------------------------------------
+# Shared signal analysis
+# ----------------------------------------------------------------------------
+
+def autocorrelation(x: np.ndarray) -> np.ndarray:
+    """
+    Normalised autocorrelation for lags 0..min(n // 4, 2000) - 1.
+
+    Matches the Dart _autocorrelation: mean removed, each lag divided by
+    its overlap length (see normalize_autocorrelation for the lag-0 step).
+    Computed with one zero-padded FFT instead of a loop per lag.
+    """
+    n = len(x)
+    max_lag = min(n // 4, MAX_AUTOCORR_LAG)
+    if max_lag == 0:
+        return np.zeros(0)
+    centered = x - x.mean()
+    n_fft = 1 << int(2 * n - 1).bit_length()
+    spectrum = np.fft.rfft(centered, n_fft)
+    lag_sums = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n_fft)[:max_lag]
+    return normalize_autocorrelation(lag_sums, n)
+
+
+def normalize_autocorrelation(lag_sums: np.ndarray, n: int) -> np.ndarray:
+    """
+    Turn centred lag-product sums into the Dart normalisation.
+
+    Each lag is divided by its overlap length. The Dart loop then divides
+    result[i] by result[0] in place, so after the first iteration it
+    divides by 1.0: only lag 0 is normalised, the other lags keep their
+    covariance scale. That is reproduced here because it is what the app
+    feeds the model.
+    """
+    r = lag_sums / (n - np.arange(len(lag_sums)))
+    if len(r) and r[0] > 0:
+        r[0] = 1.0
+    return r
+
+
+def detect_periods(autocorr: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Lags (in samples) of autocorrelation peaks above 0.3 in the 80-400 Hz range."""
+    min_period = sample_rate // 400
+    max_period = sample_rate // 80
+    lags = np.arange(min_period, min(max_period, len(autocorr) - 1))
+    if len(lags) == 0:
+        return lags
+    r = autocorr[lags]
+    is_peak = (r > autocorr[lags - 1]) & (r > autocorr[lags + 1]) & (r > 0.3)
+    return lags[is_peak]
+
+
+def _frames(x: np.ndarray, frame_size: int) -> np.ndarray:
+    """
+    Non-overlapping frames as a (n_frames, frame_size) view.
+
+    Mirrors the Dart loop `for (i = 0; i < n - frameSize; i += frameSize)`,
+    which never includes the last (possibly partial) frame.
+    """
+    n_frames = max(0, (len(x) - 1) // frame_size)
+    return x[:n_frames * frame_size].reshape(n_frames, frame_size)
+
+
+def detect_peak_amplitudes(x: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Peak |amplitude| of each 10 ms frame, silent frames (<= 0.01) dropped."""
+    peaks = np.abs(_frames(x, sample_rate // 100)).max(axis=1, initial=0.0)
+    return peaks[peaks > 0.01]
+
+
+def _perturbation_quotient(values: np.ndarray, points: int) -> float:
+    """Sum of |value - centred `points`-sample moving average| over all full windows."""
+    windows = sliding_window_view(values, points)
+    centre = windows[:, points // 2]
+    return float(np.abs(centre - windows.sum(axis=1) / points).sum())
+
+
+# ----------------------------------------------------------------------------
+# Feature groups (one per Dart _calculate* method)
+# ----------------------------------------------------------------------------
+
+def f0_statistics(periods: np.ndarray, sample_rate: int) -> dict:
+    frequencies = sample_rate / periods.astype(np.float64)
+    valid = frequencies[(frequencies >= 80) & (frequencies <= 400)]
+    if len(valid) == 0:
+        return {'f0_mean': 150.0, 'f0_max': 200.0, 'f0_min': 100.0}
+    return {
+        'f0_mean': float(valid.mean()),
+        'f0_max': float(valid.max()),
+        'f0_min': float(valid.min()),
+    }
+
+
+def jitter_features(periods: np.ndarray, sample_rate: int) -> dict:
+    n = len(periods)
+    if n < 3:
+        return {'jitter_percent': 0.005, 'jitter_abs': 0.00003,
+                'rap': 0.003, 'ppq': 0.003, 'ddp': 0.009}
+
+    p = periods.astype(np.float64)
+    mean_period = p.mean()
+    mean_diff = np.abs(np.diff(p)).mean()
+
+    rap = _perturbation_quotient(p, 3) / ((n - 2) * mean_period)
+    ppq = _perturbation_quotient(p, 5) / ((n - 4) * mean_period) if n > 4 else rap
+
+    return {
+        'jitter_percent': _clamp(mean_diff / mean_period, 0.001, 0.05),
+        'jitter_abs': _clamp(mean_diff / sample_rate, 0.00001, 0.0003),
+        'rap': _clamp(rap, 0.001, 0.03),
+        'ppq': _clamp(ppq, 0.001, 0.03),
+        'ddp': _clamp(rap * 3, 0.003, 0.09),
+    }
+
+
+def shimmer_features(amplitudes: np.ndarray) -> dict:
+    n = len(amplitudes)
+    if n < 3:
+        return {'shimmer': 0.025, 'shimmer_db': 0.25, 'apq3': 0.015,
+                'apq5': 0.018, 'apq': 0.024, 'dda': 0.045}
+
+    # Silent frames are already dropped, so every ratio is well defined
+    return shimmer_from_sums(
+        n=n,
+        amp_sum=float(amplitudes.sum()),
+        abs_diff_sum=float(np.abs(np.diff(amplitudes)).sum()),
+        db_sum=float(np.abs(20 * _log10(amplitudes[1:] / amplitudes[:-1])).sum()),
+        apq3_sum=_perturbation_quotient(amplitudes, 3),
+        apq5_sum=_perturbation_quotient(amplitudes, 5),
+    )
+
+
+def shimmer_from_sums(n: int, amp_sum: float, abs_diff_sum: float, db_sum: float,
+                      apq3_sum: float, apq5_sum: float) -> dict:
+    """Shimmer features from running sums over the peak-amplitude sequence."""
+    if n < 3:
+        return shimmer_features(np.zeros(0))
+
+    mean_amp = amp_sum / n
+    shimmer = abs_diff_sum / (n - 1) / mean_amp
+    shimmer_db = db_sum / (n - 1)
+    apq3 = apq3_sum / ((n - 2) * mean_amp)
+    apq5 = apq5_sum / ((n - 4) * mean_amp) if n > 4 else apq3
+
+    return {
+        'shimmer': _clamp(shimmer, 0.01, 0.15),
+        'shimmer_db': _clamp(shimmer_db, 0.1, 1.5),
+        'apq3': _clamp(apq3, 0.005, 0.06),
+        'apq5': _clamp(apq5, 0.005, 0.08),
+        'apq': _clamp(apq5, 0.005, 0.15),   # MDVP:APQ is approximated by APQ5
+        'dda': _clamp(apq3 * 3, 0.015, 0.18),
+    }
+
+
+def noise_features(autocorr: np.ndarray, sample_rate: int) -> dict:
+    window = autocorr[sample_rate // 400:min(sample_rate // 80, len(autocorr))]
+    max_corr = _clamp(float(window.max(initial=0.0)), 0.01, 0.99)
+    hnr = 10 * _log10(max_corr / (1 - max_corr))
+    nhr = 1 / (abs(hnr) + 0.001)
+    return {
+        'nhr': _clamp(nhr, 0.001, 0.4),
+        'hnr': _clamp(hnr, 10.0, 35.0),
+    }
+
+
+def _normalized_entropy(bins: np.ndarray, n_bins: int) -> float:
+    counts = np.bincount(bins, minlength=n_bins)
+    p = counts[counts > 0] / len(bins)
+    return float(-(p * _log2(p)).sum() / _log2(float(n_bins)))
+
+
+def frame_energies(frames: np.ndarray) -> np.ndarray:
+    return np.einsum('ij,ij->i', frames, frames) / RPDE_FRAME_SIZE
+
+
+def rpde(x: np.ndarray) -> float:
+    """Entropy of the 10 ms frame-energy histogram (Dart's simplified RPDE)."""
+    return rpde_from_energies(frame_energies(_frames(x, RPDE_FRAME_SIZE)))
+
+
+def rpde_from_energies(energies: np.ndarray) -> float:
+    if len(energies) == 0:
+        return 0.5
+    max_energy = energies.max()
+    if max_energy == 0:
+        return 0.5
+    n_bins = 20
+    bins = np.clip(_round_half_up(energies / max_energy * (n_bins - 1)), 0, n_bins - 1)
+    return _normalized_entropy(bins, n_bins)
+
+
+def _linear_slope(x: np.ndarray, y: np.ndarray) -> float:
+    xc = x - x.mean()
+    ss_xx = (xc * xc).sum()
+    return float((xc * (y - y.mean())).sum() / ss_xx) if ss_xx > 0 else 0.0
+
+
+def detrended_residual_sum(windows: np.ndarray) -> float:
+    """Sum of squared residuals after a least-squares line through each row."""
+    ws = windows.shape[1]
+    t = np.arange(ws, dtype=np.float64)
+    t_mean = (ws - 1) / 2.0
+    tc = t - t_mean
+    y_mean = windows.mean(axis=1)
+    slope = (windows - y_mean[:, None]) @ tc / (tc @ tc)
+    intercept = y_mean - slope * t_mean
+    residuals = windows - (slope[:, None] * t + intercept[:, None])
+    return float(np.einsum('ij,ij->', residuals, residuals))
+
+
+def dfa(x: np.ndarray) -> float:
+    """Detrended fluctuation exponent over window sizes 16-256."""
+    n = len(x)
+    integrated = np.cumsum(x - x.mean())
+    residual_sums = {}
+    for ws in DFA_WINDOW_SIZES:
+        n_windows = n // ws
+        if n_windows:
+            residual_sums[ws] = detrended_residual_sum(
+                integrated[:n_windows * ws].reshape(n_windows, ws))
+    return dfa_from_residual_sums(residual_sums, n)
+
+
+def dfa_from_residual_sums(residual_sums: dict, n: int) -> float:
+    """
+    DFA exponent from {window size: summed squared residuals over its n // ws windows}.
+
+    Window sizes of n // 4 or more are ignored, as in the Dart service.
+    """
+    if n < 100:
+        return 0.72
+    log_n, log_f = [], []
+    for ws in DFA_WINDOW_SIZES:
+        if ws >= n // 4:
+            continue
+        fluctuation = np.sqrt(residual_sums[ws] / ((n // ws) * ws))
+        log_n.append(_log10(float(ws)))
+        log_f.append(_log10(fluctuation + 0.0001))
+
+    if len(log_n) < 2:
+        return 0.72
+    return _clamp(_linear_slope(np.array(log_n), np.array(log_f)), 0.5, 1.0)
+
+
+def zero_crossing_rate(x: np.ndarray) -> float:
+    if len(x) < 2:
+        return 0.0
+    non_negative = x >= 0
+    return float(np.count_nonzero(non_negative[1:] != non_negative[:-1])) / len(x)
+
+
+def ppe(periods: np.ndarray) -> float:
+    """Normalised entropy of the detected pitch-period histogram."""
+    if len(periods) < 10:
+        return 0.2
+    min_period, max_period = periods.min(), periods.max()
+    period_range = max_period - min_period
+    if period_range == 0:
+        return 0.1
+    n_bins = 10
+    bins = np.clip(_round_half_up((periods - min_period) / period_range * (n_bins - 1)),
+                   0, n_bins - 1)
+    return _normalized_entropy(bins, n_bins)
+
+
+def nonlinear_features(f0: dict, periods: np.ndarray, rpde_value: float,
+                       dfa_value: float, zcr: float) -> dict:
+    f0_range = f0['f0_max'] - f0['f0_min']
+    spread1 = -5.0 - _log10(f0_range + 1)
+    spread2 = 0.2 + 0.1 * f0_range / f0['f0_mean']
+    d2 = 2.0 + _clamp(zcr * 2.0, 0.0, 1.5)
+    return {
+        'rpde': _clamp(rpde_value, 0.3, 0.7),
+        'dfa': _clamp(dfa_value, 0.6, 0.85),
+        'spread1': _clamp(spread1, -7.0, -2.5),
+        'spread2': _clamp(spread2, 0.1, 0.5),
+        'd2': _clamp(d2, 1.5, 4.0),
+        'ppe': _clamp(ppe(periods), 0.05, 0.55),
+    }
+
+
+def extract_features(samples: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Compute the 22 raw features for one recording.
+
+    Args:
+        samples: Mono PCM samples as floats in [-1, 1] (int16 / 32768, as
+            the app's AudioRecordingService produces)
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        float64 array of 22 features in FEATURE_NAMES order
+    """
+    # The app holds samples as Float32 and does all arithmetic in double
+    x = np.asarray(samples, dtype=np.float32).astype(np.float64)
+
+    return assemble_features(
+        autocorr=autocorrelation(x),
+        sample_rate=sample_rate,
+        shimmer=shimmer_features(detect_peak_amplitudes(x, sample_rate)),
+        rpde_value=rpde(x),
+        dfa_value=dfa(x),
+        zcr=zero_crossing_rate(x),
+    )
+
+
+def assemble_features(autocorr: np.ndarray, sample_rate: int, shimmer: dict,
+                      rpde_value: float, dfa_value: float, zcr: float) -> np.ndarray:
+    """
+    Derive the pitch-based groups from the autocorrelation and return the
+    22 features in FEATURE_NAMES order.
+
+    Shared by extract_features and the streaming extractor, which compute
+    the signal statistics differently but finish identically.
+    """
+    periods = detect_periods(autocorr, sample_rate)
+    f0 = f0_statistics(periods, sample_rate)
+    jitter = jitter_features(periods, sample_rate)
+    noise = noise_features(autocorr, sample_rate)
+    nonlinear = nonlinear_features(f0, periods, rpde_value, dfa_value, zcr)
+
+    return np.array([
+        f0['f0_mean'], f0['f0_max'], f0['f0_min'],
+        jitter['jitter_percent'], jitter['jitter_abs'], jitter['rap'], jitter['ppq'], jitter['ddp'],
+        shimmer['shimmer'], shimmer['shimmer_db'], shimmer['apq3'], shimmer['apq5'],
+        shimmer['apq'], shimmer['dda'],
+        noise['nhr'], noise['hnr'],
+        nonlinear['rpde'], nonlinear['dfa'], nonlinear['spread1'], nonlinear['spread2'],
+        nonlinear['d2'], nonlinear['ppe'],
+    ])
+
+
+# ----------------------------------------------------------------------------
+# WAV input and batch mode
+# ----------------------------------------------------------------------------
+
+def load_wav(path: str) -> tuple:
+    """Read a PCM WAV file as (float32 samples in [-1, 1], sample_rate), mixed to mono."""
+    with wave.open(path, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        n_channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        raw = wav.readframes(wav.getnframes())
+    return decode_pcm(raw, width, n_channels), sample_rate
+
+
+def decode_pcm(raw: bytes, width: int, n_channels: int) -> np.ndarray:
+    """Little-endian PCM frames -> mono float32 samples in [-1, 1]."""
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128.0
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype='<i2').astype(np.float32) / 32768.0
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype='<i4').astype(np.float32) / 2147483648.0
+    else:
+        raise ValueError(f"Unsupported sample width: {width * 8}-bit")
+
+    if n_channels > 1:
+        samples = samples.reshape(-1, n_channels).mean(axis=1, dtype=np.float32)
+    return samples
+
+
+def extract_file(path: str) -> np.ndarray:
+    samples, sample_rate = load_wav(path)
+    return extract_features(samples, sample_rate)
+
+
+def extract_directory(wav_dir: str, n_workers: int = None) -> tuple:
+    """
+    Extract features for every .wav file under `wav_dir`.
+
+    Returns (X, paths): an (n_files, 22) array and the matching file paths.
+    """
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(wav_dir)
+        for name in files if name.lower().endswith('.wav')
+    )
+    if not paths:
+        return np.zeros((0, len(FEATURE_NAMES))), []
+
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(paths)))
+    if n_workers == 1:
+        rows = [extract_file(path) for path in paths]
+    else:
+        ctx = multiprocessing.get_context('spawn')
+        chunksize = max(1, len(paths) // (n_workers * 4))
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+            rows = list(pool.map(extract_file, paths, chunksize=chunksize))
+    return np.vstack(rows), paths
+
+
+def recording_name(path: str) -> str:
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def save_features_csv(X: np.ndarray, names: list, output_path: str, status: int = None) -> None:
+    """
+    Write features in the data/raw/parkinsons.data layout.
+
+    With `status` given, the label column is included, so the file can be
+    appended to the training data.
+    """
+    import pandas as pd
+    df = pd.DataFrame(X, columns=FEATURE_NAMES)
+    df.insert(0, 'name', names)
+    if status is not None:
+        df.insert(df.columns.get_loc('HNR') + 1, 'status', status)
+    df.to_csv(output_path, index=False)
+
+
+# ----------------------------------------------------------------------------
+# Parity check against the Dart implementation
+# ----------------------------------------------------------------------------
+
+def load_dart_scaler(path: str = DART_SCALER_PATH) -> tuple:
+    """Parse the `_mean` and `_scale` constants from feature_scaler.dart."""
+    with open(path) as f:
+        source = f.read()
+
+    def constants(name):
+        body = re.search(rf'{name}\s*=\s*\[(.*?)\];', source, re.S).group(1)
+        body = re.sub(r'//.*', '', body)
+        return np.array([float(v) for v in body.split(',') if v.strip()])
+
+    return constants('_mean'), constants('_scale')
+
+
+def check_parity(fixture_path: str, rtol: float = 1e-6, atol: float = 1e-9) -> bool:
+    """
+    Compare extract_features with features exported by the Dart service.
+
+    The fixture is written by
+    mobile_app/test/services/feature_parity_export_test.dart:
+    {"cases": [{"name", "sample_rate", "samples", "features"}]}, where
+    "features" is the (scaled) output of FeatureExtractionService.extractFeatures.
+    The Dart values are un-scaled with the FeatureScaler constants and
+    compared in raw feature units.
+    """
+    print("\n" + "=" * 60)
+    print("Feature Extraction Parity (NumPy vs Dart)")
+    print("=" * 60)
+
+    with open(fixture_path) as f:
+        cases = json.load(f)['cases']
+    mean, scale = load_dart_scaler()
+
+    all_match = True
+    for case in cases:
+        start_time = time.perf_counter()
+        ours = extract_features(np.array(case['samples'], dtype=np.float32), case['sample_rate'])
+        elapsed = (time.perf_counter() - start_time) * 1000
+        theirs = np.array(case['features']) * scale + mean
+        all_match &= _report_case(case['name'], ours, theirs, 'dart', rtol, atol,
+                                  f"{elapsed:.1f} ms")
+
+    print(f"\n{'✅ All' if all_match else '❌ Not all'} {len(cases)} cases match "
+          f"(rtol={rtol:g}, atol={atol:g})")
+    return all_match
+
+
+def check_reference(rtol: float = 1e-9, atol: float = 1e-12) -> bool:
+    """
+    Compare extract_features with the scalar transliteration of the Dart
+    service (feature_extraction_reference.py) on synthetic recordings.
+
+    Runs without Flutter, so it guards the port until a Dart-exported
+    fixture is available for check_parity.
+    """
+    from feature_extraction_reference import extract_features_reference, reference_cases
+
+    print("\n" + "=" * 60)
+    print("Feature Extraction Parity (NumPy vs scalar Dart reference)")
+    print("=" * 60)
+
+    cases = reference_cases()
+    all_match = True
+    for name, samples in cases.items():
+        start_time = time.perf_counter()
+        theirs = extract_features_reference(samples)
+        reference_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        ours = extract_features(samples)
+        elapsed = time.perf_counter() - start_time
+        all_match &= _report_case(name, ours, theirs, 'reference', rtol, atol,
+                                  f"{elapsed * 1000:.1f} ms, {reference_time / elapsed:.0f}x faster")
+
+    print(f"\n{'✅ All' if all_match else '❌ Not all'} {len(cases)} cases match "
+          f"(rtol={rtol:g}, atol={atol:g})")
+    return all_match
+
+
+def _report_case(name: str, ours: np.ndarray, theirs: np.ndarray, label: str,
+                 rtol: float, atol: float, timing: str) -> bool:
+    """Print one case's comparison and any mismatched features; True if all match."""
+    mismatched = ~np.isclose(ours, theirs, rtol=rtol, atol=atol)
+    status = '✓' if not mismatched.any() else '✗'
+    max_rel = float(np.max(np.abs(ours - theirs) / np.maximum(np.abs(theirs), atol)))
+    print(f"  {status} {name:<28} max rel diff {max_rel:.2e}  ({timing})")
+    for i in np.flatnonzero(mismatched):
+        print(f"      {FEATURE_NAMES[i]:<18} numpy={ours[i]:.10g}  {label}={theirs[i]:.10g}")
+    return not mismatched.any()
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="NumPy voice feature extraction")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract = subparsers.add_parser('extract', help='Extract features from a directory of WAV files')
+    extract.add_argument('wav_dir')
+    extract.add_argument('--output', default='features.csv', help='Output CSV path')
+    extract.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    extract.add_argument('--status', type=int, choices=[0, 1], default=None,
+                         help="Label to record for every file (0 healthy, 1 Parkinson's)")
+
+    parity = subparsers.add_parser('parity', help='Compare against features exported by the Dart service')
+    parity.add_argument('fixture', help='JSON written by feature_parity_export_test.dart')
+    parity.add_argument('--rtol', type=float, default=1e-6)
+    parity.add_argument('--atol', type=float, default=1e-9)
+
+    reference = subparsers.add_parser('reference',
+                                      help='Compare against the scalar Dart reference (no Flutter needed)')
+    reference.add_argument('--rtol', type=float, default=1e-9)
+    reference.add_argument('--atol', type=float, default=1e-12)
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'parity':
+        return 0 if check_parity(args.fixture, args.rtol, args.atol) else 1
+    if args.command == 'reference':
+        return 0 if check_reference(args.rtol, args.atol) else 1
+
+    start_time = time.perf_counter()
+    X, paths = extract_directory(args.wav_dir, n_workers=args.workers)
+    elapsed = time.perf_counter() - start_time
+    save_features_csv(X, [recording_name(p) for p in paths], args.output, status=args.status)
+    print(f"✓ Extracted {len(paths)} recordings in {elapsed:.2f}s -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
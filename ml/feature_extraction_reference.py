@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Scalar Reference of the On-Device Feature Extractor
+
+Line-by-line Python transliteration of FeatureExtractionService in
+mobile_app/lib/services/feature_extraction_service.dart. Every loop,
+threshold, clamp, fallback and helper is kept as written in Dart
+(including the autocorrelation being recomputed for each feature group),
+so this file is the ground truth that the vectorized port in
+feature_extraction.py is checked against while the Dart side cannot be
+run here. The one concession to speed is that the inner sum of each
+autocorrelation lag is a dot product instead of a Python loop.
+
+extract_features_reference() returns the raw features, before the app's
+FeatureScaler.transform, like feature_extraction.extract_features().
+
+Usage:
+    python ml/feature_extraction.py reference
+"""
+
+import math
+
+import numpy as np
+
+
+def _mean(values: list) -> float:
+    if not values:
+        return 0.0
+    total = values[0]
+    for value in values[1:]:
+        total += value
+    return total / len(values)
+
+
+def _log10(x: float) -> float:
+    return math.log(x) / math.log(10)
+
+
+def _log2(x: float) -> float:
+    return math.log(x) / math.log(2)
+
+
+def _clamp(value: float, low: float, high: float) -> float:
+    return min(max(value, low), high)
+
+
+def _round(x: float) -> int:
+    """Dart's double.round() (ties away from zero) for non-negative values."""
+    floor = math.floor(x)
+    return int(floor) + (1 if x - floor >= 0.5 else 0)
+
+
+def _autocorrelation(samples: list) -> list:
+    max_lag = min(len(samples) // 4, 2000)
+    result = [0.0] * max_lag
+
+    mean = _mean(samples)
+    centered = np.array(samples) - mean
+
+    n = len(samples)
+    for lag in range(max_lag):
+        total = float(np.dot(centered[:n - lag], centered[lag:]))
+        result[lag] = total / (n - lag)
+
+    # Normalize (as in Dart, result[0] is re-read on every iteration)
+    if max_lag and result[0] > 0:
+        for i in range(len(result)):
+            result[i] /= result[0]
+
+    return result
+
+
+def _detect_periods(samples: list, sample_rate: int) -> list:
+    periods = []
+    min_period = sample_rate // 400
+    max_period = sample_rate // 80
+
+    autocorr = _autocorrelation(samples)
+
+    for i in range(min_period, min(max_period, len(autocorr) - 1)):
+        if autocorr[i] > autocorr[i - 1] and autocorr[i] > autocorr[i + 1]:
+            if autocorr[i] > 0.3:
+                periods.append(i)
+
+    return periods
+
+
+def _detect_peak_amplitudes(samples: list, sample_rate: int) -> list:
+    amplitudes = []
+    frame_size = sample_rate // 100
+
+    for i in range(0, len(samples) - frame_size, frame_size):
+        max_amp = 0.0
+        for j in range(i, i + frame_size):
+            amp = abs(samples[j])
+            if amp > max_amp:
+                max_amp = amp
+        if max_amp > 0.01:
+            amplitudes.append(max_amp)
+
+    return amplitudes
+
+
+def _f0_statistics(samples: list, sample_rate: int) -> dict:
+    periods = _detect_periods(samples, sample_rate)
+    default = {'f0_mean': 150.0, 'f0_max': 200.0, 'f0_min': 100.0}
+    if not periods:
+        return default
+
+    frequencies = [sample_rate / p for p in periods]
+    valid = [f for f in frequencies if 80 <= f <= 400]
+    if not valid:
+        return default
+
+    return {'f0_mean': _mean(valid), 'f0_max': max(valid), 'f0_min': min(valid)}
+
+
+def _jitter_features(samples: list, sample_rate: int) -> dict:
+    periods = _detect_periods(samples, sample_rate)
+    n = len(periods)
+    if n < 3:
+        return {'jitter_percent': 0.005, 'jitter_abs': 0.00003,
+                'rap': 0.003, 'ppq': 0.003, 'ddp': 0.009}
+
+    diffs = [float(abs(periods[i] - periods[i - 1])) for i in range(1, n)]
+    mean_period = _mean([float(p) for p in periods])
+    mean_diff = _mean(diffs)
+
+    jitter_percent = mean_diff / mean_period
+    jitter_abs = mean_diff / sample_rate
+
+    rap_sum = 0.0
+    for i in range(1, n - 1):
+        avg3 = (periods[i - 1] + periods[i] + periods[i + 1]) / 3
+        rap_sum += abs(periods[i] - avg3)
+    rap = rap_sum / ((n - 2) * mean_period)
+
+    ppq_sum = 0.0
+    for i in range(2, n - 2):
+        avg5 = (periods[i - 2] + periods[i - 1] + periods[i]
+                + periods[i + 1] + periods[i + 2]) / 5
+        ppq_sum += abs(periods[i] - avg5)
+    ppq = ppq_sum / ((n - 4) * mean_period) if n > 4 else rap
+
+    ddp = rap * 3
+
+    return {
+        'jitter_percent': _clamp(jitter_percent, 0.001, 0.05),
+        'jitter_abs': _clamp(jitter_abs, 0.00001, 0.0003),
+        'rap': _clamp(rap, 0.001, 0.03),
+        'ppq': _clamp(ppq, 0.001, 0.03),
+        'ddp': _clamp(ddp, 0.003, 0.09),
+    }
+
+
+def _shimmer_features(samples: list, sample_rate: int) -> dict:
+    amplitudes = _detect_peak_amplitudes(samples, sample_rate)
+    n = len(amplitudes)
+    if n < 3:
+        return {'shimmer': 0.025, 'shimmer_db': 0.25, 'apq3': 0.015,
+                'apq5': 0.018, 'apq': 0.024, 'dda': 0.045}
+
+    mean_amp = _mean(amplitudes)
+
+    diffs = [abs(amplitudes[i] - amplitudes[i - 1]) for i in range(1, n)]
+    shimmer = _mean(diffs) / mean_amp
+
+    db_sum = 0.0
+    for i in range(1, n):
+        if amplitudes[i] > 0 and amplitudes[i - 1] > 0:
+            db_sum += 20 * abs(_log10(amplitudes[i] / amplitudes[i - 1]))
+    shimmer_db = db_sum / (n - 1)
+
+    apq3_sum = 0.0
+    for i in range(1, n - 1):
+        avg3 = (amplitudes[i - 1] + amplitudes[i] + amplitudes[i + 1]) / 3
+        apq3_sum += abs(amplitudes[i] - avg3)
+    apq3 = apq3_sum / ((n - 2) * mean_amp)
+
+    apq5_sum = 0.0
+    for i in range(2, n - 2):
+        avg5 = (amplitudes[i - 2] + amplitudes[i - 1] + amplitudes[i]
+                + amplitudes[i + 1] + amplitudes[i + 2]) / 5
+        apq5_sum += abs(amplitudes[i] - avg5)
+    apq5 = apq5_sum / ((n - 4) * mean_amp) if n > 4 else apq3
+
+    apq = apq5
+    dda = apq3 * 3
+
+    return {
+        'shimmer': _clamp(shimmer, 0.01, 0.15),
+        'shimmer_db': _clamp(shimmer_db, 0.1, 1.5),
+        'apq3': _clamp(apq3, 0.005, 0.06),
+        'apq5': _clamp(apq5, 0.005, 0.08),
+        'apq': _clamp(apq, 0.005, 0.15),
+        'dda': _clamp(dda, 0.015, 0.18),
+    }
+
+
+def _noise_features(samples: list, sample_rate: int) -> dict:
+    autocorr = _autocorrelation(samples)
+
+    max_corr = 0.0
+    min_lag = sample_rate // 400
+    max_lag = sample_rate // 80
+    for lag in range(min_lag, min(max_lag, len(autocorr))):
+        if autocorr[lag] > max_corr:
+            max_corr = autocorr[lag]
+
+    max_corr = _clamp(max_corr, 0.01, 0.99)
+    hnr = 10 * _log10(max_corr / (1 - max_corr))
+    nhr = 1 / (abs(hnr) + 0.001)
+
+    return {'nhr': _clamp(nhr, 0.001, 0.4), 'hnr': _clamp(hnr, 10.0, 35.0)}
+
+
+def _rpde(samples: list) -> float:
+    frame_size = 160
+    energies = []
+    for i in range(0, len(samples) - frame_size, frame_size):
+        energy = 0.0
+        for j in range(i, i + frame_size):
+            energy += samples[j] * samples[j]
+        energies.append(energy / frame_size)
+
+    if not energies:
+        return 0.5
+    max_energy = max(energies)
+    if max_energy == 0:
+        return 0.5
+
+    n_bins = 20
+    histogram = [0] * n_bins
+    for e in energies:
+        histogram[_clamp(_round((e / max_energy) * (n_bins - 1)), 0, n_bins - 1)] += 1
+
+    entropy = 0.0
+    for count in histogram:
+        if count > 0:
+            p = count / len(energies)
+            entropy -= p * _log2(p)
+    return entropy / _log2(float(n_bins))
+
+
+def _linear_slope(x: list, y: list) -> float:
+    if len(x) != len(y) or not x:
+        return 0.0
+    x_mean = _mean(x)
+    y_mean = _mean(y)
+    ss_xy = ss_xx = 0.0
+    for i in range(len(x)):
+        ss_xy += (x[i] - x_mean) * (y[i] - y_mean)
+        ss_xx += (x[i] - x_mean) * (x[i] - x_mean)
+    return ss_xy / ss_xx if ss_xx > 0 else 0.0
+
+
+def _dfa(samples: list) -> float:
+    n = len(samples)
+    if n < 100:
+        return 0.72
+
+    integrated = [0.0] * n
+    total = 0.0
+    mean = _mean(samples)
+    for i in range(n):
+        total += samples[i] - mean
+        integrated[i] = total
+
+    log_n, log_f = [], []
+    for ws in (16, 32, 64, 128, 256):
+        if ws >= n // 4:
+            continue
+
+        num_windows = n // ws
+        fluctuation = 0.0
+        for w in range(num_windows):
+            start = w * ws
+            end = start + ws
+
+            x_mean = (ws - 1) / 2.0
+            y_mean = 0.0
+            for i in range(start, end):
+                y_mean += integrated[i]
+            y_mean /= ws
+
+            ss_xy = ss_xx = 0.0
+            for i in range(ws):
+                ss_xy += (i - x_mean) * (integrated[start + i] - y_mean)
+                ss_xx += (i - x_mean) * (i - x_mean)
+
+            slope = ss_xy / ss_xx if ss_xx > 0 else 0
+            intercept = y_mean - slope * x_mean
+
+            for i in range(ws):
+                diff = integrated[start + i] - (slope * i + intercept)
+                fluctuation += diff * diff
+
+        if num_windows > 0:
+            fluctuation = math.sqrt(fluctuation / (num_windows * ws))
+            log_n.append(_log10(float(ws)))
+            log_f.append(_log10(fluctuation + 0.0001))
+
+    if len(log_n) < 2:
+        return 0.72
+    return _clamp(_linear_slope(log_n, log_f), 0.5, 1.0)
+
+
+def _zero_crossing_rate(samples: list) -> float:
+    if len(samples) < 2:
+        return 0.0
+    crossings = 0
+    for i in range(1, len(samples)):
+        if (samples[i] >= 0 and samples[i - 1] < 0) or (samples[i] < 0 and samples[i - 1] >= 0):
+            crossings += 1
+    return crossings / len(samples)
+
+
+def _ppe(samples: list, sample_rate: int) -> float:
+    periods = _detect_periods(samples, sample_rate)
+    if len(periods) < 10:
+        return 0.2
+
+    min_period = min(periods)
+    period_range = max(periods) - min_period
+    if period_range == 0:
+        return 0.1
+
+    n_bins = 10
+    histogram = [0] * n_bins
+    for p in periods:
+        histogram[_clamp(_round((p - min_period) / period_range * (n_bins - 1)), 0, n_bins - 1)] += 1
+
+    entropy = 0.0
+    for count in histogram:
+        if count > 0:
+            prob = count / len(periods)
+            entropy -= prob * _log2(prob)
+    return entropy / _log2(float(n_bins))
+
+
+def _nonlinear_features(samples: list, sample_rate: int) -> dict:
+    rpde = _rpde(samples)
+    dfa = _dfa(samples)
+
+    f0 = _f0_statistics(samples, sample_rate)
+    spread1 = -5.0 - _log10(f0['f0_max'] - f0['f0_min'] + 1)
+    spread2 = 0.2 + 0.1 * (f0['f0_max'] - f0['f0_min']) / f0['f0_mean']
+
+    d2 = 2.0 + _clamp(_zero_crossing_rate(samples) * 2.0, 0.0, 1.5)
+    ppe = _ppe(samples, sample_rate)
+
+    return {
+        'rpde': _clamp(rpde, 0.3, 0.7),
+        'dfa': _clamp(dfa, 0.6, 0.85),
+        'spread1': _clamp(spread1, -7.0, -2.5),
+        'spread2': _clamp(spread2, 0.1, 0.5),
+        'd2': _clamp(d2, 1.5, 4.0),
+        'ppe': _clamp(ppe, 0.05, 0.55),
+    }
+
+
+def extract_features_reference(samples: np.ndarray, sample_rate: int = 16000) -> np.ndarray:
+    """The 22 raw features of one recording, computed exactly as the Dart service does."""
+    # Float32List elements read back as doubles
+    samples = np.asarray(samples, dtype=np.float32).astype(np.float64).tolist()
+
+    f0 = _f0_statistics(samples, sample_rate)
+    jitter = _jitter_features(samples, sample_rate)
+    shimmer = _shimmer_features(samples, sample_rate)
+    noise = _noise_features(samples, sample_rate)
+    nonlinear = _nonlinear_features(samples, sample_rate)
+
+    return np.array([
+        f0['f0_mean'], f0['f0_max'], f0['f0_min'],
+        jitter['jitter_percent'], jitter['jitter_abs'], jitter['rap'], jitter['ppq'], jitter['ddp'],
+        shimmer['shimmer'], shimmer['shimmer_db'], shimmer['apq3'], shimmer['apq5'],
+        shimmer['apq'], shimmer['dda'],
+        noise['nhr'], noise['hnr'],
+        nonlinear['rpde'], nonlinear['dfa'], nonlinear['spread1'], nonlinear['spread2'],
+        nonlinear['d2'], nonlinear['ppe'],
+    ])
+
+
+def synthetic_voice(f0: float, seconds: float, jitter: float = 0.01, noise: float = 0.02,
+                    seed: int = 0, sample_rate: int = 16000) -> np.ndarray:
+    """
+    Synthetic sustained vowel quantised like AudioRecordingService (int16 / 32768).
+
+    Same generator as feature_parity_export_test.dart, with NumPy's RNG in
+    place of dart:math Random.
+    """
+    rng = np.random.default_rng(seed)
+    n = round(seconds * sample_rate)
+    drift = np.cumsum(jitter * (rng.random(n) - 0.5) / math.sqrt(n))
+    phase = np.cumsum(2 * math.pi * f0 * (1 + drift) / sample_rate)
+    value = sum(np.sin(k * phase) / k for k in range(1, 6))
+    envelope = 0.4 + 0.1 * np.sin(2 * math.pi * 3 * np.arange(n) / sample_rate)
+    value = 0.5 * value * envelope + noise * (rng.random(n) * 2 - 1)
+    pcm = np.clip(np.round(value * 32767), -32768, 32767)
+    return (pcm / 32768.0).astype(np.float32)
+
+
+def reference_cases() -> dict:
+    """
+    The recordings of feature_parity_export_test.dart, plus a few more.
+
+    Voiced recordings at normal levels rarely get past the 0.3 peak
+    threshold (the Dart autocorrelation keeps its covariance scale), so a
+    full-scale square wave is added to exercise the jitter and PPE paths.
+    """
+    rng = np.random.default_rng(7)
+    square = 0.9 * np.sign(synthetic_voice(1100, 1.0, jitter=0.05, noise=0.0, seed=7))
+    square = np.round((square + 0.05 * (rng.random(len(square)) * 2 - 1)) * 32767) / 32768
+    return {
+        'vowel_120hz': synthetic_voice(120, 1.5, seed=1),
+        'vowel_220hz_jittery': synthetic_voice(220, 1.0, jitter=0.05, seed=2),
+        'vowel_160hz_noisy': synthetic_voice(160, 1.2, noise=0.4, seed=3),
+        'vowel_90hz_long': synthetic_voice(90, 3.0, seed=4),
+        'vowel_140hz_loud': np.clip(synthetic_voice(140, 1.0, seed=5) * 4, -1, 1),
+        'square_1100hz_full_scale': square.astype(np.float32),
+        'near_silence': synthetic_voice(150, 0.5, noise=0.0, seed=6) * 0.01,
+        'silence': np.zeros(16000, dtype=np.float32),
+    }
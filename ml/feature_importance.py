@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Permutation Feature Importance
+
+Measures how much each of the 22 voice features drives the detector: the
+drop in test AUC (and accuracy) when that feature's column is shuffled.
+This tells us which expensive on-device features (RPDE, DFA, D2) could be
+dropped from the app.
+
+Instead of one model.predict per feature per repeat, every permuted copy
+of X_test (n_features x n_repeats of them) is built into one stacked
+array and scored in a single large predict. The stack is split into
+chunks of at most `max_rows` rows, which bounds memory for large test
+sets. AUC is computed for all copies at once from per-row ranks.
+
+Outputs (OUTPUT_DIR):
+    feature_importance.csv   features ranked by mean AUC drop
+    feature_importance.png   bar chart with the spread over repeats
+
+Usage:
+    python ml/feature_importance.py --repeats 20
+    python ml/feature_importance.py --compare-naive
+"""
+
+import os
+import csv
+import time
+import argparse
+
+import numpy as np
+
+import train_parkinson_model as tpm
+from plot_renderer import PlotRenderer, render_feature_importance
+
+CSV_PATH = os.path.join(tpm.OUTPUT_DIR, 'feature_importance.csv')
+PLOT_PATH = os.path.join(tpm.OUTPUT_DIR, 'feature_importance.png')
+DEFAULT_MODEL_PATH = os.path.join(tpm.OUTPUT_DIR, 'parkinson_model_v1.0.keras')
+
+# Features that cost the most to compute on the phone
+EXPENSIVE_FEATURES = ('RPDE', 'DFA', 'D2')
+
+
+def _auc_rows(y_true: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    """ROC AUC of each row of `scores` (n_copies, n) against the same labels."""
+    from scipy.stats import rankdata
+    positive = y_true == 1
+    n_pos, n_neg = positive.sum(), (~positive).sum()
+    ranks = rankdata(scores, axis=1)  # ties get their average rank
+    return (ranks[:, positive].sum(axis=1) - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+def _accuracy_rows(y_true: np.ndarray, scores: np.ndarray) -> np.ndarray:
+    return ((scores >= 0.5) == (y_true == 1)).mean(axis=1)
+
+
+def permutation_importance(predict_fn, X: np.ndarray, y: np.ndarray, n_repeats: int = 10,
+                           seed: int = 42, max_rows: int = 1_000_000) -> dict:
+    """
+    Permutation importance of every column of X.
+
+    `predict_fn` maps an (m, n_features) array to m probabilities. It is
+    called once per chunk of at most `max_rows` rows (and once for the
+    baseline). Returns baseline scores plus (n_features, n_repeats) arrays
+    of AUC and accuracy drops.
+    """
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y).astype(int)
+    n, n_features = X.shape
+    n_copies = n_features * n_repeats
+    copies_per_chunk = max(1, max_rows // n)
+
+    baseline = np.asarray(predict_fn(X)).reshape(1, n)
+    baseline_auc = float(_auc_rows(y, baseline)[0])
+    baseline_accuracy = float(_accuracy_rows(y, baseline)[0])
+
+    # Copy i permutes feature i // n_repeats. The random stream is read in
+    # copy order, so results do not depend on the chunk size.
+    rng = np.random.default_rng(seed)
+    auc_drop = np.empty(n_copies)
+    accuracy_drop = np.empty(n_copies)
+    n_calls = 0
+    for start in range(0, n_copies, copies_per_chunk):
+        k = min(copies_per_chunk, n_copies - start)
+        features = np.arange(start, start + k) // n_repeats
+        permutations = np.argsort(rng.random((k, n)), axis=1)
+
+        stacked = np.broadcast_to(X, (k, n, n_features)).copy()
+        stacked[np.arange(k)[:, None], np.arange(n)[None, :], features[:, None]] = \
+            X[permutations, features[:, None]]
+        scores = np.asarray(predict_fn(stacked.reshape(k * n, n_features))).reshape(k, n)
+        n_calls += 1
+
+        auc_drop[start:start + k] = baseline_auc - _auc_rows(y, scores)
+        accuracy_drop[start:start + k] = baseline_accuracy - _accuracy_rows(y, scores)
+
+    return {
+        'baseline_auc': baseline_auc,
+        'baseline_accuracy': baseline_accuracy,
+        'auc_drop': auc_drop.reshape(n_features, n_repeats),
+        'accuracy_drop': accuracy_drop.reshape(n_features, n_repeats),
+        'predict_calls': n_calls + 1,
+        'rows_scored': n * (n_copies + 1),
+    }
+
+
+def naive_permutation_importance(predict_fn, X: np.ndarray, y: np.ndarray,
+                                 n_repeats: int = 10, seed: int = 42) -> dict:
+    """Reference loop: one predict per feature per repeat, same permutations."""
+    X = np.asarray(X, dtype=np.float32)
+    y = np.asarray(y).astype(int)
+    n, n_features = X.shape
+    rng = np.random.default_rng(seed)
+    baseline_auc = float(_auc_rows(y, np.asarray(predict_fn(X)).reshape(1, n))[0])
+    auc_drop = np.empty((n_features, n_repeats))
+    for j in range(n_features):
+        for r in range(n_repeats):
+            X_permuted = X.copy()
+            X_permuted[:, j] = X[np.argsort(rng.random(n)), j]
+            scores = np.asarray(predict_fn(X_permuted)).reshape(1, n)
+            auc_drop[j, r] = baseline_auc - _auc_rows(y, scores)[0]
+    return {'auc_drop': auc_drop}
+
+
+def save_importance(result: dict, feature_names: list, renderer: PlotRenderer = None) -> list:
+    """Write the ranked CSV and bar chart; returns the rows in rank order."""
+    auc_drop, accuracy_drop = result['auc_drop'], result['accuracy_drop']
+    order = np.argsort(-auc_drop.mean(axis=1), kind='stable')
+    rows = [{
+        'rank': rank + 1,
+        'feature': feature_names[j],
+        'auc_drop_mean': float(auc_drop[j].mean()),
+        'auc_drop_std': float(auc_drop[j].std()),
+        'accuracy_drop_mean': float(accuracy_drop[j].mean()),
+        'accuracy_drop_std': float(accuracy_drop[j].std()),
+    } for rank, j in enumerate(order)]
+
+    with open(CSV_PATH, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+    print(f"\n✓ Ranked importances saved to: {CSV_PATH}")
+
+    renderer = renderer or PlotRenderer(asynchronous=False)
+    renderer.submit(render_feature_importance, list(feature_names), auc_drop.mean(axis=1),
+                    auc_drop.std(axis=1), 'AUC', PLOT_PATH, label='Feature importance')
+    return rows
+
+
+def run_importance(model_path: str, X_test: np.ndarray, y_test: np.ndarray,
+                   feature_names: list, n_repeats: int = 10, max_rows: int = 1_000_000,
+                   renderer: PlotRenderer = None, compare_naive: bool = False) -> list:
+    """Score the saved model's permutation importances and write the outputs."""
+    tpm._import_tensorflow()
+    from tensorflow import keras
+
+    print("\n" + "=" * 60)
+    print("Permutation Feature Importance")
+    print("=" * 60)
+
+    model = keras.models.load_model(model_path)
+
+    def predict_fn(X):
+        return model.predict(X, batch_size=8192, verbose=0).ravel()
+
+    start_time = time.perf_counter()
+    result = permutation_importance(predict_fn, X_test, y_test, n_repeats=n_repeats,
+                                    max_rows=max_rows)
+    elapsed = time.perf_counter() - start_time
+
+    print(f"\n  Baseline: AUC {result['baseline_auc']:.4f}, "
+          f"accuracy {result['baseline_accuracy']*100:.2f}%")
+    print(f"  Scored {result['rows_scored']:,} rows in {result['predict_calls']} predict "
+          f"calls ({elapsed:.2f}s, {len(feature_names)} features x {n_repeats} repeats)")
+
+    if compare_naive:
+        start_time = time.perf_counter()
+        naive = naive_permutation_importance(predict_fn, X_test, y_test, n_repeats=n_repeats)
+        naive_elapsed = time.perf_counter() - start_time
+        print(f"  Naive loop: {len(feature_names) * n_repeats + 1} predict calls in "
+              f"{naive_elapsed:.2f}s ({naive_elapsed / elapsed:.1f}x slower), "
+              f"max |Δ| {np.abs(naive['auc_drop'] - result['auc_drop']).max():.2e}")
+
+    rows = save_importance(result, feature_names, renderer=renderer)
+
+    print("\n📊 Features ranked by AUC drop (* = expensive on-device feature):")
+    print(f"  {'#':>3}  {'Feature':<18}{'ΔAUC':>16}{'ΔAccuracy':>18}")
+    for row in rows:
+        marker = '*' if row['feature'] in EXPENSIVE_FEATURES else ' '
+        print(f"  {row['rank']:>3}{marker} {row['feature']:<18}"
+              f"{row['auc_drop_mean']:>+9.4f} ± {row['auc_drop_std']:.4f}"
+              f"{row['accuracy_drop_mean']*100:>+10.2f}% ± {row['accuracy_drop_std']*100:.2f}")
+    return rows
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Batched permutation feature importance")
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help='Trained .keras model')
+    parser.add_argument('--repeats', type=int, default=10, help='Permutations per feature')
+    parser.add_argument('--max-rows', type=int, default=1_000_000,
+                        help='Rows per stacked predict call (bounds memory)')
+    parser.add_argument('--compare-naive', action='store_true',
+                        help='Also time the one-predict-per-permutation loop')
+    args = parser.parse_args(argv)
+
+    X, y, feature_names = tpm.load_and_preprocess_data(tpm.DATA_PATH)
+    (_, _, X_test, _, _, y_test, _) = tpm.load_scaled_splits(X, y)
+    run_importance(args.model, X_test, y_test, feature_names, n_repeats=args.repeats,
+                   max_rows=args.max_rows, compare_naive=args.compare_naive)
+
+
+if __name__ == '__main__':
+    main()
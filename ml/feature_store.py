@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Persistent Voice Feature Store
+
+Caches extracted voice features per recording so a retrain over an
+unchanged archive does not re-run feature extraction. Entries are keyed by
+the SHA-256 of the audio file, the extractor version
+(feature_extraction.EXTRACTOR_VERSION) and the extraction variant (whole
+recording or a sliding-window setup). Each entry holds its feature rows
+as compact float32.
+
+The store is a single SQLite file (standard library, transactional, cheap
+to update per entry). The total payload is bounded: once it exceeds
+max_bytes, least-recently-used entries are evicted. File hashes are
+memoised against size and mtime, as in dataset_cache.py, so unchanged
+recordings are not re-read. Hits, misses and evictions are counted per
+session and across runs.
+
+Rows always pass through float32, on hits and misses alike, so X does not
+depend on the cache state.
+
+Layout:
+    data/processed/features/
+        features.sqlite   # entries, path -> hash memo, counters
+
+Usage:
+    python ml/feature_store.py extract recordings/ --status 1 --output features.csv
+    python ml/feature_store.py stats
+    python ml/feature_store.py prune      # drop entries from older extractor versions
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import feature_extraction as fx
+from dataset_cache import PROJECT_DIR, file_sha256
+from feature_extraction import FEATURE_NAMES, EXTRACTOR_VERSION
+from streaming_features import extract_file_stream
+
+FEATURE_STORE_DIR = os.path.join(PROJECT_DIR, 'data', 'processed', 'features')
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Bookkeeping bytes charged per entry on top of its rows
+_ENTRY_OVERHEAD_BYTES = 128
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    audio_sha256 TEXT NOT NULL,
+    version      TEXT NOT NULL,
+    variant      TEXT NOT NULL,
+    n_rows       INTEGER NOT NULL,
+    data         BLOB NOT NULL,
+    size         INTEGER NOT NULL,
+    last_access  REAL NOT NULL,
+    PRIMARY KEY (audio_sha256, version, variant)
+);
+CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_access);
+CREATE TABLE IF NOT EXISTS paths (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    sha256   TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+def variant_name(window_sec: float = None, hop_sec: float = None) -> str:
+    """Cache variant for an extraction setup ('full' or the window parameters)."""
+    if window_sec is None:
+        return 'full'
+    return f'window={window_sec:g},hop={hop_sec or window_sec:g}'
+
+
+class FeatureStore:
+    """Size-bounded LRU store of float32 feature rows keyed by audio content."""
+
+    def __init__(self, store_dir: str = FEATURE_STORE_DIR, max_bytes: int = DEFAULT_MAX_BYTES,
+                 version: str = EXTRACTOR_VERSION):
+        os.makedirs(store_dir, exist_ok=True)
+        self.path = os.path.join(store_dir, 'features.sqlite')
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(_SCHEMA)
+
+    # -- keys ----------------------------------------------------------------
+
+    def audio_keys(self, paths: list) -> list:
+        """SHA-256 of each audio file, memoised on (size, mtime) so unchanged files aren't re-read."""
+        keys, updates = [], []
+        for path in paths:
+            path = os.path.abspath(path)
+            stat = os.stat(path)
+            row = self._db.execute('SELECT size, mtime_ns, sha256 FROM paths WHERE path = ?',
+                                   (path,)).fetchone()
+            if row and row[0] == stat.st_size and row[1] == stat.st_mtime_ns:
+                keys.append(row[2])
+                continue
+            sha256 = file_sha256(path)
+            keys.append(sha256)
+            updates.append((path, stat.st_size, stat.st_mtime_ns, sha256))
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO paths VALUES (?, ?, ?, ?)', updates)
+        return keys
+
+    # -- entries -------------------------------------------------------------
+
+    def get_many(self, keys: list, variant: str = 'full') -> dict:
+        """Rows for each cached key ({key: (n_rows, 22) float32}); refreshes their LRU position."""
+        found = {}
+        for key in set(keys):
+            row = self._db.execute(
+                'SELECT n_rows, data FROM entries WHERE audio_sha256 = ? AND version = ? AND variant = ?',
+                (key, self.version, variant)).fetchone()
+            if row:
+                found[key] = np.frombuffer(row[1], dtype=np.float32).reshape(row[0], len(FEATURE_NAMES))
+        now = time.time()
+        with self._db:
+            self._db.executemany(
+                'UPDATE entries SET last_access = ? WHERE audio_sha256 = ? AND version = ? AND variant = ?',
+                [(now, key, self.version, variant) for key in found])
+        n_hits = sum(key in found for key in keys)
+        self.hits += n_hits
+        self.misses += len(keys) - n_hits
+        self._bump_counters(hits=n_hits, misses=len(keys) - n_hits)
+        return found
+
+    def put_many(self, rows_by_key: dict, variant: str = 'full') -> None:
+        """Store rows for each key, then evict down to the size budget."""
+        now = time.time()
+        records = []
+        for key, rows in rows_by_key.items():
+            data = np.ascontiguousarray(rows, dtype=np.float32).tobytes()
+            records.append((key, self.version, variant, len(rows), data,
+                            len(data) + _ENTRY_OVERHEAD_BYTES, now))
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)', records)
+        self.evict()
+
+    def total_bytes(self) -> int:
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def evict(self) -> int:
+        """
+        Drop least-recently-used entries while the store exceeds max_bytes.
+
+        Evicts down to 90% of the budget so a full store does not evict on
+        every insert.
+        """
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        target = excess + self.max_bytes // 10
+        victims, freed = [], 0
+        for rowid, size in self._db.execute('SELECT rowid, size FROM entries ORDER BY last_access'):
+            victims.append((rowid,))
+            freed += size
+            if freed >= target:
+                break
+        with self._db:
+            self._db.executemany('DELETE FROM entries WHERE rowid = ?', victims)
+        self.evictions += len(victims)
+        self._bump_counters(evictions=len(victims))
+        return len(victims)
+
+    def prune(self) -> int:
+        """Delete entries written by other extractor versions."""
+        with self._db:
+            cursor = self._db.execute('DELETE FROM entries WHERE version != ?', (self.version,))
+        return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._db:
+            self._db.execute('DELETE FROM entries')
+            self._db.execute('DELETE FROM counters')
+        self._db.execute('VACUUM')
+
+    # -- statistics ----------------------------------------------------------
+
+    def _bump_counters(self, **deltas) -> None:
+        with self._db:
+            self._db.executemany(
+                'INSERT INTO counters VALUES (?, ?) '
+                'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+                [(name, delta) for name, delta in deltas.items() if delta])
+
+    def stats(self) -> dict:
+        totals = dict(self._db.execute('SELECT name, value FROM counters').fetchall())
+        n_entries, n_current = self._db.execute(
+            'SELECT COUNT(*), COALESCE(SUM(version = ?), 0) FROM entries', (self.version,)).fetchone()
+        lookups = self.hits + self.misses
+        total_lookups = totals.get('hits', 0) + totals.get('misses', 0)
+        return {
+            'session': {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                        'hit_rate': self.hits / lookups if lookups else None},
+            'lifetime': {'hits': totals.get('hits', 0), 'misses': totals.get('misses', 0),
+                         'evictions': totals.get('evictions', 0),
+                         'hit_rate': totals.get('hits', 0) / total_lookups if total_lookups else None},
+            'entries': n_entries,
+            'entries_current_version': n_current,
+            'bytes': self.total_bytes(),
+            'max_bytes': self.max_bytes,
+            'version': self.version,
+        }
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def _load_rows(paths: list, store: FeatureStore, window_sec: float = None,
+               hop_sec: float = None, n_workers: int = None) -> list:
+    """Per-recording float32 row arrays, extracting only what the store lacks."""
+    variant = variant_name(window_sec, hop_sec)
+    keys = store.audio_keys(paths)
+    cached = store.get_many(keys, variant)
+
+    # One extraction per distinct missing recording
+    missing = {}
+    for path, key in zip(paths, keys):
+        if key not in cached:
+            missing.setdefault(key, path)
+    extracted = {}
+    if missing:
+        n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(missing)))
+        args = [(path, window_sec, hop_sec) for path in missing.values()]
+        if n_workers == 1:
+            results = [extract_file_stream(*a) for a in args]
+        else:
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+                results = list(pool.map(extract_file_stream, *zip(*args)))
+        extracted = {key: rows.astype(np.float32) for key, (_, rows) in zip(missing, results)}
+        store.put_many(extracted, variant)
+
+    return [cached[key] if key in cached else extracted[key] for key in keys]
+
+
+def load_recordings(paths: list, labels: list = None, store: FeatureStore = None,
+                    window_sec: float = None, hop_sec: float = None,
+                    n_workers: int = None) -> tuple:
+    """
+    Features for `paths`, extracting only recordings missing from the store.
+
+    Returns (X, y, feature_names) in the load_and_preprocess_data format:
+    X is float64 (values rounded through float32), y repeats each
+    recording's label for its rows (None without `labels`).
+    """
+    own_store = store is None
+    store = store or FeatureStore()
+    try:
+        rows = _load_rows(paths, store, window_sec, hop_sec, n_workers)
+    finally:
+        if own_store:
+            store.close()
+
+    X = np.vstack(rows).astype(np.float64) if rows else np.zeros((0, len(FEATURE_NAMES)))
+    y = None
+    if labels is not None:
+        y = np.concatenate([np.full(len(r), label, dtype=np.int64)
+                            for r, label in zip(rows, labels)])
+    return X, y, list(FEATURE_NAMES)
+
+
+def _print_stats(stats: dict) -> None:
+    def rate(value):
+        return f"{value:.1%}" if value is not None else 'n/a'
+
+    session, lifetime = stats['session'], stats['lifetime']
+    print(f"\n📊 Feature store (extractor v{stats['version']})")
+    print("-" * 40)
+    print(f"  Session:  {session['hits']} hits, {session['misses']} misses "
+          f"(hit rate {rate(session['hit_rate'])}), {session['evictions']} evicted")
+    print(f"  Lifetime: {lifetime['hits']} hits, {lifetime['misses']} misses "
+          f"(hit rate {rate(lifetime['hit_rate'])}), {lifetime['evictions']} evicted")
+    print(f"  Entries:  {stats['entries']} ({stats['entries_current_version']} current version)")
+    print(f"  Size:     {stats['bytes'] / 1024:.1f} KB of {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Persistent voice feature store")
+    parser.add_argument('--store-dir', default=FEATURE_STORE_DIR)
+    parser.add_argument('--max-mb', type=float, default=DEFAULT_MAX_BYTES / 1024 / 1024,
+                        help='Size budget before LRU eviction')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    extract = subparsers.add_parser('extract', help='Features for a WAV directory, using the store')
+    extract.add_argument('wav_dir')
+    extract.add_argument('--output', default='features.csv', help='Output CSV path')
+    extract.add_argument('--window', type=float, default=None, help='Sliding window length (s)')
+    extract.add_argument('--hop', type=float, default=None, help='Hop between windows (s)')
+    extract.add_argument('--workers', type=int, default=None, help='Worker processes for misses')
+    extract.add_argument('--status', type=int, choices=[0, 1], default=None,
+                         help="Label to record for every row (0 healthy, 1 Parkinson's)")
+    subparsers.add_parser('stats', help='Show hit/miss statistics and size')
+    subparsers.add_parser('prune', help='Delete entries from other extractor versions')
+    subparsers.add_parser('clear', help='Delete every entry and reset the counters')
+    args = parser.parse_args(argv)
+
+    with FeatureStore(args.store_dir, max_bytes=int(args.max_mb * 1024 * 1024)) as store:
+        if args.command == 'extract':
+            paths = sorted(
+                os.path.join(root, name)
+                for root, _, files in os.walk(args.wav_dir)
+                for name in files if name.lower().endswith('.wav')
+            )
+            start_time = time.perf_counter()
+            rows = _load_rows(paths, store, window_sec=args.window, hop_sec=args.hop,
+                              n_workers=args.workers)
+            elapsed = time.perf_counter() - start_time
+
+            # Row names as streaming_features.py gives them
+            names = []
+            for path, recording_rows in zip(paths, rows):
+                name = fx.recording_name(path)
+                if args.window is None:
+                    names.append(name)
+                else:
+                    hop = args.hop or args.window
+                    names.extend(f"{name}@{i * hop:.2f}s" for i in range(len(recording_rows)))
+            X = np.vstack(rows) if rows else np.zeros((0, len(FEATURE_NAMES)), dtype=np.float32)
+            fx.save_features_csv(X.astype(np.float64), names, args.output, status=args.status)
+            print(f"✓ {len(paths)} recordings -> {len(names)} rows in {elapsed:.2f}s -> {args.output}")
+        elif args.command == 'prune':
+            print(f"✓ Removed {store.prune()} entries from other extractor versions")
+        elif args.command == 'clear':
+            store.clear()
+            print("✓ Feature store cleared")
+        _print_stats(store.stats())
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Hyperparameter Search for the Parkinson's Detector
+
+Random search over the build_model / train_model hyperparameters (layer
+widths, dropout, L2, learning rate, batch size). Trials run concurrently in
+a process pool, each pinned to its share of the CPU cores.
+
+Losing trials are pruned early: every few epochs a trial compares its best
+val_auc so far against the median of completed trials at the same epoch and
+stops if it is below. Finished and pruned trials are appended to
+outputs/hparam_search/trials.jsonl, so an interrupted search resumes where
+it left off instead of starting over.
+
+Usage:
+    python ml/hyperparameter_search.py --trials 40 --workers 8
+"""
+
+import os
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+import train_parkinson_model as tpm
+
+SEARCH_DIR = os.path.join(tpm.OUTPUT_DIR, 'hparam_search')
+TRIALS_PATH = os.path.join(SEARCH_DIR, 'trials.jsonl')
+
+# Candidate values per hyperparameter. Learning rate and L2 are sampled
+# log-uniformly between the bounds.
+SEARCH_SPACE = {
+    'units_1': [32, 64, 128],
+    'units_2': [16, 32, 64],
+    'units_3': [8, 16, 32],
+    'dropout': [0.1, 0.2, 0.3, 0.4, 0.5],
+    'l2': (1e-4, 1e-2),
+    'learning_rate': (1e-4, 1e-2),
+    'batch_size': [8, 16, 32, 64],
+}
+
+
+def sample_trials(n_trials: int, seed: int = 42) -> list:
+    """
+    Draw `n_trials` hyperparameter configurations.
+
+    Sampling is deterministic for a given seed, so a resumed search sees
+    the same configurations in the same order.
+    """
+    rng = np.random.default_rng(seed)
+    trials = []
+    for _ in range(n_trials):
+        params = {}
+        for name, space in SEARCH_SPACE.items():
+            if isinstance(space, tuple):
+                low, high = np.log10(space[0]), np.log10(space[1])
+                params[name] = float(10 ** rng.uniform(low, high))
+            else:
+                params[name] = space[int(rng.integers(len(space)))]
+                if isinstance(params[name], np.generic):
+                    params[name] = params[name].item()
+        trials.append(params)
+    return trials
+
+
+def trial_key(params: dict) -> str:
+    """Stable identifier for a configuration, used to detect finished trials."""
+    payload = json.dumps(params, sort_keys=True).encode('utf-8')
+    return hashlib.sha1(payload).hexdigest()[:12]
+
+
+def load_trials(trials_path: str = TRIALS_PATH) -> list:
+    """Load all persisted trial records (completed and pruned)."""
+    if not os.path.exists(trials_path):
+        return []
+    records = []
+    with open(trials_path) as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    return records
+
+
+def append_trial(record: dict, trials_path: str = TRIALS_PATH) -> None:
+    """Append one trial record; the file is only written by the parent process."""
+    with open(trials_path, 'a') as f:
+        f.write(json.dumps(record) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class MedianPruningCallback(keras.callbacks.Callback):
+    """
+    Stop a trial whose best val_auc falls below the median of completed trials.
+
+    Completed trials are read from the shared trials file, so pruning
+    decisions improve as the search progresses. No trial is pruned before
+    `warmup_epochs` or until `min_trials` have completed.
+    """
+
+    def __init__(self, trials_path: str, warmup_epochs: int = 10,
+                 interval: int = 5, min_trials: int = 3):
+        super().__init__()
+        self.trials_path = trials_path
+        self.warmup_epochs = warmup_epochs
+        self.interval = interval
+        self.min_trials = min_trials
+        self.best_auc = -np.inf
+        self.pruned_at = None
+
+    def _median_at(self, epoch: int) -> float:
+        curves = [r['val_auc_curve'] for r in load_trials(self.trials_path)
+                  if r['status'] == 'complete']
+        if len(curves) < self.min_trials:
+            return None
+        # Best val_auc each trial had reached by this epoch. Trials that
+        # stopped earlier keep their final best.
+        best_so_far = [max(c[:epoch + 1]) for c in curves if c]
+        return float(np.median(best_so_far))
+
+    def on_epoch_end(self, epoch, logs=None):
+        logs = logs or {}
+        self.best_auc = max(self.best_auc, logs.get('val_auc', -np.inf))
+        if epoch < self.warmup_epochs or (epoch + 1) % self.interval:
+            return
+        median = self._median_at(epoch)
+        if median is not None and self.best_auc < median:
+            self.pruned_at = epoch + 1
+            self.model.stop_training = True
+
+
+def _run_trial(key: str, params: dict, X_train: np.ndarray, y_train: np.ndarray,
+               X_val: np.ndarray, y_val: np.ndarray, max_epochs: int,
+               n_threads: int, trials_path: str) -> dict:
+    """Train one configuration in a worker process and return its record."""
+    tpm.pin_tf_threads(n_threads)
+    np.random.seed(42)
+    tf.random.set_seed(42)
+
+    start_time = time.perf_counter()
+    model = tpm.build_model(
+        input_dim=X_train.shape[1],
+        units=(params['units_1'], params['units_2'], params['units_3']),
+        dropout=params['dropout'],
+        l2=params['l2'],
+        learning_rate=params['learning_rate'],
+    )
+    pruner = MedianPruningCallback(trials_path)
+    history = tpm.train_model(
+        model, X_train, y_train, X_val, y_val,
+        checkpoint_path=None, verbose=0,
+        epochs=max_epochs, batch_size=params['batch_size'],
+        extra_callbacks=[pruner],
+    )
+
+    val_auc_curve = [float(v) for v in history.history['val_auc']]
+    return {
+        'key': key,
+        'params': params,
+        'status': 'pruned' if pruner.pruned_at else 'complete',
+        'epochs': len(val_auc_curve),
+        'best_val_auc': max(val_auc_curve),
+        'val_auc_curve': val_auc_curve,
+        'wall_time_sec': time.perf_counter() - start_time,
+    }
+
+
+def run_search(X_train: np.ndarray, y_train: np.ndarray,
+               X_val: np.ndarray, y_val: np.ndarray,
+               n_trials: int = 40, n_workers: int = None,
+               max_epochs: int = 100, seed: int = 42,
+               trials_path: str = TRIALS_PATH) -> dict:
+    """
+    Run (or resume) the search and return the best completed trial.
+
+    Trials already recorded in `trials_path` are skipped.
+    """
+    print("\n" + "=" * 60)
+    print("Hyperparameter Search")
+    print("=" * 60)
+
+    os.makedirs(os.path.dirname(trials_path), exist_ok=True)
+    done = {r['key'] for r in load_trials(trials_path)}
+    pending = [(trial_key(p), p) for p in sample_trials(n_trials, seed)]
+    pending = [(k, p) for k, p in pending if k not in done]
+
+    n_cores = os.cpu_count() or 1
+    if n_workers is None:
+        n_workers = n_cores
+    n_workers = max(1, min(n_workers, len(pending) or 1))
+    n_threads = max(1, n_cores // n_workers)
+
+    print(f"\n  Trials:  {n_trials} ({n_trials - len(pending)} already recorded, "
+          f"{len(pending)} to run)")
+    print(f"  Workers: {n_workers} (TF threads per worker: {n_threads})")
+    print(f"  Results: {trials_path}")
+
+    start_time = time.perf_counter()
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(_run_trial, key, params, X_train, y_train, X_val, y_val,
+                        max_epochs, n_threads, trials_path)
+            for key, params in pending
+        ]
+        for future in as_completed(futures):
+            record = future.result()
+            append_trial(record, trials_path)
+            print(f"  [{record['key']}] {record['status']:<8} "
+                  f"val_auc={record['best_val_auc']:.4f} "
+                  f"epochs={record['epochs']:>3} "
+                  f"({record['wall_time_sec']:.1f}s)")
+    elapsed = time.perf_counter() - start_time
+
+    records = load_trials(trials_path)
+    completed = sorted((r for r in records if r['status'] == 'complete'),
+                       key=lambda r: r['best_val_auc'], reverse=True)
+    n_pruned = sum(r['status'] == 'pruned' for r in records)
+
+    print(f"\n📊 Search finished in {elapsed:.1f}s "
+          f"({len(completed)} complete, {n_pruned} pruned)")
+    print("-" * 40)
+    for rank, r in enumerate(completed[:5], start=1):
+        print(f"  {rank}. val_auc={r['best_val_auc']:.4f}  {r['params']}")
+
+    if not completed:
+        return {}
+
+    best = completed[0]
+    best_path = os.path.join(os.path.dirname(trials_path), 'best_params.json')
+    with open(best_path, 'w') as f:
+        json.dump(best, f, indent=2)
+    print(f"\n✓ Best parameters saved to: {best_path}")
+
+    return best
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Hyperparameter search for the Parkinson's detector")
+    parser.add_argument('--trials', type=int, default=40, help='Number of configurations to try')
+    parser.add_argument('--workers', type=int, default=None, help='Concurrent trials (default: CPU count)')
+    parser.add_argument('--max-epochs', type=int, default=100, help='Epoch budget per trial')
+    parser.add_argument('--seed', type=int, default=42, help='Sampling seed (keep fixed to resume)')
+    parser.add_argument('--trials-path', default=TRIALS_PATH, help='JSONL file for trial records')
+    args = parser.parse_args(argv)
+
+    X, y, _ = tpm.load_and_preprocess_data(tpm.DATA_PATH)
+    (X_train, X_val, _,
+     y_train, y_val, _, _) = tpm.prepare_data_splits(X, y, save_scaler=False)
+
+    run_search(X_train, y_train, X_val, y_val,
+               n_trials=args.trials, n_workers=args.workers,
+               max_epochs=args.max_epochs, seed=args.seed,
+               trials_path=args.trials_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Incremental Warm-Start Retraining
+
+Updates the trained detector with a new batch of labelled screenings
+instead of retraining from random init on everything:
+
+    1. Load outputs/best_model.keras and outputs/scaler.joblib.
+    2. Update the scaler with the new training rows only
+       (StandardScaler.partial_fit; the statistics are exact, as if it had
+       been fitted on old + new rows).
+    3. Rebase the first Dense layer on the new scaler statistics, so the
+       warm-started model computes the same function as before the update:
+       W' = (s1 / s0)[:, None] * W,  b' = b + ((m1 - m0) / s0) @ W.
+    4. Fine-tune for a few epochs at a low learning rate on the new rows plus
+       a replay sample of old training rows, which guards against forgetting.
+
+The new data is a CSV in the parkinsons.data layout and is split 70/15/15
+like the original data. Validation and test sets are old + new. Unless
+--no-compare is given, a full retrain from scratch on old + new training
+rows is run as well, and wall time and test metrics of the two are
+reported side by side.
+
+Outputs go to outputs/incremental/. With --promote, the updated model and
+scaler replace best_model.keras and scaler.joblib, so the next batch builds
+on them. Append the new rows to data/raw once they are promoted, so the
+next run replays them as old data.
+
+Usage:
+    python ml/incremental_retrain.py --new-data data/raw/screenings_2026_10.csv
+    python ml/incremental_retrain.py --new-data new.csv --epochs 5 --replay-ratio 2 --promote
+"""
+
+import os
+import copy
+import json
+import time
+import shutil
+import argparse
+
+import numpy as np
+
+import train_parkinson_model as tpm
+
+INCREMENTAL_DIR = os.path.join(tpm.OUTPUT_DIR, 'incremental')
+BEST_MODEL_PATH = os.path.join(tpm.OUTPUT_DIR, 'best_model.keras')
+SCALER_PATH = os.path.join(tpm.OUTPUT_DIR, 'scaler.joblib')
+COMPARED_METRICS = ['accuracy', 'sensitivity', 'specificity', 'f1_score', 'auc_roc']
+
+
+def update_scaler(scaler, X_new: np.ndarray):
+    """Copy of a fitted StandardScaler with `X_new` added to its statistics."""
+    updated = copy.deepcopy(scaler)
+    updated.partial_fit(X_new)
+    return updated
+
+
+def rebase_first_layer(model, old_scaler, new_scaler) -> None:
+    """
+    Rewrite the first Dense layer (in place) so the model gives the same
+    output on new_scaler.transform(x) as it gave on old_scaler.transform(x).
+    """
+    dense = next(layer for layer in model.layers if type(layer).__name__ == 'Dense')
+    kernel, bias = (w.astype(np.float64) for w in dense.get_weights())
+    ratio = new_scaler.scale_ / old_scaler.scale_
+    shift = (new_scaler.mean_ - old_scaler.mean_) / old_scaler.scale_
+    dense.set_weights([(ratio[:, None] * kernel).astype(np.float32),
+                       (bias + shift @ kernel).astype(np.float32)])
+
+
+def replay_sample(X: np.ndarray, y: np.ndarray, n: int, seed: int = 42) -> tuple:
+    """Stratified sample of `n` old training rows (all of them if n >= len(y))."""
+    if n >= len(y):
+        return X, y
+    from sklearn.model_selection import train_test_split
+    X_replay, _, y_replay, _ = train_test_split(X, y, train_size=n, random_state=seed,
+                                                stratify=y)
+    return X_replay, y_replay
+
+
+def incremental_retrain(X_new: np.ndarray, y_new: np.ndarray,
+                        X_replay: np.ndarray, y_replay: np.ndarray,
+                        X_val: np.ndarray, y_val: np.ndarray,
+                        model_path: str = BEST_MODEL_PATH, scaler_path: str = SCALER_PATH,
+                        epochs: int = 5, learning_rate: float = 1e-4) -> tuple:
+    """Warm-start fine-tune on new + replay rows (all unscaled); returns (model, scaler)."""
+    import joblib
+    tpm._import_tensorflow()
+    from tensorflow import keras
+
+    print("\n" + "=" * 60)
+    print("Incremental Retraining (warm start)")
+    print("=" * 60)
+
+    old_scaler = joblib.load(scaler_path)
+    scaler = update_scaler(old_scaler, X_new)
+    print(f"\n✓ Scaler updated: {int(old_scaler.n_samples_seen_)} -> "
+          f"{int(scaler.n_samples_seen_)} rows seen "
+          f"(largest mean shift "
+          f"{np.abs((scaler.mean_ - old_scaler.mean_) / old_scaler.scale_).max():.3f} std)")
+
+    model = keras.models.load_model(model_path)
+    rebase_first_layer(model, old_scaler, scaler)
+    model.optimizer.learning_rate.assign(learning_rate)
+    print(f"✓ Warm start from {model_path} (first layer rebased on the updated scaler)")
+    print(f"  Fine-tuning on {len(y_new)} new + {len(y_replay)} replayed rows")
+
+    X_train = np.vstack([X_new, X_replay])
+    y_train = np.concatenate([y_new, y_replay])
+    tpm.train_model(model, scaler.transform(X_train), y_train, scaler.transform(X_val), y_val,
+                    checkpoint_path=None, epochs=epochs)
+    return model, scaler
+
+
+def full_retrain(X_train: np.ndarray, y_train: np.ndarray,
+                 X_val: np.ndarray, y_val: np.ndarray) -> tuple:
+    """Reference: fresh scaler and model on all training rows; returns (model, scaler)."""
+    from sklearn.preprocessing import StandardScaler
+
+    print("\n" + "=" * 60)
+    print("Full Retraining (from scratch)")
+    print("=" * 60)
+
+    scaler = StandardScaler().fit(X_train)
+    model = tpm.build_model(input_dim=X_train.shape[1])
+    tpm.train_model(model, scaler.transform(X_train), y_train, scaler.transform(X_val), y_val,
+                    checkpoint_path=None)
+    return model, scaler
+
+
+def print_comparison(results: dict) -> None:
+    """Side-by-side wall time and test metrics of the retraining modes in `results`."""
+    names = list(results)
+    print("\n📊 Incremental vs full retrain (same old + new test set):")
+    print(f"  {'':<14}" + ''.join(f"{name:>16}" for name in names))
+    print(f"  {'Wall time':<14}" + ''.join(f"{results[n]['time_sec']:>15.1f}s" for n in names))
+    for metric in COMPARED_METRICS:
+        row = ''
+        for name in names:
+            m = results[name]['metrics']
+            value = m[metric]
+            row += f"{value:>16.4f}" if metric == 'auc_roc' else f"{value * 100:>15.2f}%"
+        print(f"  {metric:<14}{row}")
+    if len(names) == 2:
+        a, b = (results[n] for n in names)
+        print(f"\n  {names[0]} took {a['time_sec'] / b['time_sec']:.1%} of the {names[1]} time; "
+              f"AUC {a['metrics']['auc_roc'] - b['metrics']['auc_roc']:+.4f}")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Warm-start retraining on a new batch of data")
+    parser.add_argument('--new-data', required=True,
+                        help='New labelled rows (CSV in the parkinsons.data layout)')
+    parser.add_argument('--model', default=BEST_MODEL_PATH, help='Model to warm-start from')
+    parser.add_argument('--scaler', default=SCALER_PATH, help='Scaler the model was trained with')
+    parser.add_argument('--epochs', type=int, default=5, help='Fine-tuning epochs')
+    parser.add_argument('--learning-rate', type=float, default=1e-4, help='Fine-tuning learning rate')
+    parser.add_argument('--replay-ratio', type=float, default=1.0,
+                        help='Replayed old training rows per new training row')
+    parser.add_argument('--no-compare', action='store_true',
+                        help='Skip the full retrain used as the comparison baseline')
+    parser.add_argument('--promote', action='store_true',
+                        help='Replace best_model.keras and scaler.joblib with the updated ones')
+    args = parser.parse_args(argv)
+
+    import joblib
+
+    X_old, y_old, feature_names = tpm.load_and_preprocess_data(tpm.DATA_PATH)
+    X_new, y_new, new_features = tpm.load_and_preprocess_data(args.new_data)
+    if list(new_features) != list(feature_names):
+        raise ValueError(f"{args.new_data} does not have the {tpm.DATA_PATH} feature columns")
+
+    (X_old_train, X_old_val, X_old_test,
+     y_old_train, y_old_val, y_old_test) = tpm.split_data(X_old, y_old)
+    (X_new_train, X_new_val, X_new_test,
+     y_new_train, y_new_val, y_new_test) = tpm.split_data(X_new, y_new)
+    X_val, y_val = np.vstack([X_old_val, X_new_val]), np.concatenate([y_old_val, y_new_val])
+    X_test, y_test = np.vstack([X_old_test, X_new_test]), np.concatenate([y_old_test, y_new_test])
+
+    X_replay, y_replay = replay_sample(X_old_train, y_old_train,
+                                       int(round(args.replay_ratio * len(y_new_train))))
+
+    # Import TensorFlow up front so neither timing includes it
+    tpm._import_tensorflow()
+    results = {}
+    start_time = time.perf_counter()
+    model, scaler = incremental_retrain(X_new_train, y_new_train, X_replay, y_replay,
+                                        X_val, y_val, model_path=args.model,
+                                        scaler_path=args.scaler, epochs=args.epochs,
+                                        learning_rate=args.learning_rate)
+    elapsed = time.perf_counter() - start_time
+    metrics = tpm.evaluate_model(model, scaler.transform(X_test), y_test, save_plots=False)
+    results['incremental'] = {'time_sec': elapsed, 'metrics': metrics}
+
+    os.makedirs(INCREMENTAL_DIR, exist_ok=True)
+    model_path = os.path.join(INCREMENTAL_DIR, 'best_model.keras')
+    scaler_path = os.path.join(INCREMENTAL_DIR, 'scaler.joblib')
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+    print(f"\n✓ Updated model saved to: {model_path}")
+    print(f"✓ Updated scaler saved to: {scaler_path}")
+
+    if not args.no_compare:
+        start_time = time.perf_counter()
+        full_model, full_scaler = full_retrain(np.vstack([X_old_train, X_new_train]),
+                                               np.concatenate([y_old_train, y_new_train]),
+                                               X_val, y_val)
+        elapsed = time.perf_counter() - start_time
+        metrics = tpm.evaluate_model(full_model, full_scaler.transform(X_test), y_test,
+                                     save_plots=False)
+        results['full'] = {'time_sec': elapsed, 'metrics': metrics}
+
+    print_comparison(results)
+
+    report = {
+        'new_data': os.path.abspath(args.new_data),
+        'new_rows': int(len(y_new)),
+        'new_train_rows': int(len(y_new_train)),
+        'replay_rows': int(len(y_replay)),
+        'test_rows': int(len(y_test)),
+        'epochs': args.epochs,
+        'learning_rate': args.learning_rate,
+        'results': {name: {'time_sec': r['time_sec'],
+                           'metrics': {k: float(v) for k, v in r['metrics'].items()}}
+                    for name, r in results.items()},
+    }
+    report_path = os.path.join(INCREMENTAL_DIR, 'retrain_report.json')
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✓ Report saved to: {report_path}")
+
+    if args.promote:
+        shutil.copyfile(model_path, args.model)
+        shutil.copyfile(scaler_path, args.scaler)
+        print(f"✓ Promoted: {args.model}, {args.scaler}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Micro-batching Inference Service
+
+Local HTTP service that scores 22-feature voice vectors with the exported
+TFLite model and the training StandardScaler. Both are loaded once at
+startup. Concurrent requests are queued and combined into micro-batches:
+a batch is dispatched once it holds --max-batch-size rows or its first
+request has waited --max-wait-ms, so one interpreter invoke serves many
+callers.
+
+Endpoints:
+    POST /predict   {"features": [22 floats]} or {"instances": [[22 floats], ...]}
+                    (at most --max-batch-size instances per request)
+                    -> {"probabilities": [...], "predictions": [...]}
+    GET  /metrics   queue depth, batch sizes, request latency percentiles
+    GET  /health    {"status": "ok"}
+
+Only the standard library (asyncio) is used for serving. The interpreter
+comes from ai_edge_litert or tflite_runtime when installed, and from
+TensorFlow otherwise.
+
+Usage:
+    python ml/inference_server.py --port 8080 --max-batch-size 64 --max-wait-ms 2
+"""
+
+import os
+import json
+import time
+import asyncio
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+import train_parkinson_model as tpm
+
+DEFAULT_MODEL_PATH = os.path.join(tpm.MODEL_DIR, 'parkinson_model_v1.0.tflite')
+DEFAULT_SCALER_PATH = os.path.join(tpm.OUTPUT_DIR, 'scaler.joblib')
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+
+def load_interpreter(model_path: str, num_threads: int = None):
+    """Create a TFLite interpreter from the lightest runtime available."""
+    num_threads = num_threads or os.cpu_count() or 1
+    try:
+        from ai_edge_litert.interpreter import Interpreter
+    except ImportError:
+        try:
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            Interpreter = tpm._import_tensorflow().lite.Interpreter
+    interpreter = Interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+class ParkinsonScorer:
+    """
+    Scaler + TFLite interpreter pair that scores raw feature batches.
+
+    With `batch_size` the interpreter is allocated once for that many rows
+    and smaller batches are zero-padded, so varying micro-batch sizes never
+    re-allocate tensors on the request path.
+    """
+
+    def __init__(self, model_path: str, scaler_path: str, num_threads: int = None,
+                 batch_size: int = None):
+        import joblib
+        scaler = joblib.load(scaler_path)
+        # Apply the scaler as plain vector ops rather than through sklearn
+        self.mean = scaler.mean_.astype(np.float32)
+        self.scale = scaler.scale_.astype(np.float32)
+        self.interpreter = load_interpreter(model_path, num_threads)
+        self.n_features = int(self.interpreter.get_input_details()[0]['shape'][-1])
+        if self.n_features != len(self.mean):
+            raise ValueError(f"Model expects {self.n_features} features but the scaler "
+                             f"was fitted on {len(self.mean)}")
+        self.batch_size = batch_size
+        if batch_size:
+            input_index = self.interpreter.get_input_details()[0]['index']
+            self.interpreter.resize_tensor_input(input_index, [batch_size, self.n_features])
+            self.interpreter.allocate_tensors()
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Return probabilities for a (n, n_features) batch of raw features."""
+        X_scaled = (X.astype(np.float32) - self.mean) / self.scale
+        if self.batch_size:
+            return tpm._run_tflite_batched(self.interpreter, X_scaled,
+                                           batch_size=self.batch_size, pad=True)
+        return tpm._run_tflite_batched(self.interpreter, X_scaled, batch_size=len(X))
+
+
+class MicroBatcher:
+    """
+    Queue that merges concurrent requests into batched model calls.
+
+    The model runs on a single worker thread, so the interpreter is never
+    used concurrently and the event loop stays free to accept requests.
+    """
+
+    def __init__(self, predict_fn, max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 latency_window: int = 10_000):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.queue = asyncio.Queue()
+        self._carry = None  # request held back from a full batch
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='tflite')
+        self.latencies_ms = deque(maxlen=latency_window)
+        self.batch_sizes = deque(maxlen=latency_window)
+        self.model_times_ms = deque(maxlen=latency_window)
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.errors = 0
+        self.started_at = time.time()
+
+    async def submit(self, rows: np.ndarray) -> np.ndarray:
+        """Queue `rows` and wait for their probabilities."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((rows, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self) -> list:
+        """
+        Block for one request, then gather more until full or the wait expires.
+
+        A request that would push the batch past max_batch_size is held
+        back as the first item of the next batch.
+        """
+        if self._carry is not None:
+            items, self._carry = [self._carry], None
+        else:
+            items = [await self.queue.get()]
+        n_rows = len(items[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_size:
+            if not self.queue.empty():
+                item = self.queue.get_nowait()
+            else:
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if n_rows + len(item[0]) > self.max_batch_size:
+                self._carry = item
+                break
+            items.append(item)
+            n_rows += len(item[0])
+        return items
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            items = await self._collect()
+            X = np.concatenate([rows for rows, _, _ in items])
+            start_time = time.perf_counter()
+            try:
+                probabilities = await loop.run_in_executor(self.executor, self.predict_fn, X)
+            except Exception as e:
+                self.errors += len(items)
+                for _, future, _ in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            done_time = time.perf_counter()
+
+            self.batches += 1
+            self.batch_sizes.append(len(X))
+            self.model_times_ms.append((done_time - start_time) * 1000)
+            offset = 0
+            for rows, future, enqueued in items:
+                n = len(rows)
+                if not future.done():
+                    future.set_result(probabilities[offset:offset + n])
+                offset += n
+                self.requests += 1
+                self.rows += n
+                self.latencies_ms.append((done_time - enqueued) * 1000)
+
+    def metrics(self) -> dict:
+        def pct(values, q):
+            return float(np.percentile(values, q)) if values else None
+
+        latencies = list(self.latencies_ms)
+        batch_sizes = list(self.batch_sizes)
+        uptime = time.time() - self.started_at
+        return {
+            'queue_depth': self.queue.qsize() + (self._carry is not None),
+            'requests_total': self.requests,
+            'rows_total': self.rows,
+            'batches_total': self.batches,
+            'errors_total': self.errors,
+            'uptime_sec': uptime,
+            'rows_per_sec': self.rows / uptime if uptime > 0 else 0.0,
+            'batch_size': {
+                'mean': float(np.mean(batch_sizes)) if batch_sizes else None,
+                'max': int(max(batch_sizes)) if batch_sizes else None,
+                'limit': self.max_batch_size,
+            },
+            'latency_ms': {
+                'p50': pct(latencies, 50),
+                'p95': pct(latencies, 95),
+                'p99': pct(latencies, 99),
+            },
+            'model_time_ms': {'p50': pct(list(self.model_times_ms), 50)},
+            'max_wait_ms': self.max_wait * 1000,
+        }
+
+
+class InferenceServer:
+    """Minimal HTTP/1.1 front end (keep-alive, JSON bodies) over a MicroBatcher."""
+
+    def __init__(self, scorer: ParkinsonScorer, batcher: MicroBatcher):
+        self.scorer = scorer
+        self.batcher = batcher
+
+    async def handle_predict(self, body: bytes) -> tuple:
+        try:
+            payload = json.loads(body or b'{}')
+            if 'instances' in payload:
+                rows = np.asarray(payload['instances'], dtype=np.float32)
+            elif 'features' in payload:
+                rows = np.asarray([payload['features']], dtype=np.float32)
+            else:
+                return 400, {'error': "Body must contain 'features' or 'instances'"}
+        except (ValueError, TypeError) as e:
+            return 400, {'error': f"Invalid JSON body: {e}"}
+        if rows.ndim != 2 or rows.shape[1] != self.scorer.n_features or len(rows) == 0:
+            return 400, {'error': f"Expected rows of {self.scorer.n_features} features, "
+                                  f"got shape {list(rows.shape)}"}
+        if not np.isfinite(rows).all():
+            return 400, {'error': 'Features must be finite numbers'}
+        if len(rows) > self.batcher.max_batch_size:
+            return 413, {'error': f"At most {self.batcher.max_batch_size} instances "
+                                  f"per request, got {len(rows)}"}
+
+        probabilities = await self.batcher.submit(rows)
+        return 200, {
+            'probabilities': [float(p) for p in probabilities],
+            'predictions': [int(p >= 0.5) for p in probabilities],
+        }
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> tuple:
+        if method == 'POST' and path == '/predict':
+            return await self.handle_predict(body)
+        if method == 'GET' and path == '/metrics':
+            return 200, self.batcher.metrics()
+        if method == 'GET' and path == '/health':
+            return 200, {'status': 'ok'}
+        return 404, {'error': f"No route for {method} {path}"}
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, _ = request_line.decode('latin-1').split(' ', 2)
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # The body cannot be framed, so the connection is closed after replying
+                    status, response = 400, {'error': 'Invalid Content-Length header'}
+                elif length > MAX_BODY_BYTES:
+                    status, response = 413, {'error': 'Request body too large'}
+                else:
+                    body = await reader.readexactly(length) if length else b''
+                    try:
+                        status, response = await self.dispatch(method.upper(), path, body)
+                    except Exception as e:
+                        status, response = 500, {'error': str(e)}
+
+                keep_alive = (headers.get('connection', '').lower() != 'close'
+                              and length >= 0 and length <= MAX_BODY_BYTES)
+                payload = json.dumps(response).encode('utf-8')
+                writer.write(
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+                    .encode('latin-1') + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+_REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found',
+            413: 'Payload Too Large', 500: 'Internal Server Error'}
+
+
+async def serve(args) -> None:
+    scorer = ParkinsonScorer(args.model, args.scaler, num_threads=args.num_threads,
+                             batch_size=args.max_batch_size)
+    batcher = MicroBatcher(scorer.predict, max_batch_size=args.max_batch_size,
+                           max_wait_ms=args.max_wait_ms)
+    server = InferenceServer(scorer, batcher)
+
+    batcher_task = asyncio.create_task(batcher.run())
+    http = await asyncio.start_server(server.handle_connection, args.host, args.port,
+                                      backlog=1024)
+    print(f"✓ Serving {os.path.basename(args.model)} on http://{args.host}:{args.port} "
+          f"(max batch {args.max_batch_size}, max wait {args.max_wait_ms} ms)", flush=True)
+    try:
+        async with http:
+            await http.serve_forever()
+    finally:
+        batcher_task.cancel()
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="NeuroAccess micro-batching inference service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH, help='TFLite model path')
+    parser.add_argument('--scaler', default=DEFAULT_SCALER_PATH, help='scaler.joblib path')
+    parser.add_argument('--max-batch-size', type=int, default=64,
+                        help='Dispatch a batch once it holds this many rows')
+    parser.add_argument('--max-wait-ms', type=float, default=2.0,
+                        help='Longest a request waits for others to join its batch')
+    parser.add_argument('--num-threads', type=int, default=None,
+                        help='TFLite interpreter threads (default: CPU count)')
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Inference Service Load Generator
+
+Measures the per-row scoring loop that integrations use today (scaler +
+one interpreter invoke per row) and then drives inference_server.py with
+concurrent single-row /predict requests. Client-side throughput and
+latency are reported next to the server's own /metrics.
+
+Usage:
+    python ml/load_test.py --spawn-server                  # start a server for the run
+    python ml/load_test.py --url http://127.0.0.1:8080 --concurrency 64 --requests 20000
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import subprocess
+from urllib.parse import urlsplit
+
+import numpy as np
+
+import train_parkinson_model as tpm
+from inference_server import DEFAULT_MODEL_PATH, DEFAULT_SCALER_PATH, load_interpreter
+
+
+def load_rows(n_rows: int, seed: int = 42) -> np.ndarray:
+    """Raw (unscaled) feature rows drawn from the training dataset."""
+    X, _, _ = tpm.load_and_preprocess_data(tpm.DATA_PATH)
+    rng = np.random.default_rng(seed)
+    return np.asarray(X)[rng.integers(0, len(X), size=n_rows)].astype(np.float32)
+
+
+def benchmark_naive_loop(X: np.ndarray, model_path: str, scaler_path: str) -> dict:
+    """Score `X` one row at a time, the way validate_tflite_model used to."""
+    import joblib
+    scaler = joblib.load(scaler_path)
+    interpreter = load_interpreter(model_path, num_threads=1)
+    input_details = interpreter.get_input_details()
+    output_details = interpreter.get_output_details()
+
+    latencies = np.empty(len(X))
+    start_time = time.perf_counter()
+    for i in range(len(X)):
+        row_start = time.perf_counter()
+        row = scaler.transform(X[i:i + 1]).astype(np.float32)
+        interpreter.set_tensor(input_details[0]['index'], row)
+        interpreter.invoke()
+        interpreter.get_tensor(output_details[0]['index'])
+        latencies[i] = time.perf_counter() - row_start
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        'rows_per_sec': len(X) / elapsed,
+        'latency_ms': {f'p{q}': float(np.percentile(latencies, q) * 1000) for q in (50, 95, 99)},
+    }
+
+
+async def _request(reader, writer, host: str, method: str, path: str, body: bytes = b'') -> dict:
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+        .encode('latin-1') + body
+    )
+    await writer.drain()
+    status_line = await reader.readline()
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value.strip())
+    payload = await reader.readexactly(length)
+    status = int(status_line.split()[1])
+    if status != 200:
+        raise RuntimeError(f"{method} {path} returned {status}: {payload.decode('utf-8')}")
+    return json.loads(payload)
+
+
+async def _get(url: str, path: str) -> dict:
+    parts = urlsplit(url)
+    reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+    try:
+        return await _request(reader, writer, parts.hostname, 'GET', path)
+    finally:
+        writer.close()
+
+
+async def drive_server(url: str, X: np.ndarray, concurrency: int) -> dict:
+    """Send every row of `X` as its own request over `concurrency` keep-alive connections."""
+    parts = urlsplit(url)
+    bodies = [json.dumps({'features': row.tolist()}).encode('utf-8') for row in X]
+    latencies = np.empty(len(X))
+    next_index = iter(range(len(X)))
+
+    async def client():
+        reader, writer = await asyncio.open_connection(parts.hostname, parts.port)
+        try:
+            for i in next_index:
+                request_start = time.perf_counter()
+                await _request(reader, writer, parts.hostname, 'POST', '/predict', bodies[i])
+                latencies[i] = time.perf_counter() - request_start
+        finally:
+            writer.close()
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start_time
+
+    return {
+        'rows_per_sec': len(X) / elapsed,
+        'latency_ms': {f'p{q}': float(np.percentile(latencies, q) * 1000) for q in (50, 95, 99)},
+        'server_metrics': await _get(url, '/metrics'),
+    }
+
+
+def _wait_for_server(url: str, process: subprocess.Popen, timeout: float = 120.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Inference server exited with code {process.returncode}")
+        try:
+            asyncio.run(_get(url, '/health'))
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise TimeoutError(f"Inference server did not start within {timeout:.0f}s")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Load test for inference_server.py")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--spawn-server', action='store_true',
+                        help='Start inference_server.py for the duration of the run')
+    parser.add_argument('--requests', type=int, default=5000, help='Single-row requests to send')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent client connections')
+    parser.add_argument('--naive-rows', type=int, default=2000,
+                        help='Rows to score with the per-row baseline loop')
+    parser.add_argument('--model', default=DEFAULT_MODEL_PATH)
+    parser.add_argument('--scaler', default=DEFAULT_SCALER_PATH)
+    parser.add_argument('--max-batch-size', type=int, default=64)
+    parser.add_argument('--max-wait-ms', type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    print("=" * 60)
+    print("Inference Service Load Test")
+    print("=" * 60)
+
+    X = load_rows(max(args.requests, args.naive_rows))
+
+    print(f"\nNaive per-row loop ({args.naive_rows} rows)...")
+    naive = benchmark_naive_loop(X[:args.naive_rows], args.model, args.scaler)
+
+    server = None
+    if args.spawn_server:
+        port = urlsplit(args.url).port
+        server = subprocess.Popen([
+            sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                         'inference_server.py'),
+            '--port', str(port), '--model', args.model, '--scaler', args.scaler,
+            '--max-batch-size', str(args.max_batch_size),
+            '--max-wait-ms', str(args.max_wait_ms),
+        ])
+    try:
+        if server is not None:
+            _wait_for_server(args.url, server)
+        print(f"Micro-batching service ({args.requests} requests, "
+              f"{args.concurrency} connections)...")
+        served = asyncio.run(drive_server(args.url, X[:args.requests], args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    metrics = served['server_metrics']
+    print("\n📊 Results")
+    print("-" * 60)
+    print(f"  {'':<22} {'rows/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, result in [('Naive per-row loop', naive), ('Micro-batching service', served)]:
+        lat = result['latency_ms']
+        print(f"  {label:<22} {result['rows_per_sec']:>10.0f} "
+              f"{lat['p50']:>9.3f} {lat['p95']:>9.3f} {lat['p99']:>9.3f}")
+    print(f"\n  Speedup:          {served['rows_per_sec'] / naive['rows_per_sec']:.2f}x")
+    print(f"  Mean batch size:  {metrics['batch_size']['mean']:.1f} "
+          f"(limit {metrics['batch_size']['limit']})")
+    print(f"  Server p50/p99:   {metrics['latency_ms']['p50']:.3f} / "
+          f"{metrics['latency_ms']['p99']:.3f} ms (queue + model)")
+    print(f"  Batches:          {metrics['batches_total']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Training Pipeline CLI
+
+Runs the steps of train_parkinson_model.py as a graph of stages. Each stage
+declares the files it reads and writes; a stage is skipped when the content
+hashes of its inputs (and the pipeline code) match its last successful run
+and its outputs are still in place. Running a stage first brings its
+dependencies up to date the same way.
+
+Only the libraries a stage actually needs are imported, and only when the
+stage runs, so skipping an unchanged stage costs milliseconds. Figures are
+rendered in background processes (see plot_renderer.py); --no-plots skips
+them entirely.
+
+Usage:
+    python ml/pipeline.py all              # full pipeline, unchanged stages skipped
+    python ml/pipeline.py convert          # retrain only if the data changed
+    python ml/pipeline.py report --force   # rerun the report even if unchanged
+    python ml/pipeline.py compress         # prune and distill a smaller student
+    python ml/pipeline.py status           # show which stages are stale
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+
+import numpy as np
+
+import artifact_store
+import compress_model
+import dataset_cache
+import feature_importance
+import plot_renderer
+import train_parkinson_model as tpm
+from dataset_cache import content_key
+from plot_renderer import PlotRenderer
+
+OUTPUT_DIR = tpm.OUTPUT_DIR
+STATE_DIR = os.path.join(OUTPUT_DIR, '.pipeline')
+STATE_PATH = os.path.join(STATE_DIR, 'state.json')
+
+SPLITS_PATH = os.path.join(OUTPUT_DIR, 'splits.npz')
+SCALER_PATH = os.path.join(OUTPUT_DIR, 'scaler.joblib')
+METRICS_PATH = os.path.join(OUTPUT_DIR, 'metrics.json')
+KERAS_PATH = os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0.keras')
+TFLITE_PATH = os.path.join(tpm.MODEL_DIR, 'parkinson_model_v1.0.tflite')
+VALIDATION_PATH = os.path.join(OUTPUT_DIR, 'tflite_validation.json')
+
+# Models trained in this run, handed to later stages without a save/load cycle
+_live_models = {}
+
+# Changes to the shared stage code invalidate every stage; modules only one
+# or two stages use are listed in those stages' `code` instead
+CODE_PATHS = [os.path.abspath(module.__file__)
+              for module in (tpm, dataset_cache, plot_renderer)] + [os.path.abspath(__file__)]
+ARTIFACT_STORE_CODE = os.path.abspath(artifact_store.__file__)
+
+
+def _output(name: str) -> str:
+    return os.path.join(OUTPUT_DIR, name)
+
+
+def _load_splits() -> dict:
+    with np.load(SPLITS_PATH) as data:
+        splits = {name: data[name] for name in data.files}
+    splits['feature_names'] = [str(f) for f in splits['feature_names']]
+    return splits
+
+
+# ----------------------------------------------------------------------------
+# Stage implementations
+# ----------------------------------------------------------------------------
+
+def run_prepare(args, renderer: PlotRenderer) -> None:
+    X, y, feature_names = tpm.load_and_preprocess_data(tpm.DATA_PATH, use_cache=not args.no_cache)
+    (X_train, X_val, X_test,
+     y_train, y_val, y_test, _) = tpm.prepare_data_splits(X, y)
+    np.savez(SPLITS_PATH,
+             X_train=X_train, X_val=X_val, X_test=X_test,
+             y_train=y_train, y_val=y_val, y_test=y_test,
+             feature_names=np.array(feature_names))
+    print(f"✓ Splits saved to {SPLITS_PATH}")
+
+
+def run_eda(args, renderer: PlotRenderer) -> None:
+    X, y, feature_names = tpm.load_and_preprocess_data(tpm.DATA_PATH, use_cache=not args.no_cache)
+    tpm.explore_data(X, y, feature_names, renderer=renderer)
+
+
+def run_train(args, renderer: PlotRenderer) -> None:
+    s = _load_splits()
+    model = tpm.build_model(input_dim=s['X_train'].shape[1])
+    history = tpm.train_model(model, s['X_train'], s['y_train'], s['X_val'], s['y_val'])
+    tpm.plot_training_history(history, renderer=renderer)
+    metrics = tpm.evaluate_model(model, s['X_test'], s['y_test'], renderer=renderer)
+    tpm.save_model(model, s['feature_names'], metrics)
+    _live_models[KERAS_PATH] = model
+    with open(METRICS_PATH, 'w') as f:
+        json.dump({name: float(value) for name, value in metrics.items()}, f, indent=2)
+
+
+def run_convert(args, renderer: PlotRenderer) -> None:
+    tpm.convert_to_tflite(KERAS_PATH, model=_live_models.get(KERAS_PATH))
+
+
+def run_validate(args, renderer: PlotRenderer) -> None:
+    s = _load_splits()
+    results = tpm.validate_tflite_model(TFLITE_PATH, s['X_test'], s['y_test'])
+    with open(VALIDATION_PATH, 'w') as f:
+        json.dump({name: float(value) for name, value in results.items()}, f, indent=2)
+
+
+def run_report(args, renderer: PlotRenderer) -> None:
+    with open(METRICS_PATH) as f:
+        metrics = json.load(f)
+    tpm.generate_report(metrics, _load_splits()['feature_names'])
+
+
+def run_compress(args, renderer: PlotRenderer) -> None:
+    s = _load_splits()
+    compress_model.compress(KERAS_PATH, s['X_train'], s['y_train'], s['X_val'], s['y_val'],
+                            s['X_test'], s['y_test'])
+
+
+def run_importance(args, renderer: PlotRenderer) -> None:
+    s = _load_splits()
+    feature_importance.run_importance(KERAS_PATH, s['X_test'], s['y_test'],
+                                      s['feature_names'], renderer=renderer)
+
+
+class Stage:
+    """
+    A pipeline step with declared dependencies, input files and output files.
+
+    `code` lists the source files only this stage depends on, on top of the
+    shared CODE_PATHS.
+    """
+
+    def __init__(self, name: str, run, deps: list = (), inputs: list = (),
+                 outputs: list = (), code: list = (), help: str = ''):
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.help = help
+
+
+STAGES = {stage.name: stage for stage in [
+    Stage('prepare', run_prepare,
+          inputs=[tpm.DATA_PATH],
+          outputs=[SPLITS_PATH, SCALER_PATH],
+          help='Load the raw dataset, split and normalize it (steps 1, 3)'),
+    Stage('eda', run_eda,
+          inputs=[tpm.DATA_PATH],
+          outputs=[_output('correlation_matrix.png'), _output('feature_distributions.png')],
+          help='Exploratory data analysis plots (step 2)'),
+    Stage('train', run_train, deps=['prepare'],
+          inputs=[SPLITS_PATH],
+          outputs=[KERAS_PATH, METRICS_PATH, _output('best_model.keras'),
+                   _output('model_metadata.json'), _output('training_history.png'),
+                   _output('confusion_matrix.png'), _output('roc_curve.png')],
+          code=[ARTIFACT_STORE_CODE],
+          help='Build, train, evaluate and save the model (steps 4-8)'),
+    Stage('convert', run_convert, deps=['train'],
+          inputs=[KERAS_PATH],
+          outputs=[TFLITE_PATH, _output('parkinson_model_v1.0.tflite')],
+          code=[ARTIFACT_STORE_CODE],
+          help='Convert the saved model to TensorFlow Lite (step 9)'),
+    Stage('validate', run_validate, deps=['prepare', 'convert'],
+          inputs=[TFLITE_PATH, SPLITS_PATH],
+          outputs=[VALIDATION_PATH],
+          help='Validate the TFLite model on the test split (step 10)'),
+    Stage('report', run_report, deps=['prepare', 'train'],
+          inputs=[METRICS_PATH, SPLITS_PATH],
+          outputs=[_output('training_report.md')],
+          help='Write the Markdown training report (step 11)'),
+    Stage('compress', run_compress, deps=['prepare', 'train'],
+          inputs=[KERAS_PATH, SPLITS_PATH],
+          outputs=[compress_model.RESULTS_PATH],
+          code=[os.path.abspath(compress_model.__file__)],
+          help='Prune and distill smaller students of the trained model'),
+    Stage('importance', run_importance, deps=['prepare', 'train'],
+          inputs=[KERAS_PATH, SPLITS_PATH],
+          outputs=[feature_importance.CSV_PATH, feature_importance.PLOT_PATH],
+          code=[os.path.abspath(feature_importance.__file__)],
+          help='Batched permutation feature importance of the trained model'),
+    Stage('all', None, deps=['eda', 'validate', 'report'],
+          help='Run every stage'),
+]}
+
+
+# ----------------------------------------------------------------------------
+# Fingerprinting and execution
+# ----------------------------------------------------------------------------
+
+def _file_hash(path: str) -> str:
+    """Content hash of `path`, memoised on size/mtime so unchanged files aren't re-read."""
+    return content_key(path, cache_dir=STATE_DIR)
+
+
+def _load_state() -> dict:
+    if not os.path.exists(STATE_PATH):
+        return {}
+    with open(STATE_PATH) as f:
+        return json.load(f)
+
+
+def _save_state(state: dict) -> None:
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp_path = STATE_PATH + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, STATE_PATH)
+
+
+def stage_outputs(stage: Stage, args) -> list:
+    """Outputs the stage is expected to produce under the current options."""
+    if args.no_plots:
+        return [path for path in stage.outputs if not path.endswith('.png')]
+    return stage.outputs
+
+
+def fingerprint(stage: Stage) -> str:
+    """Hash of the stage name, its input file contents and the code it runs."""
+    digest = hashlib.sha256(stage.name.encode('utf-8'))
+    for path in CODE_PATHS + stage.code + stage.inputs:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Stage '{stage.name}' input is missing: {path}")
+        digest.update(path.encode('utf-8'))
+        digest.update(_file_hash(path).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def is_up_to_date(stage: Stage, state: dict, args) -> bool:
+    """
+    True if the stage's last run used the same inputs and its outputs are intact.
+
+    A run made with --no-plots recorded no PNG hashes, so it counts as stale
+    once plots are wanted again.
+    """
+    record = state.get(stage.name)
+    if not record:
+        return False
+    try:
+        if record['fingerprint'] != fingerprint(stage):
+            return False
+    except FileNotFoundError:
+        return False
+    for path in stage_outputs(stage, args):
+        if not os.path.exists(path) or _file_hash(path) != record['outputs'].get(path):
+            return False
+    return True
+
+
+def record_stage(stage: Stage, state: dict, args) -> None:
+    """Store the fingerprint and output hashes of a successful run."""
+    state[stage.name] = {
+        'fingerprint': fingerprint(stage),
+        'outputs': {path: _file_hash(path) for path in stage_outputs(stage, args)},
+        'completed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    _save_state(state)
+
+
+def run_stage(name: str, args, state: dict, done: set,
+              renderer: PlotRenderer, deferred: list) -> None:
+    """
+    Bring `name` and its dependencies up to date.
+
+    Stages that queued figures are recorded only after the renderer has
+    finished (their PNG outputs don't exist until then); they are appended
+    to `deferred` instead.
+    """
+    if name in done:
+        return
+    stage = STAGES[name]
+    for dep in stage.deps:
+        run_stage(dep, args, state, done, renderer, deferred)
+    done.add(name)
+    if stage.run is None:
+        return
+
+    start_time = time.perf_counter()
+    forced = args.force_all or (args.force and name == args.stage)
+    if not forced and is_up_to_date(stage, state, args):
+        elapsed = (time.perf_counter() - start_time) * 1000
+        print(f"⏭  {name}: unchanged, skipped ({elapsed:.1f} ms)")
+        return
+
+    print(f"\n▶  {name}: {stage.help}")
+    stage.run(args, renderer)
+    if any(path.endswith('.png') for path in stage_outputs(stage, args)):
+        deferred.append(stage)
+    else:
+        record_stage(stage, state, args)
+    print(f"✓  {name}: done in {time.perf_counter() - start_time:.1f}s")
+
+
+def print_status(state: dict, args) -> None:
+    for name, stage in STAGES.items():
+        if stage.run is None:
+            continue
+        status = 'up to date' if is_up_to_date(stage, state, args) else 'stale'
+        print(f"  {name:<10} {status:<11} {stage.help}")
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(
+        description="NeuroAccess training pipeline",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='\n'.join(f"  {s.name:<10} {s.help}" for s in STAGES.values()),
+    )
+    parser.add_argument('stage', choices=list(STAGES) + ['status'],
+                        help='Stage to run (dependencies run first if stale)')
+    parser.add_argument('--force', action='store_true',
+                        help='Rerun the requested stage even if unchanged')
+    parser.add_argument('--force-all', action='store_true',
+                        help='Rerun the requested stage and all of its dependencies')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Re-parse the raw CSV instead of using the dataset cache')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='Skip rendering figures (headless batch retrains)')
+    args = parser.parse_args(argv)
+
+    state = _load_state()
+    if args.stage == 'status':
+        print_status(state, args)
+        return
+
+    start_time = time.perf_counter()
+    deferred = []
+    with PlotRenderer(enabled=not args.no_plots) as renderer:
+        run_stage(args.stage, args, state, set(), renderer, deferred)
+        if deferred:
+            print("\nWaiting for background plot rendering...")
+    for stage in deferred:
+        record_stage(stage, state, args)
+    print(f"\nPipeline finished in {time.perf_counter() - start_time:.2f}s")
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+NeuroAccess - Background Plot Renderer
+
+The pipeline's figures (correlation heatmap, feature histograms, training
+curves, confusion matrix, ROC curve, feature importance) are large 150-dpi
+PNGs that take seconds to render. The render_* functions here take plain
+arrays and an output path, so they can run in a separate process on the
+Agg backend while training and conversion carry on in the main process.
+
+Usage:
+    renderer = PlotRenderer()
+    renderer.submit(render_roc_curve, fpr, tpr, roc_auc, path, label='ROC curve')
+    ...
+    renderer.close()   # wait for outstanding figures, report any failures
+"""
+
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def _pyplot():
+    """Import pyplot on the non-interactive Agg backend."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def render_correlation_matrix(X: np.ndarray, y: np.ndarray, feature_names: list,
+                              path: str) -> str:
+    """Lower-triangle heatmap of feature (and status) correlations."""
+    import pandas as pd
+    import seaborn as sns
+    plt = _pyplot()
+
+    df = pd.DataFrame(X, columns=feature_names)
+    df['status'] = y
+
+    plt.figure(figsize=(16, 14))
+    corr_matrix = df.corr()
+    mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
+    sns.heatmap(corr_matrix, mask=mask, cmap='coolwarm', center=0,
+                annot=False, square=True, linewidths=0.5)
+    plt.title("Feature Correlation Matrix", fontsize=14)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
+
+
+def render_feature_distributions(X: np.ndarray, y: np.ndarray, feature_names: list,
+                                 path: str) -> str:
+    """5x5 grid of per-class histograms for the first 25 features."""
+    plt = _pyplot()
+
+    fig, axes = plt.subplots(5, 5, figsize=(20, 16))
+    axes = axes.flatten()
+
+    for idx, col in enumerate(feature_names[:25]):
+        if idx < len(axes):
+            ax = axes[idx]
+            ax.hist(X[y == 0, idx], alpha=0.5, label='Healthy', bins=15)
+            ax.hist(X[y == 1, idx], alpha=0.5, label="Parkinson's", bins=15)
+            ax.grid(True)
+            ax.set_title(col, fontsize=8)
+            ax.legend(fontsize=6)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
+
+
+def render_training_history(history: dict, path: str) -> str:
+    """Loss, accuracy, AUC and precision/recall curves from a Keras history dict."""
+    plt = _pyplot()
+
+    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
+
+    panels = [
+        (axes[0, 0], 'Loss', 'Loss', [('loss', 'Train'), ('val_loss', 'Validation')]),
+        (axes[0, 1], 'Accuracy', 'Accuracy', [('accuracy', 'Train'), ('val_accuracy', 'Validation')]),
+        (axes[1, 0], 'AUC-ROC', 'AUC', [('auc', 'Train'), ('val_auc', 'Validation')]),
+        (axes[1, 1], 'Precision & Recall', 'Score', [
+            ('precision', 'Train Precision'), ('val_precision', 'Val Precision'),
+            ('recall', 'Train Recall'), ('val_recall', 'Val Recall'),
+        ]),
+    ]
+    for ax, title, ylabel, series in panels:
+        for key, label in series:
+            ax.plot(history[key], label=label)
+        ax.set_title(title)
+        ax.set_xlabel('Epoch')
+        ax.set_ylabel(ylabel)
+        ax.legend()
+        ax.grid(True)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
+
+
+def render_confusion_matrix(cm: np.ndarray, path: str) -> str:
+    """Annotated 2x2 confusion matrix heatmap."""
+    import seaborn as sns
+    plt = _pyplot()
+
+    plt.figure(figsize=(8, 6))
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
+                xticklabels=['Healthy', "Parkinson's"],
+                yticklabels=['Healthy', "Parkinson's"])
+    plt.title('Confusion Matrix')
+    plt.xlabel('Predicted')
+    plt.ylabel('Actual')
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
+
+
+def render_roc_curve(fpr: np.ndarray, tpr: np.ndarray, roc_auc: float, path: str) -> str:
+    """ROC curve with the chance diagonal."""
+    plt = _pyplot()
+
+    plt.figure(figsize=(8, 6))
+    plt.plot(fpr, tpr, color='darkorange', lw=2,
+             label=f'ROC curve (AUC = {roc_auc:.4f})')
+    plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--')
+    plt.xlim([0.0, 1.0])
+    plt.ylim([0.0, 1.05])
+    plt.xlabel('False Positive Rate')
+    plt.ylabel('True Positive Rate')
+    plt.title('Receiver Operating Characteristic (ROC) Curve')
+    plt.legend(loc="lower right")
+    plt.grid(True)
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
+
+
+def render_feature_importance(feature_names: list, means: np.ndarray, stds: np.ndarray,
+                              metric_label: str, path: str) -> str:
+    """Horizontal bar chart of permutation importances, most important on top."""
+    plt = _pyplot()
+
+    order = np.argsort(means)
+    plt.figure(figsize=(10, max(4, 0.35 * len(feature_names))))
+    plt.barh(np.arange(len(order)), np.asarray(means)[order], xerr=np.asarray(stds)[order],
+             color='steelblue', ecolor='gray', capsize=3)
+    plt.yticks(np.arange(len(order)), [feature_names[i] for i in order], fontsize=8)
+    plt.axvline(0, color='black', lw=0.8)
+    plt.xlabel(f'Drop in {metric_label} when permuted')
+    plt.title('Permutation Feature Importance')
+    plt.grid(True, axis='x')
+    plt.tight_layout()
+    plt.savefig(path, dpi=150)
+    plt.close()
+    return path
+
+
+class PlotRenderer:
+    """
+    Renders figures off the critical path.
+
+    With asynchronous=True (the default) figures are rendered in a process
+    pool that is started on first use; close() waits for them. With
+    asynchronous=False each figure is rendered immediately in-process, and
+    with enabled=False submissions are ignored (headless batch retrains).
+    """
+
+    def __init__(self, enabled: bool = True, asynchronous: bool = True,
+                 max_workers: int = None):
+        self.enabled = enabled
+        self.asynchronous = asynchronous
+        self.max_workers = max_workers or min(4, os.cpu_count() or 1)
+        self._pool = None
+        self._pending = []
+
+    def submit(self, render_fn, *args, label: str = 'Figure') -> None:
+        """Queue `render_fn(*args)`; the last argument is the output path."""
+        if not self.enabled:
+            return
+        if not self.asynchronous:
+            path = render_fn(*args)
+            print(f"✓ {label} saved to {self._display_path(path)}")
+            return
+        if self._pool is None:
+            # Spawn rather than fork: the parent may already hold TensorFlow
+            # threads, which are not fork-safe.
+            ctx = multiprocessing.get_context('spawn')
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        self._pending.append((label, self._pool.submit(render_fn, *args)))
+
+    def wait(self) -> None:
+        """Block until every queued figure is written."""
+        errors = []
+        for label, future in self._pending:
+            try:
+                path = future.result()
+                print(f"✓ {label} saved to {self._display_path(path)}")
+            except Exception as e:
+                errors.append(f"{label}: {e}")
+        self._pending = []
+        if errors:
+            raise RuntimeError("Plot rendering failed:\n  " + "\n  ".join(errors))
+
+    def close(self) -> None:
+        """Wait for outstanding figures and shut down the worker pool."""
+        try:
+            self.wait()
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    @staticmethod
+    def _display_path(path: str) -> str:
+        parent = os.path.basename(os.path.dirname(path))
+        return f"{parent}/{os.path.basename(path)}" if parent else path
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Out-of-Core Sharded Training
+
+Trains the detector on datasets larger than RAM. The data is stored as
+.npy shards (X-00000.npy / y-00000.npy plus manifest.json, as written by
+synthetic_data.py) and is never loaded whole:
+
+    - Shards are opened as read-only memory maps.
+    - Train/validation/test are index arrays into each shard, stratified
+      70/15/15 within the shard from a per-shard seed. They are recomputed
+      when a shard is visited, not stored or copied.
+    - The StandardScaler is fitted with partial_fit, one block of training
+      rows at a time. The same pass counts the classes for the class weights.
+    - model.fit reads a tf.data pipeline over a Python generator. Each epoch
+      visits shards and blocks in a fresh random order and shuffles rows
+      within a block (block shuffle), scaling rows as they are read.
+
+Only the validation and test sets are held in memory, capped by --val-rows
+and --eval-rows. Peak memory is therefore set by --block-rows and those
+caps, not by the dataset size.
+
+Outputs go to outputs/sharded/ (model, scaler, metrics), so a scale-test
+run never replaces the shipped model.
+
+Usage:
+    python ml/synthetic_data.py --rows 50000000 --output data/synthetic/uci_50m
+    python ml/shard_training.py data/synthetic/uci_50m --epochs 5 --batch-size 1024 --scale-lr
+"""
+
+import os
+import json
+import time
+import argparse
+import itertools
+
+import numpy as np
+
+import train_parkinson_model as tpm
+from benchmark import _peak_rss_mb
+from synthetic_data import open_shards
+
+SHARDED_DIR = os.path.join(tpm.OUTPUT_DIR, 'sharded')
+SPLIT_FRACTIONS = {'train': 0.70, 'val': 0.15, 'test': 0.15}
+
+
+def split_shard(y: np.ndarray, seed: np.random.SeedSequence) -> dict:
+    """Stratified train/val/test row indices for one shard (sorted, so reads stay sequential)."""
+    rng = np.random.default_rng(seed)
+    parts = {name: [] for name in SPLIT_FRACTIONS}
+    for label in (0, 1):
+        rows = np.flatnonzero(y == label)
+        rng.shuffle(rows)
+        n_train = int(round(len(rows) * SPLIT_FRACTIONS['train']))
+        n_val = int(round(len(rows) * SPLIT_FRACTIONS['val']))
+        parts['train'].append(rows[:n_train])
+        parts['val'].append(rows[n_train:n_train + n_val])
+        parts['test'].append(rows[n_train + n_val:])
+    return {name: np.sort(np.concatenate(rows)) for name, rows in parts.items()}
+
+
+class ShardedDataset:
+    """Memory-mapped .npy shards with index-view train/val/test splits."""
+
+    def __init__(self, directory: str, seed: int = 42, block_rows: int = 65536):
+        self.manifest, self.shards = open_shards(directory)
+        self.feature_names = self.manifest['feature_names']
+        self.n_rows = sum(len(y) for _, y in self.shards)
+        self.block_rows = block_rows
+        self._seeds = np.random.SeedSequence(seed).spawn(len(self.shards))
+        self._cached_split = (None, None)
+
+    def split(self, shard: int) -> dict:
+        """Index arrays of one shard; only the most recent shard's are kept."""
+        if self._cached_split[0] != shard:
+            self._cached_split = (shard, split_shard(np.asarray(self.shards[shard][1]),
+                                                     self._seeds[shard]))
+        return self._cached_split[1]
+
+    def blocks(self, subset: str, rng: np.random.Generator = None):
+        """
+        Yield (X, y) float32/int arrays with the `subset` rows of each block.
+
+        A block is read as one contiguous slice of the memory map and then
+        indexed in memory. With `rng`, shard and block order are shuffled.
+        """
+        shard_order = rng.permutation(len(self.shards)) if rng is not None else range(len(self.shards))
+        for shard in shard_order:
+            X, y = self.shards[shard]
+            rows = self.split(shard)[subset]
+            starts = np.arange(0, len(y), self.block_rows)
+            if rng is not None:
+                rng.shuffle(starts)
+            for start in starts:
+                lo, hi = np.searchsorted(rows, [start, start + self.block_rows])
+                if lo == hi:
+                    continue
+                local = rows[lo:hi] - start
+                X_block = np.asarray(X[start:start + self.block_rows], dtype=np.float32)[local]
+                yield X_block, np.asarray(y[start:start + self.block_rows])[local]
+
+    def materialize(self, subset: str, scaler, max_rows: int = None) -> tuple:
+        """Scaled (X, y) of the first `max_rows` rows of `subset`, in shard order."""
+        X_parts, y_parts, n = [], [], 0
+        for X_block, y_block in self.blocks(subset):
+            take = len(y_block) if max_rows is None else min(len(y_block), max_rows - n)
+            X_parts.append(scaler.transform(X_block[:take]).astype(np.float32))
+            y_parts.append(y_block[:take])
+            n += take
+            if max_rows is not None and n >= max_rows:
+                break
+        return np.concatenate(X_parts), np.concatenate(y_parts)
+
+
+def fit_scaler_streaming(data: ShardedDataset) -> tuple:
+    """One pass over the training rows: StandardScaler.partial_fit plus class counts."""
+    from sklearn.preprocessing import StandardScaler
+    scaler = StandardScaler()
+    n_total = n_positive = 0
+    for X_block, y_block in data.blocks('train'):
+        scaler.partial_fit(X_block)
+        n_total += len(y_block)
+        n_positive += int(y_block.sum())
+    return scaler, n_total, n_positive
+
+
+def make_streaming_dataset(data: ShardedDataset, scaler, class_weights: dict,
+                           batch_size: int, seed: int = 42):
+    """
+    tf.data pipeline of shuffled, scaled (x, y, sample_weight) training batches.
+
+    Rows left over at the end of a block are carried into the next one, so
+    every batch except the last of an epoch is full.
+    """
+    tf = tpm._import_tensorflow()
+    n_features = len(data.feature_names)
+    mean = scaler.mean_.astype(np.float32)
+    scale = scaler.scale_.astype(np.float32)
+    weights = np.array([class_weights[0], class_weights[1]], dtype=np.float32)
+    epochs = itertools.count()
+
+    def generator():
+        # Keras re-creates the iterator every epoch; each gets a new order
+        rng = np.random.default_rng([seed, next(epochs)])
+        X_carry = np.empty((0, n_features), dtype=np.float32)
+        y_carry = np.empty(0, dtype=np.float32)
+        for X_block, y_block in data.blocks('train', rng=rng):
+            order = rng.permutation(len(y_block))
+            X = np.concatenate([X_carry, (X_block[order] - mean) / scale])
+            y = np.concatenate([y_carry, y_block[order].astype(np.float32)])
+            n_full = len(y) - len(y) % batch_size
+            for start in range(0, n_full, batch_size):
+                y_batch = y[start:start + batch_size]
+                yield X[start:start + batch_size], y_batch, weights[y_batch.astype(int)]
+            X_carry, y_carry = X[n_full:], y[n_full:]
+        if len(y_carry):
+            yield X_carry, y_carry, weights[y_carry.astype(int)]
+
+    signature = (tf.TensorSpec(shape=(None, n_features), dtype=tf.float32),
+                 tf.TensorSpec(shape=(None,), dtype=tf.float32),
+                 tf.TensorSpec(shape=(None,), dtype=tf.float32))
+    return tf.data.Dataset.from_generator(generator, output_signature=signature) \
+        .prefetch(tf.data.AUTOTUNE)
+
+
+def train_sharded(directory: str, output_dir: str = SHARDED_DIR, epochs: int = 10,
+                  batch_size: int = 1024, scale_lr: bool = False, base_batch_size: int = 16,
+                  block_rows: int = 65536,
+                  val_rows: int = 200_000, eval_rows: int = 1_000_000, n_bootstrap: int = 200,
+                  seed: int = 42, verbose: int = 1) -> dict:
+    """
+    Fit scaler and model on the shards in `directory`; returns the test metrics.
+
+    The test set can be a million rows, so the bootstrap intervals default
+    to 200 resamples instead of evaluate_model's 2000 (0 skips them).
+    """
+    import joblib
+    tpm._import_tensorflow()
+
+    print("\n" + "=" * 60)
+    print("Out-of-Core Sharded Training")
+    print("=" * 60)
+
+    data = ShardedDataset(directory, seed=seed, block_rows=block_rows)
+    print(f"\n  Shards:   {len(data.shards)} in {directory}")
+    print(f"  Rows:     {data.n_rows:,} x {len(data.feature_names)} features "
+          f"({data.n_rows * len(data.feature_names) * data.shards[0][0].itemsize / 1e9:.2f} GB)")
+    print(f"  Block:    {block_rows:,} rows")
+
+    start_time = time.perf_counter()
+    scaler, n_total, n_positive = fit_scaler_streaming(data)
+    class_weights = {0: n_total / (2 * (n_total - n_positive)), 1: n_total / (2 * n_positive)}
+    print(f"\n✓ Scaler fitted on {n_total:,} training rows in "
+          f"{time.perf_counter() - start_time:.2f}s (streaming partial_fit)")
+    print(f"  Class weights: {class_weights}")
+
+    X_val, y_val = data.materialize('val', scaler, max_rows=val_rows)
+    print(f"✓ Validation set: {len(y_val):,} rows (cap {val_rows:,})")
+
+    model = tpm.build_model(input_dim=len(data.feature_names))
+    if scale_lr:
+        tpm.scale_learning_rate(model, batch_size, base_batch_size)
+
+    os.makedirs(output_dir, exist_ok=True)
+    callbacks = tpm.training_callbacks(os.path.join(output_dir, 'best_model.keras'),
+                                       verbose=verbose)
+    train_ds = make_streaming_dataset(data, scaler, class_weights, batch_size, seed=seed)
+    val_ds = tpm.make_dataset(X_val, y_val, max(batch_size, 256))
+
+    print(f"\nTraining: {epochs} epochs, batch size {batch_size}, "
+          f"lr {float(model.optimizer.learning_rate):g}")
+    start_time = time.perf_counter()
+    model.fit(train_ds, validation_data=val_ds, epochs=epochs, callbacks=callbacks,
+              verbose=verbose)
+    train_time = time.perf_counter() - start_time
+    del X_val, y_val
+
+    X_test, y_test = data.materialize('test', scaler, max_rows=eval_rows)
+    metrics = tpm.evaluate_model(model, X_test, y_test, save_plots=False,
+                                 n_bootstrap=n_bootstrap)
+
+    model_path = os.path.join(output_dir, 'parkinson_model_sharded.keras')
+    scaler_path = os.path.join(output_dir, 'scaler.joblib')
+    model.save(model_path)
+    joblib.dump(scaler, scaler_path)
+
+    summary = {
+        'source': os.path.abspath(directory),
+        'rows': data.n_rows,
+        'train_rows': n_total,
+        'test_rows_evaluated': int(len(y_test)),
+        'epochs': epochs,
+        'batch_size': batch_size,
+        'train_time_sec': train_time,
+        'peak_rss_mb': _peak_rss_mb(),
+        'metrics': {k: float(v) for k, v in metrics.items()},
+    }
+    with open(os.path.join(output_dir, 'training_summary.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+
+    print(f"\n✓ Model saved to: {model_path}")
+    print(f"✓ Scaler saved to: {scaler_path}")
+    print(f"  Training time: {train_time:.1f}s ({n_total * epochs / train_time:,.0f} rows/s)")
+    print(f"  Peak RSS:      {summary['peak_rss_mb']:.0f} MB")
+    return metrics
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Train from memory-mapped .npy shards")
+    parser.add_argument('shards', help='Directory with X-*.npy / y-*.npy and manifest.json')
+    parser.add_argument('--output-dir', default=SHARDED_DIR, help='Where to write the model')
+    parser.add_argument('--epochs', type=int, default=10)
+    parser.add_argument('--batch-size', type=int, default=1024)
+    parser.add_argument('--scale-lr', action='store_true',
+                        help='Scale the learning rate linearly with --batch-size (relative to 16)')
+    parser.add_argument('--block-rows', type=int, default=65536,
+                        help='Rows read from a shard at a time (bounds memory and shuffle window)')
+    parser.add_argument('--val-rows', type=int, default=200_000, help='Validation rows held in memory')
+    parser.add_argument('--eval-rows', type=int, default=1_000_000, help='Test rows evaluated')
+    parser.add_argument('--n-bootstrap', type=int, default=200,
+                        help='Bootstrap resamples for the test-set CIs (0 to skip)')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    train_sharded(args.shards, output_dir=args.output_dir, epochs=args.epochs,
+                  batch_size=args.batch_size, scale_lr=args.scale_lr,
+                  block_rows=args.block_rows, val_rows=args.val_rows,
+                  eval_rows=args.eval_rows, n_bootstrap=args.n_bootstrap, seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+NeuroAccess - Streaming Voice Feature Extraction
+
+Frame-incremental version of feature_extraction.py for long clinic
+recordings. Audio is consumed block by block from any iterable of sample
+arrays (e.g. a WAV file read in chunks), and every feature group keeps a
+running accumulator instead of the waveform:
+
+    autocorrelation  lag-product sums for lags < 2000, updated with one FFT
+                     per block, plus the first/last 2000 samples so the
+                     global-mean centring can be applied exactly at the end
+    shimmer          running sums over the 10 ms peak amplitudes
+    DFA              per-window-size residual sums of the integrated
+                     profile (linear detrending cancels the global mean)
+    D2               zero-crossing count
+    RPDE             one energy value per 10 ms frame, because the Dart
+                     binning is relative to the final maximum energy
+
+Apart from the RPDE energy trace (8 bytes per 160 samples) memory does not
+depend on the recording length. Results match extract_features() on the
+whole waveform up to floating-point rounding.
+
+With --window/--hop, features are emitted for every complete sliding
+window. Each open window has its own accumulators, so memory is bounded by
+window / hop extractors.
+
+Usage:
+    python ml/streaming_features.py recordings/ --output features.csv
+    python ml/streaming_features.py recordings/ --window 5 --hop 2.5 --status 1 --output windows.csv
+"""
+
+import os
+import sys
+import time
+import wave
+import argparse
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import feature_extraction as fx
+from feature_extraction import FEATURE_NAMES
+
+
+class _FrameStream:
+    """
+    Splits a sample stream into non-overlapping frames and reduces each one.
+
+    Like the Dart loops, a frame only counts once at least one sample
+    follows it, so the last frame of the recording is never included.
+    """
+
+    def __init__(self, frame_size: int, reduce):
+        self.frame_size = frame_size
+        self.reduce = reduce
+        self._carry = np.zeros(0)
+        self._pending = None
+
+    def push(self, x: np.ndarray) -> np.ndarray:
+        if len(x) == 0:
+            return np.zeros(0)
+        committed = [] if self._pending is None else [self._pending]
+        self._pending = None
+
+        data = np.concatenate([self._carry, x])
+        n_frames = len(data) // self.frame_size
+        values = self.reduce(data[:n_frames * self.frame_size].reshape(n_frames, self.frame_size))
+        self._carry = data[n_frames * self.frame_size:].copy()
+        if n_frames and len(self._carry) == 0:
+            values, self._pending = values[:-1], values[-1:]
+        committed.append(values)
+        return np.concatenate(committed)
+
+
+class _AutocorrelationAccumulator:
+    """Exact streaming version of feature_extraction.autocorrelation()."""
+
+    def __init__(self, max_lag: int = fx.MAX_AUTOCORR_LAG):
+        self.max_lag = max_lag
+        self.lag_sums = np.zeros(max_lag)
+        self.history = np.zeros(0)   # last max_lag samples
+        self.head = np.zeros(0)      # first max_lag samples
+        self.total = 0.0
+        self.n = 0
+
+    def push(self, x: np.ndarray) -> None:
+        L = self.max_lag
+        # Left-pad so the history always spans L samples; the zeros stand in
+        # for samples before the start of the recording.
+        z = np.concatenate([np.zeros(L - len(self.history)), self.history, x])
+        n_fft = 1 << int(L + len(x)).bit_length()
+        corr = np.fft.irfft(np.conj(np.fft.rfft(x, n_fft)) * np.fft.rfft(z, n_fft), n_fft)
+        # corr[k] = sum_j x[j] * z[j + k]; lag l pairs x[j] with z[L + j - l]
+        self.lag_sums += corr[L - np.arange(L)]
+
+        self.history = z[-L:].copy()
+        if len(self.head) < L:
+            self.head = np.concatenate([self.head, x[:L - len(self.head)]])
+        self.total += float(x.sum())
+        self.n += len(x)
+
+    def result(self) -> np.ndarray:
+        n = self.n
+        max_lag = min(n // 4, self.max_lag)
+        if max_lag == 0:
+            return np.zeros(0)
+        lags = np.arange(max_lag)
+        mean = self.total / n
+        tail = self.history[len(self.history) - min(n, self.max_lag):]
+        head_sums = np.concatenate([[0.0], np.cumsum(self.head)])[lags]
+        tail_sums = np.concatenate([[0.0], np.cumsum(tail[::-1])])[lags]
+        # sum_{i < n-l} (x_i - m)(x_{i+l} - m), expanded around the raw lag sums
+        centred = (self.lag_sums[:max_lag]
+                   - mean * ((self.total - tail_sums) + (self.total - head_sums))
+                   + (n - lags) * mean * mean)
+        return fx.normalize_autocorrelation(centred, n)
+
+
+class _ShimmerAccumulator:
+    """Running sums for the shimmer features over the non-silent peak amplitudes."""
+
+    def __init__(self):
+        self.tail = np.zeros(0)   # last 4 amplitudes, for windows spanning pushes
+        self.n = 0
+        self.amp_sum = 0.0
+        self.abs_diff_sum = 0.0
+        self.db_sum = 0.0
+        self.apq3_sum = 0.0
+        self.apq5_sum = 0.0
+
+    def push(self, peaks: np.ndarray) -> None:
+        amplitudes = peaks[peaks > 0.01]
+        if len(amplitudes) == 0:
+            return
+        arr = np.concatenate([self.tail, amplitudes])
+        t = len(self.tail)
+        self.n += len(amplitudes)
+        self.amp_sum += float(amplitudes.sum())
+
+        # Only pairs and windows that end in a new amplitude
+        s = max(t, 1)
+        if len(arr) > s:
+            ratios = arr[s:] / arr[s - 1:-1]
+            self.abs_diff_sum += float(np.abs(arr[s:] - arr[s - 1:-1]).sum())
+            self.db_sum += float(np.abs(20 * fx._log10(ratios)).sum())
+        for points in (3, 5):
+            window_values = arr[max(t - points + 1, 0):]
+            if len(window_values) >= points:
+                total = fx._perturbation_quotient(window_values, points)
+                if points == 3:
+                    self.apq3_sum += total
+                else:
+                    self.apq5_sum += total
+        self.tail = arr[-4:].copy()
+
+    def result(self) -> dict:
+        return fx.shimmer_from_sums(self.n, self.amp_sum, self.abs_diff_sum, self.db_sum,
+                                    self.apq3_sum, self.apq5_sum)
+
+
+class _DFAAccumulator:
+    """Residual sums of the integrated profile for each DFA window size."""
+
+    def __init__(self):
+        self.profile_end = 0.0
+        self.partial = {ws: np.zeros(0) for ws in fx.DFA_WINDOW_SIZES}
+        self.residual_sums = {ws: 0.0 for ws in fx.DFA_WINDOW_SIZES}
+        self.n = 0
+
+    def push(self, x: np.ndarray) -> None:
+        # Uncentred profile: the mean only adds a linear term per window,
+        # which the detrending removes.
+        profile = self.profile_end + np.cumsum(x)
+        self.profile_end = float(profile[-1])
+        self.n += len(x)
+        for ws in fx.DFA_WINDOW_SIZES:
+            data = np.concatenate([self.partial[ws], profile])
+            n_windows = len(data) // ws
+            if n_windows:
+                windows = data[:n_windows * ws].reshape(n_windows, ws)
+                # Offsetting each window keeps precision as the profile drifts
+                self.residual_sums[ws] += fx.detrended_residual_sum(windows - windows[:, :1])
+            self.partial[ws] = data[n_windows * ws:].copy()
+
+    def result(self) -> float:
+        return fx.dfa_from_residual_sums(self.residual_sums, self.n)
+
+
+class StreamingFeatureExtractor:
+    """
+    Incremental equivalent of feature_extraction.extract_features().
+
+    Feed samples with update() in chunks of any size, then call finalize()
+    for the 22 raw features. Input is regrouped into blocks of
+    `block_size` samples so per-call overhead and FFT sizes stay fixed.
+    """
+
+    def __init__(self, sample_rate: int = 16000, block_size: int = 8192):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.n_samples = 0
+        self._buffer = []
+        self._buffered = 0
+
+        self._autocorr = _AutocorrelationAccumulator()
+        self._peaks = _FrameStream(sample_rate // 100, lambda f: np.abs(f).max(axis=1, initial=0.0))
+        self._shimmer = _ShimmerAccumulator()
+        self._energy_frames = _FrameStream(fx.RPDE_FRAME_SIZE, fx.frame_energies)
+        self._energies = []
+        self._dfa = _DFAAccumulator()
+        self._crossings = 0
+        self._last_non_negative = None
+
+    def update(self, samples: np.ndarray) -> None:
+        # The app holds samples as Float32 and does all arithmetic in double
+        x = np.asarray(samples, dtype=np.float32).astype(np.float64).ravel()
+        if len(x) == 0:
+            return
+        self._buffer.append(x)
+        self._buffered += len(x)
+        if self._buffered < self.block_size:
+            return
+        data = np.concatenate(self._buffer)
+        n_full = len(data) // self.block_size * self.block_size
+        for start in range(0, n_full, self.block_size):
+            self._process(data[start:start + self.block_size])
+        rest = data[n_full:]
+        self._buffer = [rest] if len(rest) else []
+        self._buffered = len(rest)
+
+    def _process(self, x: np.ndarray) -> None:
+        self.n_samples += len(x)
+        self._autocorr.push(x)
+        self._shimmer.push(self._peaks.push(x))
+        energies = self._energy_frames.push(x)
+        if len(energies):
+            self._energies.append(energies)
+        self._dfa.push(x)
+
+        non_negative = x >= 0
+        self._crossings += int(np.count_nonzero(non_negative[1:] != non_negative[:-1]))
+        if self._last_non_negative is not None and non_negative[0] != self._last_non_negative:
+            self._crossings += 1
+        self._last_non_negative = bool(non_negative[-1])
+
+    def finalize(self) -> np.ndarray:
+        """Flush buffered samples and return the 22 features in FEATURE_NAMES order."""
+        if self._buffered:
+            self._process(np.concatenate(self._buffer))
+            self._buffer, self._buffered = [], 0
+
+        n = self.n_samples
+        energies = np.concatenate(self._energies) if self._energies else np.zeros(0)
+        return fx.assemble_features(
+            autocorr=self._autocorr.result(),
+            sample_rate=self.sample_rate,
+            shimmer=self._shimmer.result(),
+            rpde_value=fx.rpde_from_energies(energies),
+            dfa_value=self._dfa.result(),
+            zcr=self._crossings / n if n >= 2 else 0.0,
+        )
+
+
+# ----------------------------------------------------------------------------
+# Stream sources and windowing
+# ----------------------------------------------------------------------------
+
+def open_wav_stream(path: str, frames_per_read: int = 16384) -> tuple:
+    """Return (sample_rate, generator of float32 sample chunks) for a PCM WAV file."""
+    wav = wave.open(path, 'rb')
+    sample_rate = wav.getframerate()
+
+    def chunks():
+        with wav:
+            width, n_channels = wav.getsampwidth(), wav.getnchannels()
+            while True:
+                raw = wav.readframes(frames_per_read)
+                if not raw:
+                    break
+                yield fx.decode_pcm(raw, width, n_channels)
+
+    return sample_rate, chunks()
+
+
+def stream_features(chunks, sample_rate: int = 16000) -> np.ndarray:
+    """Features of the whole recording delivered by `chunks`."""
+    extractor = StreamingFeatureExtractor(sample_rate)
+    for chunk in chunks:
+        extractor.update(chunk)
+    return extractor.finalize()
+
+
+def stream_window_features(chunks, sample_rate: int, window_sec: float, hop_sec: float):
+    """
+    Yield (start_sample, features) for every complete sliding window.
+
+    A trailing partial window is not emitted.
+    """
+    window = int(round(window_sec * sample_rate))
+    hop = int(round(hop_sec * sample_rate))
+    if window <= 0 or hop <= 0:
+        raise ValueError("Window and hop must be positive")
+
+    active = deque()   # (start_sample, extractor), oldest first
+    position = 0
+    next_start = 0
+    for chunk in chunks:
+        x = np.asarray(chunk, dtype=np.float32).ravel()
+        while len(x):
+            if position == next_start:
+                active.append((position, StreamingFeatureExtractor(sample_rate)))
+                next_start += hop
+            # Advance to the next window start or end, whichever comes first
+            step = min([len(x), next_start - position]
+                       + [start + window - position for start, _ in active])
+            for _, extractor in active:
+                extractor.update(x[:step])
+            position += step
+            x = x[step:]
+            while active and active[0][0] + window == position:
+                start, extractor = active.popleft()
+                yield start, extractor.finalize()
+
+
+def extract_file_stream(path: str, window_sec: float = None, hop_sec: float = None) -> tuple:
+    """Stream one WAV file; returns (row names, (n_rows, 22) features)."""
+    sample_rate, chunks = open_wav_stream(path)
+    name = fx.recording_name(path)
+    if window_sec is None:
+        return [name], stream_features(chunks, sample_rate)[None, :]
+
+    names, rows = [], []
+    for start, features in stream_window_features(chunks, sample_rate, window_sec,
+                                                  hop_sec or window_sec):
+        names.append(f"{name}@{start / sample_rate:.2f}s")
+        rows.append(features)
+    return names, np.array(rows).reshape(-1, len(FEATURE_NAMES))
+
+
+def build_feature_matrix(paths: list, labels: list = None, window_sec: float = None,
+                         hop_sec: float = None, n_workers: int = None) -> tuple:
+    """
+    Stream every recording and stack the rows.
+
+    Returns (X, y, feature_names, row_names) -- the first three follow the
+    load_and_preprocess_data contract. Each row takes the label of its
+    recording; y is None when `labels` is not given.
+    """
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(paths) or 1))
+    args = [(path, window_sec, hop_sec) for path in paths]
+    if n_workers == 1:
+        results = [extract_file_stream(*a) for a in args]
+    else:
+        ctx = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+            results = list(pool.map(extract_file_stream, *zip(*args)))
+
+    row_names = [name for names, _ in results for name in names]
+    X = (np.vstack([rows for _, rows in results]) if results
+         else np.zeros((0, len(FEATURE_NAMES))))
+    y = None
+    if labels is not None:
+        y = np.concatenate([np.full(len(names), label, dtype=np.int64)
+                            for (names, _), label in zip(results, labels)])
+    return X, y, list(FEATURE_NAMES), row_names
+
+
+def main(argv: list = None):
+    parser = argparse.ArgumentParser(description="Streaming voice feature extraction")
+    parser.add_argument('wav_dir', help='Directory of WAV recordings (searched recursively)')
+    parser.add_argument('--output', default='features.csv', help='Output CSV path')
+    parser.add_argument('--window', type=float, default=None,
+                        help='Sliding window length in seconds (default: whole recording)')
+    parser.add_argument('--hop', type=float, default=None,
+                        help='Hop between windows in seconds (default: window length)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: CPU count)')
+    parser.add_argument('--status', type=int, choices=[0, 1], default=None,
+                        help="Label to record for every row (0 healthy, 1 Parkinson's)")
+    args = parser.parse_args(argv)
+
+    paths = sorted(
+        os.path.join(root, name)
+        for root, _, files in os.walk(args.wav_dir)
+        for name in files if name.lower().endswith('.wav')
+    )
+    start_time = time.perf_counter()
+    X, _, _, row_names = build_feature_matrix(paths, window_sec=args.window,
+                                              hop_sec=args.hop, n_workers=args.workers)
+    elapsed = time.perf_counter() - start_time
+    fx.save_features_csv(X, row_names, args.output, status=args.status)
+    print(f"✓ Streamed {len(paths)} recordings into {len(row_names)} rows "
+          f"in {elapsed:.2f}s -> {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
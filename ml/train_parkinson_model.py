@@ -14,30 +14,35 @@ Author: Junho Lee
 Date: 2026-01-27
 """
 
+from __future__ import annotations
+
 import os
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import sys
+import time
+import argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from typing import TYPE_CHECKING
+
+import numpy as np
 
-# TensorFlow
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras import layers, regularizers
-from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
-
-# Scikit-learn
-from sklearn.model_selection import train_test_split, StratifiedKFold
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import (
-    accuracy_score, precision_score, recall_score, f1_score,
-    confusion_matrix, classification_report, roc_curve, auc
+from dataset_cache import load_dataset_cache, save_dataset_cache
+from plot_renderer import (
+    PlotRenderer, render_correlation_matrix, render_feature_distributions,
+    render_training_history, render_confusion_matrix, render_roc_curve
 )
 
-# Set random seeds for reproducibility
+# TensorFlow, pandas, matplotlib/seaborn and scikit-learn are imported inside
+# the functions that use them: together they add several seconds of startup,
+# and most pipeline stages (see pipeline.py) only need one or two of them.
+if TYPE_CHECKING:
+    import tensorflow as tf
+    from tensorflow import keras
+
+# Set random seeds for reproducibility (TensorFlow is seeded on first import)
 np.random.seed(42)
-tf.random.set_seed(42)
+_tf_seeded = False
 
 # Paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -45,16 +50,47 @@ PROJECT_DIR = os.path.dirname(BASE_DIR)
 DATA_PATH = os.path.join(PROJECT_DIR, 'data', 'raw', 'parkinsons.data')
 OUTPUT_DIR = os.path.join(BASE_DIR, 'outputs')
 MODEL_DIR = os.path.join(PROJECT_DIR, 'mobile_app', 'assets', 'models')
+CV_MODEL_DIR = os.path.join(OUTPUT_DIR, 'cv_models')
+
+# Test-set targets checked by evaluate_model (fractions; AUC as is)
+METRIC_TARGETS = {'accuracy': 0.85, 'sensitivity': 0.85, 'specificity': 0.80, 'auc_roc': 0.90}
 
 # Create output directories
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 os.makedirs(MODEL_DIR, exist_ok=True)
 
 
-def load_and_preprocess_data(data_path: str) -> tuple:
+def _import_tensorflow():
+    """Import TensorFlow on first use and apply the global seed."""
+    global _tf_seeded
+    import tensorflow as tf
+    if not _tf_seeded:
+        tf.random.set_seed(42)
+        _tf_seeded = True
+    return tf
+
+
+def _tensorflow_version() -> str:
+    """TensorFlow version string, without importing TF if it isn't loaded yet."""
+    if 'tensorflow' in sys.modules:
+        return sys.modules['tensorflow'].__version__
+    from importlib import metadata
+    for dist in ('tensorflow', 'tensorflow-cpu', 'tensorflow-macos'):
+        try:
+            return metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            continue
+    return _import_tensorflow().__version__
+
+
+def load_and_preprocess_data(data_path: str, use_cache: bool = True) -> tuple:
     """
     Load UCI Parkinson's dataset and preprocess for training.
     
+    With use_cache, the parsed arrays are stored in a binary cache keyed by
+    the raw file's content hash and parser version (see dataset_cache.py)
+    and later runs open them memory-mapped instead of re-parsing the CSV.
+    
     Returns:
         X: Feature matrix (n_samples, n_features)
         y: Target vector (n_samples,)
@@ -64,24 +100,37 @@ def load_and_preprocess_data(data_path: str) -> tuple:
     print("STEP 1: Loading and Preprocessing Data")
     print("=" * 60)
     
-    # Load dataset
-    df = pd.read_csv(data_path)
-    print(f"\nDataset shape: {df.shape}")
-    print(f"Columns: {list(df.columns)}")
-    
-    # Display dataset info
-    print(f"\nClass distribution:")
-    print(df['status'].value_counts())
-    print(f"  - Parkinson's (1): {df['status'].sum()} samples ({df['status'].mean()*100:.1f}%)")
-    print(f"  - Healthy (0): {len(df) - df['status'].sum()} samples ({(1-df['status'].mean())*100:.1f}%)")
-    
-    # Drop 'name' column (patient identifier)
-    df = df.drop('name', axis=1)
-    
-    # Separate features and target
-    X = df.drop('status', axis=1).values
-    y = df['status'].values
-    feature_names = df.drop('status', axis=1).columns.tolist()
+    cached = load_dataset_cache(data_path) if use_cache else None
+    if cached is not None:
+        X, y, feature_names = cached
+        print(f"\n✓ Loaded from dataset cache (raw file unchanged)")
+        print(f"\nClass distribution:")
+        print(f"  - Parkinson's (1): {int(y.sum())} samples ({y.mean()*100:.1f}%)")
+        print(f"  - Healthy (0): {len(y) - int(y.sum())} samples ({(1-y.mean())*100:.1f}%)")
+    else:
+        import pandas as pd
+        
+        # Load dataset
+        df = pd.read_csv(data_path)
+        print(f"\nDataset shape: {df.shape}")
+        print(f"Columns: {list(df.columns)}")
+        
+        # Display dataset info
+        print(f"\nClass distribution:")
+        print(df['status'].value_counts())
+        print(f"  - Parkinson's (1): {df['status'].sum()} samples ({df['status'].mean()*100:.1f}%)")
+        print(f"  - Healthy (0): {len(df) - df['status'].sum()} samples ({(1-df['status'].mean())*100:.1f}%)")
+        
+        # Separate features and target, dropping the 'name' patient identifier.
+        # A single drop avoids copying the frame once per column.
+        features = df.drop(columns=['name', 'status'])
+        X = features.to_numpy(dtype=np.float64)
+        y = df['status'].to_numpy(dtype=np.int64)
+        feature_names = features.columns.tolist()
+        
+        if use_cache:
+            cache_path = save_dataset_cache(data_path, X, y, feature_names)
+            print(f"\n✓ Dataset cached to {cache_path}")
     
     print(f"\nFeature matrix shape: {X.shape}")
     print(f"Target vector shape: {y.shape}")
@@ -90,8 +139,15 @@ def load_and_preprocess_data(data_path: str) -> tuple:
     return X, y, feature_names
 
 
-def explore_data(X: np.ndarray, y: np.ndarray, feature_names: list) -> None:
-    """Generate exploratory data analysis visualizations."""
+def explore_data(X: np.ndarray, y: np.ndarray, feature_names: list,
+                 renderer: PlotRenderer = None) -> None:
+    """
+    Generate exploratory data analysis visualizations.
+    
+    Figures go through `renderer` (rendered in-process if None).
+    """
+    import pandas as pd
+    
     print("\n" + "=" * 60)
     print("STEP 2: Exploratory Data Analysis")
     print("=" * 60)
@@ -103,46 +159,29 @@ def explore_data(X: np.ndarray, y: np.ndarray, feature_names: list) -> None:
     # Feature statistics
     print("\nFeature Statistics:")
     print(df.describe().T)
+    print()
+    
+    renderer = renderer or PlotRenderer(asynchronous=False)
+    X, y = np.asarray(X), np.asarray(y)
     
     # Save correlation heatmap
-    plt.figure(figsize=(16, 14))
-    corr_matrix = df.corr()
-    mask = np.triu(np.ones_like(corr_matrix, dtype=bool))
-    sns.heatmap(corr_matrix, mask=mask, cmap='coolwarm', center=0,
-                annot=False, square=True, linewidths=0.5)
-    plt.title("Feature Correlation Matrix", fontsize=14)
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'correlation_matrix.png'), dpi=150)
-    plt.close()
-    print("\n✓ Correlation matrix saved to outputs/correlation_matrix.png")
+    renderer.submit(render_correlation_matrix, X, y, feature_names,
+                    os.path.join(OUTPUT_DIR, 'correlation_matrix.png'),
+                    label='Correlation matrix')
     
     # Feature distributions by class
-    fig, axes = plt.subplots(5, 5, figsize=(20, 16))
-    axes = axes.flatten()
-    
-    for idx, col in enumerate(feature_names[:25]):
-        if idx < len(axes):
-            ax = axes[idx]
-            df[df['status'] == 0][col].hist(ax=ax, alpha=0.5, label='Healthy', bins=15)
-            df[df['status'] == 1][col].hist(ax=ax, alpha=0.5, label="Parkinson's", bins=15)
-            ax.set_title(col, fontsize=8)
-            ax.legend(fontsize=6)
-    
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'feature_distributions.png'), dpi=150)
-    plt.close()
-    print("✓ Feature distributions saved to outputs/feature_distributions.png")
+    renderer.submit(render_feature_distributions, X, y, feature_names,
+                    os.path.join(OUTPUT_DIR, 'feature_distributions.png'),
+                    label='Feature distributions')
 
 
-def prepare_data_splits(X: np.ndarray, y: np.ndarray) -> tuple:
+def split_data(X: np.ndarray, y: np.ndarray) -> tuple:
     """
-    Split data into train/validation/test sets and normalize.
+    Stratified 70/15/15 split of unscaled data.
     
-    Split ratio: 70% train, 15% validation, 15% test
+    Returns (X_train, X_val, X_test, y_train, y_val, y_test).
     """
-    print("\n" + "=" * 60)
-    print("STEP 3: Data Splitting and Normalization")
-    print("=" * 60)
+    from sklearn.model_selection import train_test_split
     
     # First split: 70% train, 30% temp
     X_train, X_temp, y_train, y_temp = train_test_split(
@@ -153,6 +192,26 @@ def prepare_data_splits(X: np.ndarray, y: np.ndarray) -> tuple:
     X_val, X_test, y_val, y_test = train_test_split(
         X_temp, y_temp, test_size=0.50, random_state=42, stratify=y_temp
     )
+    return X_train, X_val, X_test, y_train, y_val, y_test
+
+
+def prepare_data_splits(X: np.ndarray, y: np.ndarray, save_scaler: bool = True) -> tuple:
+    """
+    Split data into train/validation/test sets and normalize.
+    
+    Split ratio: 70% train, 15% validation, 15% test
+    
+    The fitted scaler is written to outputs/scaler.joblib unless
+    save_scaler=False. Tools that score an already trained model should
+    use load_scaled_splits instead, so they never refit or replace it.
+    """
+    from sklearn.preprocessing import StandardScaler
+    
+    print("\n" + "=" * 60)
+    print("STEP 3: Data Splitting and Normalization")
+    print("=" * 60)
+    
+    X_train, X_val, X_test, y_train, y_val, y_test = split_data(X, y)
     
     print(f"\nData splits:")
     print(f"  Training:   {X_train.shape[0]} samples ({X_train.shape[0]/len(X)*100:.1f}%)")
@@ -170,26 +229,50 @@ def prepare_data_splits(X: np.ndarray, y: np.ndarray) -> tuple:
     print(f"  Std (train):  {X_train_scaled.std():.6f}")
     
     # Save scaler for later use
-    import joblib
-    scaler_path = os.path.join(OUTPUT_DIR, 'scaler.joblib')
-    joblib.dump(scaler, scaler_path)
-    print(f"✓ Scaler saved to {scaler_path}")
+    if save_scaler:
+        import joblib
+        scaler_path = os.path.join(OUTPUT_DIR, 'scaler.joblib')
+        joblib.dump(scaler, scaler_path)
+        print(f"✓ Scaler saved to {scaler_path}")
     
     return (X_train_scaled, X_val_scaled, X_test_scaled, 
             y_train, y_val, y_test, scaler)
 
 
-def build_model(input_dim: int) -> keras.Model:
+def load_scaled_splits(X: np.ndarray, y: np.ndarray, scaler_path: str = None) -> tuple:
+    """
+    The prepare_data_splits splits, scaled with the saved scaler.
+    
+    The scaler at `scaler_path` (outputs/scaler.joblib by default) is only
+    read, so the splits match what the current model was trained on, even
+    after incremental_retrain.py --promote replaced it.
+    """
+    import joblib
+    scaler = joblib.load(scaler_path or os.path.join(OUTPUT_DIR, 'scaler.joblib'))
+    X_train, X_val, X_test, y_train, y_val, y_test = split_data(X, y)
+    return (scaler.transform(X_train), scaler.transform(X_val), scaler.transform(X_test),
+            y_train, y_val, y_test, scaler)
+
+
+def build_model(input_dim: int,
+                units: tuple = (64, 32, 16),
+                dropout: float = 0.3,
+                l2: float = 0.001,
+                learning_rate: float = 0.001) -> keras.Model:
     """
     Build feedforward neural network for Parkinson's detection.
     
-    Architecture:
+    Architecture (defaults shown; see hyperparameter_search.py for tuning):
     - Input: 22 features (from UCI dataset)
     - Hidden Layer 1: 64 neurons, ReLU, BatchNorm, Dropout(0.3)
     - Hidden Layer 2: 32 neurons, ReLU, BatchNorm, Dropout(0.3)
     - Hidden Layer 3: 16 neurons, ReLU
     - Output: 1 neuron, Sigmoid
     """
+    _import_tensorflow()
+    from tensorflow import keras
+    from tensorflow.keras import layers, regularizers
+    
     print("\n" + "=" * 60)
     print("STEP 4: Building Neural Network Model")
     print("=" * 60)
@@ -199,22 +282,22 @@ def build_model(input_dim: int) -> keras.Model:
         layers.Input(shape=(input_dim,), name='input'),
         
         # Hidden layer 1
-        layers.Dense(64, activation='relu', 
-                    kernel_regularizer=regularizers.l2(0.001),
+        layers.Dense(units[0], activation='relu', 
+                    kernel_regularizer=regularizers.l2(l2),
                     name='dense_1'),
         layers.BatchNormalization(name='bn_1'),
-        layers.Dropout(0.3, name='dropout_1'),
+        layers.Dropout(dropout, name='dropout_1'),
         
         # Hidden layer 2
-        layers.Dense(32, activation='relu',
-                    kernel_regularizer=regularizers.l2(0.001),
+        layers.Dense(units[1], activation='relu',
+                    kernel_regularizer=regularizers.l2(l2),
                     name='dense_2'),
         layers.BatchNormalization(name='bn_2'),
-        layers.Dropout(0.3, name='dropout_2'),
+        layers.Dropout(dropout, name='dropout_2'),
         
         # Hidden layer 3
-        layers.Dense(16, activation='relu',
-                    kernel_regularizer=regularizers.l2(0.001),
+        layers.Dense(units[2], activation='relu',
+                    kernel_regularizer=regularizers.l2(l2),
                     name='dense_3'),
         
         # Output layer
@@ -223,7 +306,7 @@ def build_model(input_dim: int) -> keras.Model:
     
     # Compile model
     model.compile(
-        optimizer=keras.optimizers.Adam(learning_rate=0.001),
+        optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
         loss='binary_crossentropy',
         metrics=['accuracy', 
                 keras.metrics.Precision(name='precision'),
@@ -237,40 +320,134 @@ def build_model(input_dim: int) -> keras.Model:
     return model
 
 
-def train_model(model: keras.Model, 
-                X_train: np.ndarray, y_train: np.ndarray,
-                X_val: np.ndarray, y_val: np.ndarray) -> keras.callbacks.History:
+def make_dataset(X: np.ndarray, y: np.ndarray, batch_size: int,
+                 sample_weight: np.ndarray = None, shuffle: bool = False,
+                 seed: int = 42) -> tf.data.Dataset:
     """
-    Train the neural network with early stopping and learning rate reduction.
+    Build a cached, optionally shuffled, prefetching tf.data pipeline.
+    
+    Elements are (x, y) or (x, y, sample_weight) batches, which model.fit
+    consumes directly.
     """
-    print("\n" + "=" * 60)
-    print("STEP 5: Training Model")
-    print("=" * 60)
+    tf = _import_tensorflow()
+    
+    tensors = (X.astype(np.float32), y.astype(np.float32))
+    if sample_weight is not None:
+        tensors += (sample_weight.astype(np.float32),)
+    
+    dataset = tf.data.Dataset.from_tensor_slices(tensors).cache()
+    if shuffle:
+        dataset = dataset.shuffle(buffer_size=min(len(X), 100_000), seed=seed,
+                                  reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+
+
+def _throughput_logger() -> keras.callbacks.Callback:
+    """Callback that records training steps/sec per epoch in the logs/history."""
+    _import_tensorflow()
+    from tensorflow import keras
+    
+    state = {'steps': 0, 'start': 0.0}
+    
+    def on_epoch_begin(epoch, logs=None):
+        state['steps'] = 0
+        state['start'] = time.perf_counter()
+    
+    def on_train_batch_end(batch, logs=None):
+        state['steps'] += 1
+    
+    def on_epoch_end(epoch, logs=None):
+        elapsed = time.perf_counter() - state['start']
+        if logs is not None:
+            logs['steps_per_sec'] = state['steps'] / elapsed if elapsed > 0 else 0.0
+    
+    return keras.callbacks.LambdaCallback(
+        on_epoch_begin=on_epoch_begin,
+        on_train_batch_end=on_train_batch_end,
+        on_epoch_end=on_epoch_end,
+    )
+
+
+def training_callbacks(checkpoint_path: str = None, verbose: int = 1,
+                       extra_callbacks: list = None) -> list:
+    """
+    Early stopping on val_auc, LR reduction on val_loss, the throughput
+    logger and (if checkpoint_path is set) best-model checkpointing.
+    """
+    _import_tensorflow()
+    from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint, ReduceLROnPlateau
     
-    # Callbacks
     callbacks = [
         EarlyStopping(
             monitor='val_auc',
             patience=20,
             mode='max',
             restore_best_weights=True,
-            verbose=1
+            verbose=verbose
         ),
         ReduceLROnPlateau(
             monitor='val_loss',
             factor=0.5,
             patience=10,
             min_lr=1e-6,
-            verbose=1
+            verbose=verbose
         ),
-        ModelCheckpoint(
-            filepath=os.path.join(OUTPUT_DIR, 'best_model.keras'),
+        _throughput_logger(),
+    ]
+    if checkpoint_path:
+        callbacks.append(ModelCheckpoint(
+            filepath=checkpoint_path,
             monitor='val_auc',
             mode='max',
             save_best_only=True,
-            verbose=1
-        )
-    ]
+            verbose=verbose
+        ))
+    if extra_callbacks:
+        callbacks.extend(extra_callbacks)
+    return callbacks
+
+
+def scale_learning_rate(model: keras.Model, batch_size: int,
+                        base_batch_size: int = 16) -> None:
+    """Multiply the optimizer's learning rate by batch_size / base_batch_size (linear scaling rule)."""
+    if batch_size != base_batch_size:
+        base_lr = float(model.optimizer.learning_rate)
+        model.optimizer.learning_rate.assign(base_lr * batch_size / base_batch_size)
+
+
+def train_model(model: keras.Model, 
+                X_train: np.ndarray, y_train: np.ndarray,
+                X_val: np.ndarray, y_val: np.ndarray,
+                checkpoint_path: str = os.path.join(OUTPUT_DIR, 'best_model.keras'),
+                verbose: int = 1,
+                epochs: int = 100,
+                batch_size: int = 16,
+                extra_callbacks: list = None,
+                scale_lr: bool = False,
+                base_batch_size: int = 16,
+                target: np.ndarray = None) -> keras.callbacks.History:
+    """
+    Train the neural network with early stopping and learning rate reduction.
+    
+    Data is fed through a tf.data pipeline (cache, shuffle, prefetch) with
+    the class weights applied as per-sample weights.
+    
+    Pass checkpoint_path=None to skip writing the best model to disk
+    (e.g. when several folds train concurrently). `extra_callbacks` are
+    appended to the default callbacks (e.g. trial pruning).
+    
+    For large-batch training set scale_lr=True: the optimizer's learning
+    rate is multiplied by batch_size / base_batch_size (linear scaling rule).
+    
+    `target` replaces y_train as the training target, e.g. soft labels for
+    distillation; the class weights still come from y_train.
+    """
+    print("\n" + "=" * 60)
+    print("STEP 5: Training Model")
+    print("=" * 60)
+    
+    callbacks = training_callbacks(checkpoint_path, verbose=verbose,
+                                   extra_callbacks=extra_callbacks)
     
     # Handle class imbalance with class weights
     n_total = len(y_train)
@@ -282,86 +459,80 @@ def train_model(model: keras.Model,
         1: n_total / (2 * n_positive)
     }
     print(f"\nClass weights: {class_weights}")
+    sample_weight = np.where(y_train == 1, class_weights[1], class_weights[0])
+    
+    # Large-batch mode: scale the learning rate with the batch size
+    if scale_lr:
+        scale_learning_rate(model, batch_size, base_batch_size)
+    
+    train_ds = make_dataset(X_train, y_train if target is None else target, batch_size,
+                            sample_weight=sample_weight, shuffle=True)
+    val_ds = make_dataset(X_val, y_val, max(batch_size, 256))
     
     # Train
     print(f"\nTraining configuration:")
-    print(f"  Epochs: 100 (with early stopping)")
-    print(f"  Batch size: 16")
-    print(f"  Optimizer: Adam (lr=0.001)")
+    print(f"  Epochs: {epochs} (with early stopping)")
+    print(f"  Batch size: {batch_size}")
+    print(f"  Optimizer: Adam (lr={float(model.optimizer.learning_rate):g}"
+          f"{', scaled for batch size' if scale_lr and batch_size != base_batch_size else ''})")
     print(f"  Loss: Binary Cross-Entropy")
+    print(f"  Input pipeline: tf.data (cache, shuffle, prefetch)")
     print()
     
     history = model.fit(
-        X_train, y_train,
-        validation_data=(X_val, y_val),
-        epochs=100,
-        batch_size=16,
-        class_weight=class_weights,
+        train_ds,
+        validation_data=val_ds,
+        epochs=epochs,
         callbacks=callbacks,
-        verbose=1
+        verbose=verbose
     )
     
+    # The first epoch includes graph tracing, so leave it out when possible
+    rates = history.history.get('steps_per_sec', [])
+    rates = rates[1:] if len(rates) > 1 else rates
+    if rates:
+        steps_per_epoch = -(-len(X_train) // batch_size)
+        print(f"\nTraining throughput: {np.mean(rates):,.1f} steps/s "
+              f"({np.mean(rates) * batch_size:,.0f} samples/s, "
+              f"{steps_per_epoch} steps/epoch)")
+    
     return history
 
 
-def plot_training_history(history: keras.callbacks.History) -> None:
+def plot_training_history(history: keras.callbacks.History,
+                          renderer: PlotRenderer = None) -> None:
     """Plot training and validation metrics over epochs."""
     print("\n" + "=" * 60)
     print("STEP 6: Visualizing Training History")
     print("=" * 60)
     
-    fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-    
-    # Loss
-    axes[0, 0].plot(history.history['loss'], label='Train')
-    axes[0, 0].plot(history.history['val_loss'], label='Validation')
-    axes[0, 0].set_title('Loss')
-    axes[0, 0].set_xlabel('Epoch')
-    axes[0, 0].set_ylabel('Loss')
-    axes[0, 0].legend()
-    axes[0, 0].grid(True)
-    
-    # Accuracy
-    axes[0, 1].plot(history.history['accuracy'], label='Train')
-    axes[0, 1].plot(history.history['val_accuracy'], label='Validation')
-    axes[0, 1].set_title('Accuracy')
-    axes[0, 1].set_xlabel('Epoch')
-    axes[0, 1].set_ylabel('Accuracy')
-    axes[0, 1].legend()
-    axes[0, 1].grid(True)
-    
-    # AUC
-    axes[1, 0].plot(history.history['auc'], label='Train')
-    axes[1, 0].plot(history.history['val_auc'], label='Validation')
-    axes[1, 0].set_title('AUC-ROC')
-    axes[1, 0].set_xlabel('Epoch')
-    axes[1, 0].set_ylabel('AUC')
-    axes[1, 0].legend()
-    axes[1, 0].grid(True)
-    
-    # Precision & Recall
-    axes[1, 1].plot(history.history['precision'], label='Train Precision')
-    axes[1, 1].plot(history.history['val_precision'], label='Val Precision')
-    axes[1, 1].plot(history.history['recall'], label='Train Recall')
-    axes[1, 1].plot(history.history['val_recall'], label='Val Recall')
-    axes[1, 1].set_title('Precision & Recall')
-    axes[1, 1].set_xlabel('Epoch')
-    axes[1, 1].set_ylabel('Score')
-    axes[1, 1].legend()
-    axes[1, 1].grid(True)
-    
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'training_history.png'), dpi=150)
-    plt.close()
-    
-    print("✓ Training history saved to outputs/training_history.png")
+    renderer = renderer or PlotRenderer(asynchronous=False)
+    renderer.submit(render_training_history, dict(history.history),
+                    os.path.join(OUTPUT_DIR, 'training_history.png'),
+                    label='Training history')
 
 
 def evaluate_model(model: keras.Model, 
-                   X_test: np.ndarray, y_test: np.ndarray) -> dict:
+                   X_test: np.ndarray, y_test: np.ndarray,
+                   save_plots: bool = True,
+                   renderer: PlotRenderer = None,
+                   n_bootstrap: int = 2000) -> dict:
     """
     Evaluate model on test set and generate comprehensive report.
+    
+    Set save_plots=False to skip writing the confusion matrix and ROC curve;
+    otherwise they go through `renderer` (rendered in-process if None).
+    
+    Each metric also gets a 95% percentile bootstrap interval over
+    `n_bootstrap` resamples of the test set (bootstrap_ci.py), stored as
+    '<metric>_ci_low' / '<metric>_ci_high'. Pass n_bootstrap=0 to skip it.
     """
+    from bootstrap_ci import bootstrap_metrics
+    from sklearn.metrics import (
+        accuracy_score, precision_score, recall_score, f1_score,
+        confusion_matrix, classification_report, roc_curve, auc
+    )
+    
     print("\n" + "=" * 60)
     print("STEP 7: Evaluating Model on Test Set")
     print("=" * 60)
@@ -393,30 +564,45 @@ def evaluate_model(model: keras.Model,
         'auc_roc': roc_auc
     }
     
+    intervals = {}
+    if n_bootstrap:
+        intervals = bootstrap_metrics(y_test, y_pred_proba, n_resamples=n_bootstrap)
+        for name, (low, high) in intervals.items():
+            metrics[f'{name}_ci_low'] = low
+            metrics[f'{name}_ci_high'] = high
+    
+    def ci(name: str, percent: bool = True) -> str:
+        if name not in intervals:
+            return ""
+        low, high = intervals[name]
+        if percent:
+            return f"  (95% CI {low*100:.2f}–{high*100:.2f}%)"
+        return f"  (95% CI {low:.4f}–{high:.4f})"
+    
     print("\n📊 Test Set Performance:")
     print("-" * 40)
-    print(f"  Accuracy:    {accuracy*100:.2f}%")
-    print(f"  Precision:   {precision*100:.2f}%")
-    print(f"  Sensitivity: {recall*100:.2f}% (Recall)")
-    print(f"  Specificity: {specificity*100:.2f}%")
-    print(f"  F1 Score:    {f1*100:.2f}%")
-    print(f"  AUC-ROC:     {roc_auc:.4f}")
+    print(f"  Accuracy:    {accuracy*100:.2f}%{ci('accuracy')}")
+    print(f"  Precision:   {precision*100:.2f}%{ci('precision')}")
+    print(f"  Sensitivity: {recall*100:.2f}% (Recall){ci('sensitivity')}")
+    print(f"  Specificity: {specificity*100:.2f}%{ci('specificity')}")
+    print(f"  F1 Score:    {f1*100:.2f}%{ci('f1_score')}")
+    print(f"  AUC-ROC:     {roc_auc:.4f}{ci('auc_roc', percent=False)}")
+    if intervals:
+        print(f"  ({n_bootstrap} bootstrap resamples of {len(y_test)} test rows)")
     
     # Target metrics check
     print("\n🎯 Target vs Achieved:")
     print("-" * 40)
-    targets = {'Accuracy': 85, 'Sensitivity': 85, 'Specificity': 80, 'AUC-ROC': 0.90}
-    achieved = {'Accuracy': accuracy*100, 'Sensitivity': recall*100, 
-                'Specificity': specificity*100, 'AUC-ROC': roc_auc}
-    
-    for metric, target in targets.items():
-        val = achieved[metric]
-        if metric == 'AUC-ROC':
-            status = "✅" if val >= target else "❌"
-            print(f"  {metric}: {val:.4f} (target: ≥{target}) {status}")
+    labels = {'accuracy': 'Accuracy', 'sensitivity': 'Sensitivity',
+              'specificity': 'Specificity', 'auc_roc': 'AUC-ROC'}
+    
+    for key, target in METRIC_TARGETS.items():
+        val = metrics[key]
+        status = "✅" if val >= target else "❌"
+        if key == 'auc_roc':
+            print(f"  {labels[key]}: {val:.4f} (target: ≥{target}) {status}")
         else:
-            status = "✅" if val >= target else "❌"
-            print(f"  {metric}: {val:.2f}% (target: ≥{target}%) {status}")
+            print(f"  {labels[key]}: {val*100:.2f}% (target: ≥{target*100:g}%) {status}")
     
     # Classification report
     print("\n📋 Classification Report:")
@@ -429,57 +615,53 @@ def evaluate_model(model: keras.Model,
     print(f"  TN={tn}, FP={fp}")
     print(f"  FN={fn}, TP={tp}")
     
-    # Plot confusion matrix
-    plt.figure(figsize=(8, 6))
-    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues',
-                xticklabels=['Healthy', "Parkinson's"],
-                yticklabels=['Healthy', "Parkinson's"])
-    plt.title('Confusion Matrix')
-    plt.xlabel('Predicted')
-    plt.ylabel('Actual')
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'confusion_matrix.png'), dpi=150)
-    plt.close()
-    
-    # Plot ROC curve
-    plt.figure(figsize=(8, 6))
-    plt.plot(fpr, tpr, color='darkorange', lw=2, 
-             label=f'ROC curve (AUC = {roc_auc:.4f})')
-    plt.plot([0, 1], [0, 1], color='navy', lw=2, linestyle='--')
-    plt.xlim([0.0, 1.0])
-    plt.ylim([0.0, 1.05])
-    plt.xlabel('False Positive Rate')
-    plt.ylabel('True Positive Rate')
-    plt.title('Receiver Operating Characteristic (ROC) Curve')
-    plt.legend(loc="lower right")
-    plt.grid(True)
-    plt.tight_layout()
-    plt.savefig(os.path.join(OUTPUT_DIR, 'roc_curve.png'), dpi=150)
-    plt.close()
-    
-    print("\n✓ Confusion matrix saved to outputs/confusion_matrix.png")
-    print("✓ ROC curve saved to outputs/roc_curve.png")
+    if not save_plots:
+        return metrics
+    
+    renderer = renderer or PlotRenderer(asynchronous=False)
+    renderer.submit(render_confusion_matrix, cm,
+                    os.path.join(OUTPUT_DIR, 'confusion_matrix.png'),
+                    label='Confusion matrix')
+    renderer.submit(render_roc_curve, fpr, tpr, roc_auc,
+                    os.path.join(OUTPUT_DIR, 'roc_curve.png'),
+                    label='ROC curve')
     
     return metrics
 
 
+def meets_targets(metrics: dict) -> bool:
+    """True if every METRIC_TARGETS entry is reached in `metrics`."""
+    return all(metrics[key] >= target for key, target in METRIC_TARGETS.items())
+
+
+def _artifact_store():
+    """The content-addressed store under the current OUTPUT_DIR (see artifact_store.py)."""
+    from artifact_store import ArtifactStore
+    return ArtifactStore(os.path.join(OUTPUT_DIR, 'store'))
+
+
 def save_model(model: keras.Model, feature_names: list, metrics: dict) -> str:
     """
-    Save trained model in H5 format for later conversion to TFLite.
+    Save the trained model (Keras format) for later conversion to TFLite.
+    
+    The model is serialized once, into the artifact store, and
+    outputs/parkinson_model_v1.0.keras is linked to that blob. Pass the live
+    model on to convert_to_tflite(model=...) rather than reloading it.
     """
+    tf = _import_tensorflow()
+    
     print("\n" + "=" * 60)
     print("STEP 8: Saving Model")
     print("=" * 60)
     
-    # Save in H5 format
-    model_path = os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0.h5')
-    model.save(model_path)
-    print(f"✓ Model saved to: {model_path}")
-    
-    # Save Keras format (recommended)
-    keras_path = os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0.keras')
-    model.save(keras_path)
-    print(f"✓ Model saved to: {keras_path}")
+    store = _artifact_store()
+    staging_path = store.staging_path('.keras')
+    model.save(staging_path)
+    entry = store.put_file('parkinson_model_v1.0.keras', staging_path, move=True,
+                           metadata={'metrics': {k: float(v) for k, v in metrics.items()}})
+    model_path = store.link('parkinson_model_v1.0.keras',
+                            os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0.keras'))
+    print(f"✓ Model saved to: {model_path} (store blob {entry['sha256'][:12]})")
     
     # Save model metadata
     metadata = {
@@ -491,7 +673,8 @@ def save_model(model: keras.Model, feature_names: list, metrics: dict) -> str:
         'output_shape': [1, 1],
         'metrics': metrics,
         'framework': f'TensorFlow {tf.__version__}',
-        'python_version': f'{os.sys.version_info.major}.{os.sys.version_info.minor}'
+        'python_version': f'{os.sys.version_info.major}.{os.sys.version_info.minor}',
+        'model_sha256': entry['sha256'],
     }
     
     import json
@@ -507,61 +690,246 @@ def save_model(model: keras.Model, feature_names: list, metrics: dict) -> str:
     return model_path
 
 
-def convert_to_tflite(model_path: str) -> str:
+def _representative_dataset(X: np.ndarray, n_samples: int = 300, seed: int = 42):
     """
-    Convert trained model to TensorFlow Lite format with INT8 quantization.
+    Calibration generator for full-integer quantization.
+    
+    Yields up to `n_samples` single-row batches drawn from the (scaled)
+    training split so the converter can estimate activation ranges.
     """
+    rng = np.random.default_rng(seed)
+    rows = rng.choice(len(X), size=min(n_samples, len(X)), replace=False)
+    
+    def generator():
+        for i in rows:
+            yield [X[i:i + 1].astype(np.float32)]
+    
+    return generator
+
+
+def _record_tflite_metadata(key: str, info: dict) -> None:
+    """Merge TFLite conversion details into outputs/model_metadata.json."""
+    import json
+    metadata_path = os.path.join(OUTPUT_DIR, 'model_metadata.json')
+    metadata = {}
+    if os.path.exists(metadata_path):
+        with open(metadata_path) as f:
+            metadata = json.load(f)
+    metadata.setdefault('tflite', {})[key] = info
+    with open(metadata_path, 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def convert_to_tflite(model_path: str, quantization: str = 'float16',
+                      representative_data: np.ndarray = None,
+                      output_path: str = None, model: keras.Model = None) -> str:
+    """
+    Convert trained model to TensorFlow Lite format.
+    
+    quantization:
+        'float16' - float16 weights, float32 I/O. This is the model the
+                    mobile app loads from assets/models.
+        'int8'    - full-integer quantization (int8 weights, activations,
+                    inputs and outputs) calibrated on `representative_data`,
+                    the scaled training split. Written to outputs/ as
+                    parkinson_model_v1.0_int8.tflite; its input/output
+                    scale and zero point are recorded in model_metadata.json.
+    
+    If `output_path` is given the model is written only there, leaving the
+    app asset and the default outputs/ files untouched. Otherwise the bytes
+    go into the artifact store once and the default outputs/ paths are
+    linked to them; the float16 app asset in assets/models is written as a
+    plain copy, since it is tracked in git and bundled into the app.
+    
+    Pass the live `model` to skip reloading it from `model_path`.
+    """
+    tf = _import_tensorflow()
+    from tensorflow import keras
+    
     print("\n" + "=" * 60)
-    print("STEP 9: Converting to TensorFlow Lite")
+    print(f"STEP 9: Converting to TensorFlow Lite ({quantization})")
     print("=" * 60)
     
-    # Load the model
-    model = keras.models.load_model(model_path)
+    if quantization not in ('float16', 'int8'):
+        raise ValueError(f"Unknown quantization mode: {quantization!r}")
+    if quantization == 'int8' and representative_data is None:
+        raise ValueError("INT8 quantization requires representative_data")
+    
+    if model is None:
+        model = keras.models.load_model(model_path)
     
     # Convert to TFLite
     converter = tf.lite.TFLiteConverter.from_keras_model(model)
     
     # Apply optimizations
     converter.optimizations = [tf.lite.Optimize.DEFAULT]
-    converter.target_spec.supported_types = [tf.float16]
+    if quantization == 'int8':
+        converter.representative_dataset = _representative_dataset(representative_data)
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    else:
+        converter.target_spec.supported_types = [tf.float16]
     
     # Convert
     tflite_model = converter.convert()
     
-    # Save TFLite model
-    tflite_path = os.path.join(MODEL_DIR, 'parkinson_model_v1.0.tflite')
-    with open(tflite_path, 'wb') as f:
-        f.write(tflite_model)
-    
-    # Also save to outputs for comparison
-    tflite_output_path = os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0.tflite')
-    with open(tflite_output_path, 'wb') as f:
-        f.write(tflite_model)
+    if output_path:
+        tflite_path = output_path
+        with open(tflite_path, 'wb') as f:
+            f.write(tflite_model)
+    elif quantization == 'int8':
+        store = _artifact_store()
+        store.put_bytes('parkinson_model_v1.0_int8.tflite', tflite_model,
+                        metadata={'quantization': 'int8'})
+        tflite_path = store.link('parkinson_model_v1.0_int8.tflite',
+                                 os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0_int8.tflite'))
+    else:
+        store = _artifact_store()
+        store.put_bytes('parkinson_model_v1.0.tflite', tflite_model,
+                        metadata={'quantization': 'float16'})
+        tflite_path = store.link('parkinson_model_v1.0.tflite',
+                                 os.path.join(MODEL_DIR, 'parkinson_model_v1.0.tflite'),
+                                 copy=True)
+        store.link('parkinson_model_v1.0.tflite',
+                   os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0.tflite'))
+    
+    if quantization == 'int8':
+        interpreter = tf.lite.Interpreter(model_content=tflite_model)
+        input_scale, input_zero_point = interpreter.get_input_details()[0]['quantization']
+        output_scale, output_zero_point = interpreter.get_output_details()[0]['quantization']
+        quant_info = {
+            'path': os.path.basename(tflite_path),
+            'quantization': 'int8',
+            'input_dtype': 'int8',
+            'output_dtype': 'int8',
+            'input_scale': float(input_scale),
+            'input_zero_point': int(input_zero_point),
+            'output_scale': float(output_scale),
+            'output_zero_point': int(output_zero_point),
+            'calibration_samples': min(300, len(representative_data)),
+        }
+        _record_tflite_metadata('int8', quant_info)
+        print(f"\nQuantization parameters:")
+        print(f"  Input:  scale={input_scale:.6g}, zero_point={input_zero_point}")
+        print(f"  Output: scale={output_scale:.6g}, zero_point={output_zero_point}")
     
     # Model sizes
-    h5_size = os.path.getsize(model_path) / 1024
-    tflite_size = os.path.getsize(tflite_path) / 1024
-    
+    tflite_size = len(tflite_model) / 1024
     print(f"\n✓ TFLite model saved to: {tflite_path}")
-    print(f"\nModel Size Comparison:")
-    print(f"  H5 model:     {h5_size:.2f} KB")
-    print(f"  TFLite model: {tflite_size:.2f} KB")
-    print(f"  Reduction:    {(1 - tflite_size/h5_size)*100:.1f}%")
+    if model_path and os.path.exists(model_path):
+        keras_size = os.path.getsize(model_path) / 1024
+        print(f"\nModel Size Comparison:")
+        print(f"  Keras model:  {keras_size:.2f} KB")
+        print(f"  TFLite model: {tflite_size:.2f} KB")
+        print(f"  Reduction:    {(1 - tflite_size/keras_size)*100:.1f}%")
+    else:
+        print(f"  TFLite model: {tflite_size:.2f} KB")
     
     return tflite_path
 
 
-def validate_tflite_model(tflite_path: str, X_test: np.ndarray, y_test: np.ndarray) -> None:
+def _run_tflite_batched(interpreter: tf.lite.Interpreter, X: np.ndarray,
+                        batch_size: int, pad: bool = False) -> np.ndarray:
+    """
+    Run X through a TFLite interpreter in chunks of `batch_size` rows.
+    
+    The input tensor is resized once for full chunks and once more for the
+    trailing partial chunk, so tensors are re-allocated at most twice. With
+    pad=True the trailing chunk is zero-padded to `batch_size` instead, and
+    the interpreter must already be resized to `batch_size` and allocated;
+    it is then never re-allocated.
+    Integer-quantized inputs/outputs are (de)quantized with the tensors'
+    scale and zero point, so callers always pass and get back floats.
+    """
+    input_details = interpreter.get_input_details()[0]
+    output_details = interpreter.get_output_details()[0]
+    input_index = input_details['index']
+    output_index = output_details['index']
+    input_dtype = input_details['dtype']
+    input_scale, input_zero_point = input_details['quantization']
+    output_scale, output_zero_point = output_details['quantization']
+    n_samples, n_features = X.shape
+    
+    predictions = np.empty(n_samples, dtype=np.float32)
+    # Only a padded caller sizes and allocates the interpreter up front;
+    # otherwise tensors may still be unallocated, so always allocate first
+    current_batch = int(input_details['shape'][0]) if pad else None
+    for start in range(0, n_samples, batch_size):
+        chunk = X[start:start + batch_size].astype(np.float32)
+        n_rows = chunk.shape[0]
+        if pad and n_rows < batch_size:
+            chunk = np.concatenate([chunk, np.zeros((batch_size - n_rows, n_features),
+                                                    dtype=np.float32)])
+        if np.issubdtype(input_dtype, np.integer):
+            info = np.iinfo(input_dtype)
+            chunk = np.clip(np.round(chunk / input_scale + input_zero_point),
+                            info.min, info.max).astype(input_dtype)
+        if chunk.shape[0] != current_batch:
+            current_batch = chunk.shape[0]
+            interpreter.resize_tensor_input(input_index, [current_batch, n_features])
+            interpreter.allocate_tensors()
+        interpreter.set_tensor(input_index, chunk)
+        interpreter.invoke()
+        output = interpreter.get_tensor(output_index).reshape(-1)
+        if np.issubdtype(output.dtype, np.integer):
+            output = (output.astype(np.float32) - output_zero_point) * output_scale
+        predictions[start:start + n_rows] = output[:n_rows]
+    
+    return predictions
+
+
+def _score_tflite(tflite_path: str, X_test: np.ndarray, y_test: np.ndarray,
+                  batch_size: int, num_threads: int) -> dict:
+    """Run a TFLite model over the test set and collect metrics, speed and size."""
+    tf = _import_tensorflow()
+    from sklearn.metrics import accuracy_score, recall_score, confusion_matrix
+    
+    interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    
+    # Run batched inference on test set
+    start_time = time.perf_counter()
+    y_pred_proba = _run_tflite_batched(interpreter, X_test, batch_size)
+    elapsed = time.perf_counter() - start_time
+    y_pred = (y_pred_proba >= 0.5).astype(int)
+    
+    # Calculate metrics
+    tn, fp, fn, tp = confusion_matrix(y_test, y_pred).ravel()
+    return {
+        'interpreter': interpreter,
+        'accuracy': accuracy_score(y_test, y_pred),
+        'sensitivity': recall_score(y_test, y_pred),
+        'specificity': tn / (tn + fp),
+        'throughput_rows_per_sec': len(X_test) / elapsed if elapsed > 0 else float('inf'),
+        'latency_us_per_row': elapsed / len(X_test) * 1e6,
+        'elapsed_ms': elapsed * 1000,
+        'size_kb': os.path.getsize(tflite_path) / 1024,
+    }
+
+
+def validate_tflite_model(tflite_path: str, X_test: np.ndarray, y_test: np.ndarray,
+                          batch_size: int = 256, num_threads: int = None,
+                          reference_tflite_path: str = None) -> dict:
     """
     Validate TFLite model accuracy against the original model.
+    
+    Inference runs in batches of `batch_size` rows on an interpreter with
+    `num_threads` threads (defaults to all available cores). If
+    `reference_tflite_path` is given (e.g. the float model when validating
+    the INT8 one), size, latency and accuracy are compared side by side.
     """
     print("\n" + "=" * 60)
     print("STEP 10: Validating TFLite Model")
     print("=" * 60)
     
-    # Load TFLite model
-    interpreter = tf.lite.Interpreter(model_path=tflite_path)
-    interpreter.allocate_tensors()
+    if num_threads is None:
+        num_threads = os.cpu_count() or 1
+    
+    result = _score_tflite(tflite_path, X_test, y_test, batch_size, num_threads)
+    interpreter = result.pop('interpreter')
+    accuracy, recall, specificity = (result['accuracy'], result['sensitivity'],
+                                     result['specificity'])
     
     # Get input/output details
     input_details = interpreter.get_input_details()
@@ -572,35 +940,310 @@ def validate_tflite_model(tflite_path: str, X_test: np.ndarray, y_test: np.ndarr
     print(f"  Input dtype:  {input_details[0]['dtype']}")
     print(f"  Output shape: {output_details[0]['shape']}")
     print(f"  Output dtype: {output_details[0]['dtype']}")
-    
-    # Run inference on test set
-    predictions = []
-    for sample in X_test:
-        input_data = sample.astype(np.float32).reshape(1, -1)
-        interpreter.set_tensor(input_details[0]['index'], input_data)
-        interpreter.invoke()
-        output = interpreter.get_tensor(output_details[0]['index'])
-        predictions.append(output[0][0])
-    
-    y_pred_proba = np.array(predictions)
-    y_pred = (y_pred_proba >= 0.5).astype(int)
-    
-    # Calculate metrics
-    accuracy = accuracy_score(y_test, y_pred)
-    recall = recall_score(y_test, y_pred)
-    tn, fp, fn, tp = confusion_matrix(y_test, y_pred).ravel()
-    specificity = tn / (tn + fp)
+    print(f"  Batch size:   {batch_size}")
+    print(f"  Threads:      {num_threads}")
     
     print(f"\n📊 TFLite Model Performance:")
     print(f"  Accuracy:    {accuracy*100:.2f}%")
     print(f"  Sensitivity: {recall*100:.2f}%")
     print(f"  Specificity: {specificity*100:.2f}%")
+    print(f"  Throughput:  {result['throughput_rows_per_sec']:,.0f} rows/s "
+          f"({len(X_test)} rows in {result['elapsed_ms']:.1f} ms)")
+    
+    if reference_tflite_path:
+        reference = _score_tflite(reference_tflite_path, X_test, y_test,
+                                  batch_size, num_threads)
+        reference.pop('interpreter')
+        print(f"\n📊 Comparison against {os.path.basename(reference_tflite_path)}:")
+        print(f"  {'':<14}{'Reference':>12}{'This model':>12}{'Delta':>10}")
+        for label, key, fmt in [('Size (KB)', 'size_kb', '{:.2f}'),
+                                ('Latency (µs)', 'latency_us_per_row', '{:.2f}'),
+                                ('Accuracy', 'accuracy', '{:.4f}'),
+                                ('Sensitivity', 'sensitivity', '{:.4f}'),
+                                ('Specificity', 'specificity', '{:.4f}')]:
+            ref, new = reference[key], result[key]
+            print(f"  {label:<14}{fmt.format(ref):>12}{fmt.format(new):>12}"
+                  f"{fmt.format(new - ref):>10}")
+        result['reference'] = reference
     
     # Check acceptance criteria
     print("\n✅ TFLite Conversion Validation:")
     print(f"  Accuracy ≥80%: {'✅' if accuracy >= 0.80 else '❌'}")
     print(f"  Sensitivity ≥80%: {'✅' if recall >= 0.80 else '❌'}")
     print(f"  Specificity ≥75%: {'✅' if specificity >= 0.75 else '❌'}")
+    
+    return result
+
+
+def fuse_scaler(model: keras.Model, scaler) -> keras.Model:
+    """
+    Return a copy of `model` that takes raw (unscaled) features.
+    
+    The StandardScaler is folded into the first Dense layer:
+        W' = W / scale[:, None]
+        b' = b - (mean / scale) @ W
+    so the fused graph has exactly the ops of the original one.
+    """
+    _import_tensorflow()
+    from tensorflow import keras
+    
+    first = model.layers[0]
+    if not isinstance(first, keras.layers.Dense):
+        raise ValueError(f"Expected a leading Dense layer, got {first.name!r}")
+    
+    fused = keras.models.clone_model(model)
+    fused.set_weights(model.get_weights())
+    # Fold in float64; the kernel is only cast back to float32 once
+    kernel, bias = (w.astype(np.float64) for w in first.get_weights())
+    mean, scale = scaler.mean_, scaler.scale_
+    fused.layers[0].set_weights([
+        (kernel / scale[:, None]).astype(np.float32),
+        (bias - (mean / scale) @ kernel).astype(np.float32),
+    ])
+    return fused
+
+
+def _per_row_latency_us(interpreter: tf.lite.Interpreter, X: np.ndarray,
+                        scaler=None, repeats: int = 20) -> float:
+    """Mean µs per single-row inference, including scaler.transform if given."""
+    input_index = interpreter.get_input_details()[0]['index']
+    output_index = interpreter.get_output_details()[0]['index']
+    interpreter.resize_tensor_input(input_index, [1, X.shape[1]])
+    interpreter.allocate_tensors()
+    
+    rows = [X[i:i + 1] for i in range(len(X))]
+    start_time = time.perf_counter()
+    for _ in range(repeats):
+        for row in rows:
+            if scaler is not None:
+                row = scaler.transform(row)
+            interpreter.set_tensor(input_index, row.astype(np.float32))
+            interpreter.invoke()
+            interpreter.get_tensor(output_index)
+    return (time.perf_counter() - start_time) / (repeats * len(rows)) * 1e6
+
+
+def export_fused_model(model_path: str, scaler, X_test: np.ndarray, y_test: np.ndarray,
+                       reference_tflite_path: str = None, batch_size: int = 256,
+                       model: keras.Model = None) -> dict:
+    """
+    Export .keras and .tflite models with the scaler folded into dense_1.
+    
+    Both artifacts (outputs/parkinson_model_v1.0_fused.*) take raw feature
+    vectors, so consumers no longer need scaler.joblib or FeatureScaler.
+    The app asset in assets/models is left as is. `X_test` is the scaled
+    test split; the fused models are checked against the original model on
+    the same rows, and the per-inference cost of both paths is measured.
+    
+    Pass the live `model` to skip reloading it from `model_path`.
+    """
+    tf = _import_tensorflow()
+    from tensorflow import keras
+    
+    print("\n" + "=" * 60)
+    print("Exporting Scaler-Fused Model")
+    print("=" * 60)
+    
+    if model is None:
+        model = keras.models.load_model(model_path)
+    fused = fuse_scaler(model, scaler)
+    keras_path = os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0_fused.keras')
+    fused.save(keras_path)
+    print(f"✓ Fused Keras model saved to: {keras_path}")
+    
+    tflite_path = convert_to_tflite(
+        keras_path, output_path=os.path.join(OUTPUT_DIR, 'parkinson_model_v1.0_fused.tflite'),
+        model=fused)
+    if reference_tflite_path is None:
+        reference_tflite_path = os.path.join(MODEL_DIR, 'parkinson_model_v1.0.tflite')
+    
+    # Equivalence: fused(raw) against model(scaler.transform(raw))
+    X_raw = scaler.inverse_transform(X_test)
+    keras_diff = float(np.abs(fused.predict(X_raw, verbose=0)
+                              - model.predict(X_test, verbose=0)).max())
+    reference = tf.lite.Interpreter(model_path=reference_tflite_path, num_threads=1)
+    interpreter = tf.lite.Interpreter(model_path=tflite_path, num_threads=1)
+    reference_proba = _run_tflite_batched(reference, scaler.transform(X_raw), batch_size)
+    fused_proba = _run_tflite_batched(interpreter, X_raw, batch_size)
+    tflite_diff = float(np.abs(fused_proba - reference_proba).max())
+    agreement = float(np.mean((fused_proba >= 0.5) == (reference_proba >= 0.5)))
+    fused_accuracy = float(np.mean((fused_proba >= 0.5).astype(int) == y_test))
+    
+    print(f"\n📊 Equivalence on {len(X_raw)} test rows:")
+    print(f"  Keras max |Δp|:  {keras_diff:.2e}")
+    print(f"  TFLite max |Δp|: {tflite_diff:.2e} (vs {os.path.basename(reference_tflite_path)})")
+    print(f"  Label agreement: {agreement*100:.2f}%")
+    print(f"  Accuracy:        {fused_accuracy*100:.2f}%")
+    
+    # Per-inference cost, one row at a time as in the app
+    reference_us = _per_row_latency_us(reference, X_raw, scaler=scaler)
+    fused_us = _per_row_latency_us(interpreter, X_raw)
+    
+    # Batched: vectorized scaling + reference model against the fused model
+    X_bench = np.tile(X_raw, (max(1, 10000 // len(X_raw)), 1))
+    start_time = time.perf_counter()
+    _run_tflite_batched(reference, scaler.transform(X_bench), batch_size)
+    reference_batched = time.perf_counter() - start_time
+    start_time = time.perf_counter()
+    _run_tflite_batched(interpreter, X_bench, batch_size)
+    fused_batched = time.perf_counter() - start_time
+    
+    print(f"\n📊 Per-inference cost:")
+    print(f"  {'':<22}{'Scaler+model':>14}{'Fused':>10}{'Saving':>10}")
+    print(f"  {'Single row (µs)':<22}{reference_us:>14.2f}{fused_us:>10.2f}"
+          f"{(1 - fused_us / reference_us) * 100:>9.1f}%")
+    print(f"  {f'Batched {batch_size} (µs/row)':<22}"
+          f"{reference_batched / len(X_bench) * 1e6:>14.3f}"
+          f"{fused_batched / len(X_bench) * 1e6:>10.3f}"
+          f"{(1 - fused_batched / reference_batched) * 100:>9.1f}%")
+    
+    equivalent = keras_diff <= 1e-5 and tflite_diff <= 1e-3 and agreement == 1.0
+    print("\n✅ Fused Model Validation:")
+    print(f"  Keras max |Δp| ≤1e-5: {'✅' if keras_diff <= 1e-5 else '❌'}")
+    print(f"  TFLite max |Δp| ≤1e-3: {'✅' if tflite_diff <= 1e-3 else '❌'}")
+    print(f"  Identical labels: {'✅' if agreement == 1.0 else '❌'}")
+    
+    result = {
+        'keras_path': os.path.basename(keras_path),
+        'path': os.path.basename(tflite_path),
+        'input': 'raw features (scaler folded into dense_1)',
+        'keras_max_abs_diff': keras_diff,
+        'tflite_max_abs_diff': tflite_diff,
+        'label_agreement': agreement,
+        'accuracy': fused_accuracy,
+        'equivalent': equivalent,
+        'latency_us_per_row': fused_us,
+        'reference_latency_us_per_row': reference_us,
+        'batched_us_per_row': fused_batched / len(X_bench) * 1e6,
+        'reference_batched_us_per_row': reference_batched / len(X_bench) * 1e6,
+    }
+    _record_tflite_metadata('fused', result)
+    return result
+
+
+def pin_tf_threads(intra_op: int, inter_op: int = 1) -> None:
+    """
+    Limit TensorFlow's thread pools in the current process.
+    
+    Must be called before any TF op runs, i.e. first thing in a worker.
+    """
+    tf = _import_tensorflow()
+    tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+    tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+
+
+def _cv_fold_worker(fold: int, X_train: np.ndarray, y_train: np.ndarray,
+                    X_holdout: np.ndarray, y_holdout: np.ndarray,
+                    n_threads: int, model_dir: str = None) -> dict:
+    """
+    Train and evaluate a single cross-validation fold.
+    
+    Runs inside a worker process. TF thread pools are pinned before any op
+    executes so concurrent folds don't oversubscribe the cores. With
+    `model_dir` the fold's model and scaler are saved as fold_<k>.keras and
+    fold_<k>_scaler.joblib (e.g. for ensemble_model.py).
+    """
+    from sklearn.model_selection import train_test_split
+    from sklearn.preprocessing import StandardScaler
+    
+    pin_tf_threads(n_threads)
+    np.random.seed(42 + fold)
+    _import_tensorflow().random.set_seed(42 + fold)
+    
+    # Hold out part of the training fold for early stopping
+    X_fit, X_val, y_fit, y_val = train_test_split(
+        X_train, y_train, test_size=0.15, random_state=42, stratify=y_train
+    )
+    
+    # Fit the scaler on the fold's training rows only
+    scaler = StandardScaler()
+    X_fit = scaler.fit_transform(X_fit)
+    X_val = scaler.transform(X_val)
+    X_holdout = scaler.transform(X_holdout)
+    
+    model = build_model(input_dim=X_fit.shape[1])
+    history = train_model(model, X_fit, y_fit, X_val, y_val,
+                          checkpoint_path=None, verbose=0)
+    metrics = evaluate_model(model, X_holdout, y_holdout, save_plots=False)
+    
+    if model_dir:
+        import joblib
+        model.save(os.path.join(model_dir, f'fold_{fold}.keras'))
+        joblib.dump(scaler, os.path.join(model_dir, f'fold_{fold}_scaler.joblib'))
+    
+    metrics = {name: float(value) for name, value in metrics.items()}
+    metrics['fold'] = fold
+    metrics['epochs'] = len(history.history['loss'])
+    return metrics
+
+
+def cross_validate_model(X: np.ndarray, y: np.ndarray,
+                         n_splits: int = 10, n_workers: int = None,
+                         model_dir: str = None) -> dict:
+    """
+    Stratified k-fold cross-validation with folds trained in a process pool.
+    
+    Each worker gets an equal share of the cores for its TF thread pools.
+    Per-fold metrics from evaluate_model are aggregated into mean/std and
+    saved to outputs/cv_results.json. If `model_dir` is given every fold's
+    model and scaler are kept there.
+    """
+    from sklearn.model_selection import StratifiedKFold
+    
+    print("\n" + "=" * 60)
+    print(f"Cross-Validation: Stratified {n_splits}-Fold")
+    print("=" * 60)
+    
+    n_cores = os.cpu_count() or 1
+    if n_workers is None:
+        n_workers = min(n_splits, n_cores)
+    n_threads = max(1, n_cores // n_workers)
+    print(f"\n  Workers: {n_workers} (TF threads per worker: {n_threads})")
+    
+    if model_dir:
+        os.makedirs(model_dir, exist_ok=True)
+    
+    skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
+    start_time = time.perf_counter()
+    
+    # Spawn rather than fork: TensorFlow is not fork-safe once initialised
+    ctx = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx) as pool:
+        futures = [
+            pool.submit(_cv_fold_worker, fold, X[train_idx], y[train_idx],
+                        X[test_idx], y[test_idx], n_threads, model_dir)
+            for fold, (train_idx, test_idx) in enumerate(skf.split(X, y))
+        ]
+        fold_metrics = sorted((f.result() for f in futures), key=lambda m: m['fold'])
+    
+    elapsed = time.perf_counter() - start_time
+    
+    metric_names = ['accuracy', 'precision', 'sensitivity',
+                    'specificity', 'f1_score', 'auc_roc']
+    summary = {}
+    print(f"\n📊 Cross-Validation Results ({n_splits} folds, {elapsed:.1f}s):")
+    print("-" * 40)
+    for name in metric_names:
+        values = np.array([m[name] for m in fold_metrics])
+        summary[name] = {'mean': float(values.mean()), 'std': float(values.std())}
+        print(f"  {name:<12} {values.mean():.4f} ± {values.std():.4f}")
+    
+    results = {
+        'n_splits': n_splits,
+        'n_workers': n_workers,
+        'threads_per_worker': n_threads,
+        'wall_time_sec': elapsed,
+        'summary': summary,
+        'folds': fold_metrics,
+    }
+    
+    import json
+    results_path = os.path.join(OUTPUT_DIR, 'cv_results.json')
+    with open(results_path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Cross-validation results saved to: {results_path}")
+    
+    return results
 
 
 def generate_report(metrics: dict, feature_names: list) -> None:
@@ -609,11 +1252,20 @@ def generate_report(metrics: dict, feature_names: list) -> None:
     print("STEP 11: Generating Training Report")
     print("=" * 60)
     
+    def ci(name: str, percent: bool = True) -> str:
+        """95% bootstrap interval from evaluate_model, if it was computed."""
+        low, high = metrics.get(f'{name}_ci_low'), metrics.get(f'{name}_ci_high')
+        if low is None or high is None:
+            return 'n/a'
+        if percent:
+            return f"{low*100:.2f}–{high*100:.2f}%"
+        return f"{low:.4f}–{high:.4f}"
+    
     report = f"""# NeuroAccess - Model Training Report
 
 **Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  
 **Model Version**: 1.0  
-**Framework**: TensorFlow {tf.__version__}
+**Framework**: TensorFlow {_tensorflow_version()}
 
 ---
 
@@ -645,17 +1297,23 @@ def generate_report(metrics: dict, feature_names: list) -> None:
 
 ## Performance Metrics
 
-| Metric | Target | Achieved | Status |
-|--------|--------|----------|--------|
-| Accuracy | ≥85% | {metrics['accuracy']*100:.2f}% | {'✅' if metrics['accuracy'] >= 0.85 else '❌'} |
-| Sensitivity | ≥85% | {metrics['sensitivity']*100:.2f}% | {'✅' if metrics['sensitivity'] >= 0.85 else '❌'} |
-| Specificity | ≥80% | {metrics['specificity']*100:.2f}% | {'✅' if metrics['specificity'] >= 0.80 else '❌'} |
-| AUC-ROC | ≥0.90 | {metrics['auc_roc']:.4f} | {'✅' if metrics['auc_roc'] >= 0.90 else '❌'} |
+| Metric | Target | Achieved | 95% CI | Status |
+|--------|--------|----------|--------|--------|
+| Accuracy | ≥85% | {metrics['accuracy']*100:.2f}% | {ci('accuracy')} | {'✅' if metrics['accuracy'] >= 0.85 else '❌'} |
+| Sensitivity | ≥85% | {metrics['sensitivity']*100:.2f}% | {ci('sensitivity')} | {'✅' if metrics['sensitivity'] >= 0.85 else '❌'} |
+| Specificity | ≥80% | {metrics['specificity']*100:.2f}% | {ci('specificity')} | {'✅' if metrics['specificity'] >= 0.80 else '❌'} |
+| AUC-ROC | ≥0.90 | {metrics['auc_roc']:.4f} | {ci('auc_roc', percent=False)} | {'✅' if metrics['auc_roc'] >= 0.90 else '❌'} |
+
+95% CIs are percentile bootstrap intervals over resamples of the test set.
 
 ## Output Files
 
-- `parkinson_model_v1.0.h5` - TensorFlow model
+- `parkinson_model_v1.0.keras` - TensorFlow model
 - `parkinson_model_v1.0.tflite` - Mobile-optimized model
+- `store/` - Every saved model version, content-addressed. The two model files above are
+  read-only hard links into it: publish a new version with `train_parkinson_model.py` or
+  `artifact_store.py checkout` rather than overwriting them (`cp`, `model.save`). The app
+  asset in `mobile_app/assets/models/` is a plain copy.
 - `scaler.joblib` - Feature scaler for preprocessing
 - `model_metadata.json` - Model metadata
 - `training_history.png` - Training curves
@@ -678,19 +1336,53 @@ def generate_report(metrics: dict, feature_names: list) -> None:
     print(f"✓ Training report saved to: {report_path}")
 
 
-def main():
+def main(argv: list = None):
     """Main training pipeline."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Always re-parse the raw CSV instead of using the dataset cache')
+    parser.add_argument('--no-plots', action='store_true',
+                        help='Skip rendering figures (headless batch retrains)')
+    parser.add_argument('--batch-size', type=int, default=16,
+                        help='Training batch size')
+    parser.add_argument('--scale-lr', action='store_true',
+                        help='Scale the learning rate linearly with --batch-size '
+                             '(relative to 16) for large-batch training')
+    parser.add_argument('--int8', action='store_true',
+                        help='Also export a full-integer INT8 TFLite model and '
+                             'validate it against the float model')
+    parser.add_argument('--fuse-scaler', action='store_true',
+                        help='Also export .keras/.tflite models with the scaler folded '
+                             'into the first layer, so they take raw features')
+    parser.add_argument('--cv-folds', type=int, default=0,
+                        help='Run stratified k-fold cross-validation instead of '
+                             'the single train/val/test pipeline')
+    parser.add_argument('--cv-workers', type=int, default=None,
+                        help='Worker processes for cross-validation (default: one per fold/core)')
+    parser.add_argument('--cv-save-models', action='store_true',
+                        help='Keep each fold\'s model and scaler in outputs/cv_models '
+                             '(inputs for ensemble_model.py)')
+    args = parser.parse_args(argv)
+    
     print("\n" + "=" * 60)
     print("🧠 NeuroAccess - Parkinson's Detection Model Training")
     print("=" * 60)
-    print(f"TensorFlow version: {tf.__version__}")
+    print(f"TensorFlow version: {_import_tensorflow().__version__}")
     print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     # Step 1: Load data
-    X, y, feature_names = load_and_preprocess_data(DATA_PATH)
+    X, y, feature_names = load_and_preprocess_data(DATA_PATH, use_cache=not args.no_cache)
+    
+    if args.cv_folds:
+        cross_validate_model(X, y, n_splits=args.cv_folds, n_workers=args.cv_workers,
+                             model_dir=CV_MODEL_DIR if args.cv_save_models else None)
+        return
+    
+    # Figures render in background processes; only wait for them at exit
+    renderer = PlotRenderer(enabled=not args.no_plots)
     
     # Step 2: EDA
-    explore_data(X, y, feature_names)
+    explore_data(X, y, feature_names, renderer=renderer)
     
     # Step 3: Prepare data splits
     (X_train, X_val, X_test, 
@@ -700,26 +1392,41 @@ def main():
     model = build_model(input_dim=X_train.shape[1])
     
     # Step 5: Train model
-    history = train_model(model, X_train, y_train, X_val, y_val)
+    history = train_model(model, X_train, y_train, X_val, y_val,
+                          batch_size=args.batch_size, scale_lr=args.scale_lr)
     
     # Step 6: Plot training history
-    plot_training_history(history)
+    plot_training_history(history, renderer=renderer)
     
     # Step 7: Evaluate model
-    metrics = evaluate_model(model, X_test, y_test)
+    metrics = evaluate_model(model, X_test, y_test, renderer=renderer)
     
     # Step 8: Save model
     model_path = save_model(model, feature_names, metrics)
     
     # Step 9: Convert to TFLite
-    tflite_path = convert_to_tflite(model_path)
+    tflite_path = convert_to_tflite(model_path, model=model)
     
     # Step 10: Validate TFLite model
     validate_tflite_model(tflite_path, X_test, y_test)
     
+    if args.int8:
+        int8_path = convert_to_tflite(model_path, quantization='int8', model=model,
+                                      representative_data=X_train)
+        validate_tflite_model(int8_path, X_test, y_test,
+                              reference_tflite_path=tflite_path)
+    
+    if args.fuse_scaler:
+        export_fused_model(model_path, scaler, X_test, y_test,
+                           reference_tflite_path=tflite_path, model=model)
+    
     # Step 11: Generate report
     generate_report(metrics, feature_names)
     
+    if renderer.enabled:
+        print("\nWaiting for background plot rendering...")
+    renderer.close()
+    
     print("\n" + "=" * 60)
     print("✅ Training Pipeline Complete!")
     print("=" * 60)
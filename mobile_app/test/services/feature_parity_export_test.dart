@@ -0,0 +1,83 @@
+import 'dart:convert';
+import 'dart:io';
+import 'dart:math' as math;
+import 'dart:typed_data';
+import 'package:flutter_test/flutter_test.dart';
+import 'package:neuro_access/services/feature_extraction_service.dart';
+
+/// Exports FeatureExtractionService outputs for the Python parity check
+/// (ml/feature_extraction.py parity <file>).
+///
+/// Skipped unless FEATURE_PARITY_OUTPUT is set:
+///   FEATURE_PARITY_OUTPUT=build/feature_parity.json \
+///     flutter test test/services/feature_parity_export_test.dart
+///   python ml/feature_extraction.py parity mobile_app/build/feature_parity.json
+///
+/// Without Flutter, `python ml/feature_extraction.py reference` checks the
+/// port against a scalar transliteration of this service instead.
+
+/// Synthetic sustained vowel quantised like AudioRecordingService (int16 / 32768)
+Float32List _syntheticVoice({
+  required double f0,
+  required double seconds,
+  double jitter = 0.01,
+  double noise = 0.02,
+  int seed = 0,
+  int sampleRate = 16000,
+}) {
+  final random = math.Random(seed);
+  final n = (seconds * sampleRate).round();
+  final samples = Float32List(n);
+  double phase = 0;
+  double drift = 0;
+  for (int i = 0; i < n; i++) {
+    drift += jitter * (random.nextDouble() - 0.5) / math.sqrt(n);
+    phase += 2 * math.pi * f0 * (1 + drift) / sampleRate;
+    double value = 0;
+    for (int k = 1; k <= 5; k++) {
+      value += math.sin(k * phase) / k;
+    }
+    final envelope = 0.4 + 0.1 * math.sin(2 * math.pi * 3 * i / sampleRate);
+    value = 0.5 * value * envelope + noise * (random.nextDouble() * 2 - 1);
+    final pcm = (value * 32767).round().clamp(-32768, 32767);
+    samples[i] = pcm / 32768.0;
+  }
+  return samples;
+}
+
+void main() {
+  final outputPath = Platform.environment['FEATURE_PARITY_OUTPUT'];
+
+  test(
+    'export feature parity fixture',
+    () async {
+      final service = FeatureExtractionService();
+      final cases = <String, Float32List>{
+        'vowel_120hz': _syntheticVoice(f0: 120, seconds: 1.5, seed: 1),
+        'vowel_220hz_jittery': _syntheticVoice(f0: 220, seconds: 1.0, jitter: 0.05, seed: 2),
+        'vowel_160hz_noisy': _syntheticVoice(f0: 160, seconds: 1.2, noise: 0.4, seed: 3),
+        'vowel_90hz_long': _syntheticVoice(f0: 90, seconds: 3.0, seed: 4),
+        'silence': Float32List(16000),
+      };
+
+      final exported = <Map<String, dynamic>>[];
+      for (final entry in cases.entries) {
+        final features = await service.extractFeatures(entry.value);
+        expect(features.length, equals(22));
+        exported.add({
+          'name': entry.key,
+          'sample_rate': 16000,
+          'samples': entry.value.toList(),
+          'features': features,
+        });
+      }
+
+      final file = File(outputPath!);
+      await file.parent.create(recursive: true);
+      await file.writeAsString(jsonEncode({'cases': exported}));
+    },
+    skip: outputPath == null
+        ? 'Set FEATURE_PARITY_OUTPUT to export the parity fixture'
+        : false,
+  );
+}